@@ -1,16 +1,20 @@
-from openpyxl import load_workbook
 from collections import defaultdict
+from workbook_table import load_table
 
-wb = load_workbook('menu_hierarchy3.xlsx')
-ws = wb.active
+table = load_table('menu_hierarchy3.xlsx')
 
-max_row = ws.max_row
-max_col = ws.max_column
+max_row = table.n_rows + 1
+max_col = table.n_cols
 
 # Get header
-header = []
-for col in range(1, max_col + 1):
-    header.append(str(ws.cell(1, col).value))
+header = [str(h) for h in table.headers]
+
+# Columns used below (Level, Node Text, Type, Unique ID, Parent Node)
+level_values = table.column(3)
+text_values = table.column(4)
+type_values = table.column(5)
+unique_id_values = table.column(6)
+parent_values = table.column(8)
 
 print('=== ANALYZING "N/A" STRING PATTERNS IN EXCEL ===')
 print()
@@ -20,11 +24,7 @@ print('Columns with "N/A" values:')
 na_string_counts = {}
 for col in range(1, max_col + 1):
     col_name = header[col-1]
-    na_count = 0
-    for row in range(2, max_row + 1):
-        val = ws.cell(row, col).value
-        if val == "N/A" or str(val).strip() == "N/A":
-            na_count += 1
+    na_count = sum(1 for val in table.column(col) if val == "N/A" or str(val).strip() == "N/A")
     if na_count > 0:
         pct = (na_count / (max_row - 1) * 100)
         na_string_counts[col_name] = na_count
@@ -42,34 +42,26 @@ for col in range(1, max_col + 1):
 
 if xpath_col:
     print(f'Rows with "N/A" in XPath (Unique) column:')
-    xpath_na_rows = []
-    for row in range(2, max_row + 1):
-        val = ws.cell(row, xpath_col).value
-        if val == "N/A":
-            xpath_na_rows.append(row)
+    xpath_na_rows = [row for row, val in enumerate(table.column(xpath_col), start=2) if val == "N/A"]
     
     print(f'Total: {len(xpath_na_rows)} rows')
     print()
     print('First 20 examples:')
     for row in xpath_na_rows[:20]:
-        node_text = ws.cell(row, 4).value  # Node Text column
-        type_col = ws.cell(row, 5).value   # Type column
-        level = ws.cell(row, 3).value      # Level column
-        unique_id = ws.cell(row, 6).value  # Unique ID column
-        parent = ws.cell(row, 8).value     # Parent Node
+        node_text = text_values[row - 2]
+        type_col = type_values[row - 2]
+        level = level_values[row - 2]
+        unique_id = unique_id_values[row - 2]
+        parent = parent_values[row - 2]
         print(f'  Row {row}: Level {level} | Type: {type_col} | Text: "{node_text}" | Parent: "{parent}"')
 
 print()
 print('=== RELATIONSHIP: Type vs N/A in XPath ===')
 
 # Analyze which node TYPES have N/A XPath
-type_col = 5
-xpath_col_num = xpath_col
-
 type_na_map = {}
-for row in range(2, max_row + 1):
-    node_type = str(ws.cell(row, type_col).value)
-    xpath_val = ws.cell(row, xpath_col_num).value
+for node_type, xpath_val in zip(type_values, table.column(xpath_col)):
+    node_type = str(node_type)
     
     if node_type not in type_na_map:
         type_na_map[node_type] = {'total': 0, 'with_na_xpath': 0}
@@ -88,9 +80,9 @@ print()
 print('=== UNIQUE NODE TEXTS WITH N/A XPATH ===')
 xpath_na_texts = {}
 for row in xpath_na_rows:
-    node_text = str(ws.cell(row, 4).value)
-    node_type = str(ws.cell(row, 5).value)
-    level = ws.cell(row, 3).value
+    node_text = str(text_values[row - 2])
+    node_type = str(type_values[row - 2])
+    level = level_values[row - 2]
     
     if node_text not in xpath_na_texts:
         xpath_na_texts[node_text] = {'count': 0, 'types': set(), 'levels': set()}
@@ -116,13 +108,13 @@ print(f'Rows with N/A in XPath: {len(xpath_na_rows)} ({len(xpath_na_rows)/(max_r
 print()
 
 # Check if N/A XPath nodes are ALL Parent (Expandable)
-all_parent = all(str(ws.cell(row, 5).value) == "Parent (Expandable)" for row in xpath_na_rows)
+all_parent = all(str(type_values[row - 2]) == "Parent (Expandable)" for row in xpath_na_rows)
 print(f'Are ALL N/A XPath nodes "Parent (Expandable)"? {all_parent}')
 
 # Check what types appear with N/A
 types_with_na = set()
 for row in xpath_na_rows:
-    types_with_na.add(str(ws.cell(row, 5).value))
+    types_with_na.add(str(type_values[row - 2]))
 print(f'Node types with N/A XPath: {sorted(types_with_na)}')
 
 # Check Unique ID pattern
@@ -130,7 +122,7 @@ print()
 print('=== UNIQUE ID PATTERNS FOR N/A XPATH ROWS ===')
 unique_ids_na = defaultdict(int)
 for row in xpath_na_rows:
-    unique_id = str(ws.cell(row, 6).value)
+    unique_id = str(unique_id_values[row - 2])
     unique_ids_na[unique_id] += 1
 
 print(f'Unique ID patterns:')
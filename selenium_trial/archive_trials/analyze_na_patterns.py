@@ -1,35 +1,34 @@
-from openpyxl import load_workbook
+from workbook_table import load_table
 
-# Load the Excel file
-wb = load_workbook('menu_hierarchy3.xlsx')
-ws = wb.active
+# Load the Excel file (read once, cached columnar table)
+table = load_table('menu_hierarchy3.xlsx')
 
 print('=== FILE STRUCTURE ===')
-print(f'Sheet name: {ws.title}')
+print(f'Sheet name: {table.title}')
 
 # Get dimensions
-max_row = ws.max_row
-max_col = ws.max_column
+max_row = table.n_rows + 1
+max_col = table.n_cols
 print(f'Dimensions: {max_row} rows, {max_col} columns')
 print()
 
 # Print header
 print('=== COLUMN HEADERS ===')
-header = []
-for col in range(1, max_col + 1):
-    cell_value = ws.cell(1, col).value
-    header.append(str(cell_value) if cell_value else 'Empty')
+header = [str(h) if h else 'Empty' for h in table.headers]
 for i, h in enumerate(header):
     print(f'  Col {i+1}: {h}')
 print()
 
+# Columns with an empty cell, per data row (row 2 = first data row)
+row_na_cols = [[col for col, value in enumerate(values, start=1) if value is None] for values in table.rows()]
+
 # Print first 35 rows with NA analysis
 print('=== FIRST 35 DATA ROWS (NA indicators shown) ===')
 for row in range(2, min(37, max_row + 1)):
     values = []
     na_cols = []
     for col in range(1, max_col + 1):
-        cell_value = ws.cell(row, col).value
+        cell_value = table.cell(row, col)
         if cell_value is None:
             values.append('[NA]')
             na_cols.append(col)
@@ -52,10 +51,7 @@ print('\n\n=== NA ANALYSIS BY COLUMN ===')
 total_data_rows = max_row - 1
 for col in range(1, max_col + 1):
     col_name = header[col-1]
-    na_count = 0
-    for row in range(2, max_row + 1):
-        if ws.cell(row, col).value is None:
-            na_count += 1
+    na_count = table.column(col).count(None)
     pct = (na_count / total_data_rows * 100) if total_data_rows > 0 else 0
     if na_count > 0:
         print(f'{col_name}: {na_count}/{total_data_rows} NAs ({pct:.1f}%)')
@@ -64,15 +60,7 @@ for col in range(1, max_col + 1):
 
 # Check for patterns - which rows have NAs
 print('\n\n=== ROWS WITH NA VALUES (complete list) ===')
-rows_with_na = []
-for row in range(2, max_row + 1):
-    has_na = False
-    for col in range(1, max_col + 1):
-        if ws.cell(row, col).value is None:
-            has_na = True
-            break
-    if has_na:
-        rows_with_na.append(row)
+rows_with_na = [row for row, na_cols in enumerate(row_na_cols, start=2) if na_cols]
 
 print(f'Total rows with at least one NA: {len(rows_with_na)} out of {total_data_rows}')
 print(f'Rows: {rows_with_na[:50]}')  # Show first 50
@@ -80,11 +68,8 @@ print(f'Rows: {rows_with_na[:50]}')  # Show first 50
 # Analyze what columns have NAs and their relationship
 print('\n\n=== NA PATTERN ANALYSIS ===')
 na_patterns = {}
-for row in range(2, max_row + 1):
-    na_cols = []
-    for col in range(1, max_col + 1):
-        if ws.cell(row, col).value is None:
-            na_cols.append(header[col-1])
+for row, na_col_numbers in enumerate(row_na_cols, start=2):
+    na_cols = [header[col-1] for col in na_col_numbers]
     
     if na_cols:
         pattern_key = tuple(sorted(na_cols))
@@ -110,9 +95,8 @@ if 'Depth' in header or 'Level' in header:
     if depth_col:
         print(f'Analyzing by {header[depth_col-1]} column:')
         depth_na_map = {}
-        for row in range(2, max_row + 1):
-            depth = ws.cell(row, depth_col).value
-            has_na = any(ws.cell(row, c).value is None for c in range(1, max_col + 1))
+        for depth, na_col_numbers in zip(table.column(depth_col), row_na_cols):
+            has_na = bool(na_col_numbers)
             if depth not in depth_na_map:
                 depth_na_map[depth] = {'total': 0, 'with_na': 0}
             depth_na_map[depth]['total'] += 1
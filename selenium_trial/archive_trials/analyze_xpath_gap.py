@@ -3,7 +3,7 @@ Analyze actual XPath vs extracted XPath for N/A nodes
 Find the disconnect and generate position-based selectors
 """
 
-from openpyxl import load_workbook
+from workbook_table import load_table
 
 def analyze_xpath_mismatch():
     """
@@ -12,8 +12,7 @@ def analyze_xpath_mismatch():
     
     # Load the file
     excel_file = 'menu_hierarchy3.xlsx'
-    wb = load_workbook(excel_file)
-    ws = wb.active
+    table = load_table(excel_file)
     
     # Find the specific node
     search_text = 'Joint Customer Relationship Enquiry'
@@ -21,26 +20,20 @@ def analyze_xpath_mismatch():
     print('=== ANALYZING XPATH MISMATCH ===\n')
     print(f'Searching for: {search_text}\n')
     
-    # Get headers
-    headers = {}
-    for col in range(1, ws.max_column + 1):
-        header = ws.cell(1, col).value
-        headers[header] = col
-    
     # Find all matching rows
     found = False
-    for row in range(2, ws.max_row + 1):
-        node_text = ws.cell(row, headers['Node Text']).value
+    for row, node in enumerate(table.records(), start=2):
+        node_text = node['Node Text']
         if node_text == search_text:
             found = True
             print(f'✓ Found node at row {row}')
             print(f'  Node Text: {node_text}')
-            print(f'  Full Path: {ws.cell(row, headers["Full Path"]).value}')
-            print(f'  Level: {ws.cell(row, headers["Level"]).value}')
-            print(f'  Type: {ws.cell(row, headers["Type"]).value}')
-            print(f'  Unique ID: {ws.cell(row, headers["Unique ID"]).value}')
-            print(f'  Parent Node: {ws.cell(row, headers["Parent Node"]).value}')
-            print(f'  XPath (Unique) in Excel: {ws.cell(row, headers["XPath (Unique)"]).value}')
+            print(f'  Full Path: {node["Full Path"]}')
+            print(f'  Level: {node["Level"]}')
+            print(f'  Type: {node["Type"]}')
+            print(f'  Unique ID: {node["Unique ID"]}')
+            print(f'  Parent Node: {node["Parent Node"]}')
+            print(f'  XPath (Unique) in Excel: {node["XPath (Unique)"]}')
             print()
     
     if not found:
@@ -0,0 +1,182 @@
+"""
+Browser Recycling Policy
+Chrome and chromedriver grow over thousands of popups and per-page latency creeps up
+with them. Instead of waiting for a crash, the crawl restarts the session:
+
+- every RECYCLE_EVERY_PAGES pages (0 = never), or
+- when the browser process tree (chromedriver + Chrome) exceeds RECYCLE_RSS_MB
+  (checked every RSS_CHECK_EVERY pages, 0 = never) - needs psutil, or /proc on Linux;
+  without either the RSS trigger is switched off with a warning
+
+A recycle quits the driver, starts a new one and runs the crawler's restore step
+(login, menu expansion); a failed start/restore is retried RECYCLE_RESTART_ATTEMPTS
+times before recycle() gives up. The crawl loop keeps its position in the page list,
+rows already written stay where they are and the WebDriver command totals carry over. Each recycle returns an event dict
+(reason, RSS before/after, cost in ms) for the stats output.
+"""
+
+import os
+import time
+from typing import Callable, Dict, Tuple
+
+from driver_instrumentation import carry_run_totals
+
+RECYCLE_EVERY_PAGES = int(os.getenv('RECYCLE_EVERY_PAGES', '500'))
+RECYCLE_RSS_MB = int(os.getenv('RECYCLE_RSS_MB', '1500'))
+RSS_CHECK_EVERY = int(os.getenv('RSS_CHECK_EVERY', '20'))
+RECYCLE_RESTART_ATTEMPTS = int(os.getenv('RECYCLE_RESTART_ATTEMPTS', '3'))
+
+RECYCLE_COLUMNS = ['page_index', 'page', 'reason', 'pages_since_last', 'rss_before_mb', 'rss_after_mb', 'recycle_ms', 'timestamp']
+
+
+def proc_tree_rss_kb(root_pid: int) -> int:
+    """RSS (KB) of root_pid and all its descendants. psutil if installed, else /proc (Linux)."""
+    try:
+        import psutil
+        try:
+            root = psutil.Process(root_pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for proc in procs:
+            try:
+                total += proc.memory_info().rss // 1024
+            except psutil.Error:
+                pass
+        return total
+    except ImportError:
+        pass
+
+    if not os.path.isdir('/proc'):
+        return 0
+
+    children = {}
+    rss = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status', 'r') as f:
+                status = f.read()
+        except OSError:
+            continue
+        pid = int(entry)
+        for line in status.splitlines():
+            if line.startswith('PPid:'):
+                children.setdefault(int(line.split()[1]), []).append(pid)
+            elif line.startswith('VmRSS:'):
+                rss[pid] = int(line.split()[1])
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+def rss_source_available() -> bool:
+    """True if process RSS can be read here (psutil installed, or Linux /proc)."""
+    try:
+        import psutil  # noqa: F401
+        return True
+    except ImportError:
+        return os.path.isdir('/proc')
+
+
+def browser_rss_mb(driver) -> float:
+    """RSS of chromedriver + every Chrome process it started (0 if unknown)."""
+    try:
+        return round(proc_tree_rss_kb(driver.service.process.pid) / 1024, 1)
+    except Exception:
+        return 0.0
+
+
+class RecyclePolicy:
+    """Decides when to restart the browser and performs the restart."""
+
+    def __init__(self, every_pages: int = RECYCLE_EVERY_PAGES, rss_mb: int = RECYCLE_RSS_MB,
+                 check_every: int = RSS_CHECK_EVERY):
+        self.every_pages = every_pages
+        self.rss_mb = rss_mb
+        self.check_every = check_every
+        self.pages_since_recycle = 0
+        if self.rss_mb and self.check_every and not rss_source_available():
+            print("⚠️ Browser RSS can't be measured here (pip install psutil) - RSS-based recycling disabled")
+            self.rss_mb = 0
+        self.events = []
+
+    def describe(self) -> str:
+        parts = []
+        if self.every_pages:
+            parts.append(f"every {self.every_pages} pages")
+        if self.rss_mb and self.check_every:
+            parts.append(f"above {self.rss_mb} MB browser RSS")
+        return ' or '.join(parts) if parts else 'disabled'
+
+    def page_done(self):
+        self.pages_since_recycle += 1
+
+    def should_recycle(self, driver) -> str:
+        """Reason to recycle before the next page ('' = keep going)."""
+        if not self.pages_since_recycle:
+            return ''
+        if self.every_pages and self.pages_since_recycle >= self.every_pages:
+            return f'{self.pages_since_recycle} pages'
+        if self.rss_mb and self.check_every and self.pages_since_recycle % self.check_every == 0:
+            rss = browser_rss_mb(driver)
+            if rss >= self.rss_mb:
+                return f'rss {rss:.0f} MB'
+        return ''
+
+    def recycle(self, driver, reason: str, setup_driver: Callable, restore: Callable,
+                page_index: int = 0, page: str = '') -> Tuple[object, Dict]:
+        """
+        Quit driver, start a fresh one with setup_driver() and run restore(new_driver)
+        (login + menu). Returns (new_driver, event). A failed start or restore is retried;
+        after the last attempt the exception is raised and no browser is left running.
+        """
+        print(f"  ♻️ Recycling browser ({reason})...")
+        start = time.time()
+        rss_before = browser_rss_mb(driver)
+        old_driver = driver
+        try:
+            old_driver.quit()
+        except Exception:
+            pass
+
+        attempts = max(RECYCLE_RESTART_ATTEMPTS, 1)
+        for attempt in range(1, attempts + 1):
+            driver = None
+            try:
+                driver = setup_driver()
+                restore(driver)
+                break
+            except Exception as e:
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                if attempt == attempts:
+                    raise
+                print(f"  ⚠️ Restart failed ({str(e)[:60]}) - retrying ({attempt}/{attempts})")
+                time.sleep(5 * attempt)
+        carry_run_totals(old_driver, driver)
+
+        event = {
+            'page_index': page_index,
+            'page': page,
+            'reason': reason,
+            'pages_since_last': self.pages_since_recycle,
+            'rss_before_mb': rss_before,
+            'rss_after_mb': browser_rss_mb(driver),
+            'recycle_ms': int((time.time() - start) * 1000),
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        self.events.append(event)
+        self.pages_since_recycle = 0
+        print(f"  ✅ Browser recycled in {event['recycle_ms']}ms ({event['rss_before_mb']} MB → {event['rss_after_mb']} MB)")
+        return driver, event
@@ -0,0 +1,63 @@
+"""
+In-Browser Bulk Field Extraction
+Reads every matching field's attributes, visibility and full XPath with ONE
+execute_script per frame instead of 5-8 WebDriver calls per element.
+
+Attribute values follow Selenium's get_attribute() (property first, then attribute),
+so rows built from this data match the per-element extractors.
+"""
+
+from typing import List, Dict
+
+BULK_FIELDS_SCRIPT = """
+    function getXPath(element) {
+        if (element.id !== '') return '//*[@id="' + element.id + '"]';
+        if (element === document.body) return '/html/body';
+        var ix = 0;
+        var siblings = element.parentNode.childNodes;
+        for (var i = 0; i < siblings.length; i++) {
+            var sibling = siblings[i];
+            if (sibling === element) return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
+            if (sibling.nodeType === 1 && sibling.tagName === element.tagName) ix++;
+        }
+    }
+
+    function prop(el, name) {
+        var value = el[name];
+        if (value === undefined || value === null) value = el.getAttribute(name);
+        return value === undefined || value === null ? '' : String(value);
+    }
+
+    function isVisible(el) {
+        if (el.getClientRects().length === 0) return false;
+        var style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.opacity !== '0';
+    }
+
+    var fields = [];
+    var elements = document.querySelectorAll(arguments[0]);
+    for (var i = 0; i < elements.length; i++) {
+        var el = elements[i];
+        var fullXpath = '';
+        try { fullXpath = getXPath(el) || ''; } catch (e) {}
+        fields.push({
+            tagName: el.tagName.toLowerCase(),
+            id: prop(el, 'id'),
+            name: prop(el, 'name'),
+            className: el.getAttribute('class') || '',
+            type: prop(el, 'type'),
+            placeholder: prop(el, 'placeholder'),
+            value: prop(el, 'value'),
+            text: (el.innerText || '').trim(),
+            visible: isVisible(el),
+            fullXpath: fullXpath
+        });
+    }
+    return fields;
+"""
+
+
+def extract_fields_bulk(driver, selector: str) -> List[Dict]:
+    """Return every element matching selector in the current frame as a list of dicts."""
+    return driver.execute_script(BULK_FIELDS_SCRIPT, selector) or []
+
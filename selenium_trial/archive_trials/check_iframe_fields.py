@@ -3,7 +3,8 @@ Check if 0-element pages have iframes that weren't inspected.
 The crawler might be missing fields inside iframes.
 """
 import json
-from crawler import setup_driver, login, get_menu_frame, expand_all_menus_recursive
+from crawler import setup_driver, get_menu_frame, expand_all_menus_recursive
+from session_fanout import sign_on
 from selenium.webdriver.common.by import By
 import time
 import os
@@ -27,7 +28,7 @@ def check_iframe_fields():
     driver = setup_driver()
     
     try:
-        login(driver, T24_URL, T24_USERNAME, T24_PASSWORD)
+        sign_on(driver, T24_URL, T24_USERNAME, T24_PASSWORD)  # reuses a recent session when T24 accepts it
         expand_all_menus_recursive(driver)
         
         menu_frame = get_menu_frame(driver, wait=True)
@@ -1,17 +1,6 @@
-import openpyxl
+"""List XPaths that don't start with // (invalid-XPath view of ui_map_quality)."""
+import sys
+from ui_map_quality import run
 
-wb = openpyxl.load_workbook('uiMap_selenium_fullrun_auto3_cleaned.xlsx')
-ws = wb.active
-
-invalid = []
-for i in range(2, ws.max_row + 1):
-    xpath = ws[i][2].value
-    if xpath and not str(xpath).startswith('//'):
-        invalid.append((i, ws[i][0].value, xpath))
-
-print(f'Found {len(invalid)} invalid XPaths (not starting with //):')
-print()
-for row, page, xpath in invalid[:15]:
-    print(f'Row {row}: Page={page}')
-    print(f'  XPath: {xpath}')
-    print()
+filename = sys.argv[1] if len(sys.argv) > 1 else 'uiMap_selenium_fullrun_auto3_cleaned.xlsx'
+run(filename, sections=['invalid'])
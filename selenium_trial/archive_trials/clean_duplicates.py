@@ -1,36 +1,190 @@
 """
-Remove duplicate XPaths from the Excel file, keeping only the first occurrence.
+Remove duplicate rows from a UI map workbook, keeping only the first occurrence.
+
+The old version collected duplicate row numbers and called ws.delete_rows() for each
+one; openpyxl shifts every following row on each delete, so large files took minutes.
+This streams the input (read-only) and writes the kept rows straight into a new
+write-only workbook - one pass, linear time:
+
+- DEDUP_KEY=xpath       one row per relativeXpath (the old behaviour, default)
+- DEDUP_KEY=page_xpath  one row per page + relativeXpath
+- DEDUP_KEY=row         one row per complete 8-column row (the key export_to_excel uses)
+
+Rows without an XPath (blank rows too, as before) are always kept. Columns are found by header, so any crawler
+layout works, and the output keeps the input's columns. What was dropped (per page,
+plus examples with the row that was kept instead) goes to DEDUP_REPORT_FILE.
+DEDUP_STORE=true also records the kept rows as a 'dedup' run in the UI map store.
+
+Usage:
+    python clean_duplicates.py [input.xlsx] [output.xlsx]
 """
-from openpyxl import load_workbook
+import os
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+from atomic_io import atomic_write_json, save_workbook_atomic
+from ui_map_store import HEADER_ALIASES
+
+DEDUP_KEY = os.getenv('DEDUP_KEY', 'xpath')
+DEDUP_STORE = os.getenv('DEDUP_STORE', 'false').lower() in ('1', 'true', 'yes')
+DEDUP_REPORT_FILE = 'dedup_report.json'
+EXAMPLE_LIMIT = 50
+
+ROW_KEY_FIELDS = ['page', 'elementName', 'relativeXpath', 'id', 'name', 'className', 'tagName', 'type']
+DEDUP_KEYS = {
+    'xpath': ['relativeXpath'],
+    'page_xpath': ['page', 'relativeXpath'],
+    'row': ROW_KEY_FIELDS,
+}
+
+
+def key_function(headers: List, key: str = DEDUP_KEY) -> Callable[[tuple], tuple]:
+    """Row values -> dedup key, with columns located by header (missing columns count as '')."""
+    if key not in DEDUP_KEYS:
+        raise ValueError(f"Unknown DEDUP_KEY '{key}' - use one of {', '.join(DEDUP_KEYS)}")
+    positions = {}
+    for i, header in enumerate(headers):
+        field = HEADER_ALIASES.get(str(header or '').strip().lower())
+        if field and field not in positions:
+            positions[field] = i
+    if 'relativeXpath' not in positions:
+        raise ValueError(f"No XPath column in headers {headers}")
+
+    indexes = [positions.get(field) for field in DEDUP_KEYS[key]]
+
+    def row_key(values: tuple) -> tuple:
+        return tuple('' if i is None or i >= len(values) or values[i] is None else values[i] for i in indexes)
+    return row_key
+
+
+def dedup_rows(rows: Iterable[tuple], row_key: Callable[[tuple], tuple], xpath_index: int,
+               report: Dict) -> Iterator[tuple]:
+    """
+    Yield the first row per key (rows without an XPath, blank rows included, always pass).
+    Fills report with the dropped count per page and a few dropped examples.
+    """
+    first_seen = {}
+    dropped_per_page = Counter()
+    examples = []
+    kept = dropped = without_xpath = 0
+    page_index = report.get('page_column')
+
+    for row_num, values in enumerate(rows, start=2):
+        xpath = values[xpath_index] if xpath_index < len(values) else None
+        if xpath in (None, ''):
+            kept += 1
+            without_xpath += 1
+            yield values
+            continue
+
+        key = row_key(values)
+        if key in first_seen:
+            dropped += 1
+            page = values[page_index] if page_index is not None else ''
+            dropped_per_page[page or ''] += 1
+            if len(examples) < EXAMPLE_LIMIT:
+                examples.append({'row': row_num, 'kept_row': first_seen[key], 'page': page, 'xpath': xpath})
+            continue
+        first_seen[key] = row_num
+        kept += 1
+        yield values
+
+    report.update({
+        'rows_kept': kept,
+        'rows_without_xpath': without_xpath,
+        'rows_dropped': dropped,
+        'unique_keys': len(first_seen),
+        'dropped_per_page': dict(dropped_per_page.most_common()),
+        'dropped_examples': examples,
+    })
+
+
+def dedupe_workbook(input_file: str, output_file: str, key: str = DEDUP_KEY) -> Tuple[Dict, List[tuple]]:
+    """Stream input_file into output_file without duplicates. Returns (report, headers)."""
+    start = time.perf_counter()
+    src = load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        ws = src.active
+        rows = ws.iter_rows(values_only=True)
+        headers = list(next(rows, ()))
+        row_key = key_function(headers, key)
+        fields = [HEADER_ALIASES.get(str(h or '').strip().lower()) for h in headers]
+        report = {
+            'input_file': input_file,
+            'output_file': output_file,
+            'key': key,
+            'key_columns': DEDUP_KEYS[key],
+            'page_column': fields.index('page') if 'page' in fields else None,
+        }
+
+        out = Workbook(write_only=True)
+        out_ws = out.create_sheet(ws.title)
+        out_ws.append(headers)
+        kept_rows = []
+        for values in dedup_rows(rows, row_key, fields.index('relativeXpath'), report):
+            out_ws.append(values)
+            if DEDUP_STORE:
+                kept_rows.append(values)
+    finally:
+        src.close()
+
+    save_workbook_atomic(out, output_file)
+    report['elapsed_s'] = round(time.perf_counter() - start, 2)
+    report.pop('page_column')
+    if DEDUP_STORE:
+        record_in_store(input_file, fields, kept_rows)
+    return report, headers
+
 
-filepath = 'uiMap_selenium_fullrun_auto3.xlsx'
+def record_in_store(input_file: str, fields: List, kept_rows: List[tuple]):
+    """Kept rows as a 'dedup' run of the UI map store."""
+    from ui_map_store import UiMapStore
 
-print(f"📊 Cleaning duplicates from: {filepath}")
+    store = UiMapStore()
+    try:
+        records = ({f: ('' if v is None else str(v)) for f, v in zip(fields, values) if f} for values in kept_rows)
+        run_id = store.start_run('dedup', source_file=os.path.abspath(input_file))
+        store.record_rows(run_id, (r for r in records if r.get('page')))
+        store.finish_run(run_id, 'imported')
+        print(f"🗄️ Recorded kept rows as store run {run_id}")
+    finally:
+        store.close()
 
-wb = load_workbook(filepath)
-ws = wb.active
 
-# Track seen XPaths and rows to delete
-seen_xpaths = set()
-rows_to_delete = []
+def main():
+    input_file = sys.argv[1] if len(sys.argv) > 1 else 'uiMap_selenium_fullrun_auto3.xlsx'
+    output_file = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(input_file)[0] + '_cleaned.xlsx'
+    if os.path.abspath(input_file) == os.path.abspath(output_file):
+        print(f"❌ Output must be a new file (input is {input_file})")
+        sys.exit(1)
+    if not os.path.exists(input_file):
+        print(f"❌ File not found: {input_file}")
+        sys.exit(1)
+    if DEDUP_KEY not in DEDUP_KEYS:
+        print(f"❌ Unknown DEDUP_KEY '{DEDUP_KEY}' - use one of {', '.join(DEDUP_KEYS)}")
+        sys.exit(1)
 
-for i, row in enumerate(ws.iter_rows(min_row=2, values_only=False), 2):
-    xpath = row[3].value  # relativeXpath column
-    if xpath:
-        if xpath in seen_xpaths:
-            rows_to_delete.append(i)
-        else:
-            seen_xpaths.add(xpath)
+    print(f"📊 Cleaning duplicates from: {input_file} (key: {DEDUP_KEY})")
+    try:
+        report, _ = dedupe_workbook(input_file, output_file)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    atomic_write_json(DEDUP_REPORT_FILE, report, keep_backup=False, indent=2, ensure_ascii=False, default=str)
 
-print(f"   Found {len(rows_to_delete)} duplicate rows to remove")
-print(f"   Keeping {len(seen_xpaths)} unique XPaths")
+    print(f"   Removed {report['rows_dropped']} duplicate rows")
+    print(f"   Keeping {report['unique_keys']} unique keys")
+    for page, count in list(report['dropped_per_page'].items())[:10]:
+        print(f"      - {page}: {count} dropped")
+    print(f"✅ Saved cleaned file: {output_file}")
+    print(f"   Total rows now: {report['rows_kept']}  ({report['elapsed_s']}s)")
+    print(f"📄 Dropped rows: {DEDUP_REPORT_FILE}")
 
-# Delete rows in reverse order (so indices don't shift)
-for row_idx in reversed(rows_to_delete):
-    ws.delete_rows(row_idx, 1)
 
-# Save cleaned file
-output_file = 'uiMap_selenium_fullrun_auto3_cleaned.xlsx'
-wb.save(output_file)
-print(f"✅ Saved cleaned file: {output_file}")
-print(f"   Total rows now: {ws.max_row - 1}")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,409 @@
+"""
+End-to-End Crawl Benchmark
+Runs one crawler against the local mock T24 servlet (mock_t24_server.py) and reports:
+
+- pages/minute
+- p50/p95/p99 per-page latency (interval between consecutive popup requests seen by the mock)
+- WebDriver commands per page (every driver.execute() call is counted)
+- peak RSS of the Python process + chromedriver/Chrome process tree
+- extraction recall against the mock's ground truth (fields and pages)
+
+Each run works in a fresh temp directory (no checkpoints or outputs from earlier runs)
+and writes its result to benchmark_results/<crawler>_<timestamp>.json so runs can be
+compared across commits.
+
+Usage:
+    python crawl_benchmark.py [crawl_menu|crawl_fast|crawl_with_iframe_support] [max_pages] [browser_profile]
+    Mock behaviour is set through the MOCK_* env vars (see mock_t24_server.py).
+"""
+
+import os
+import sys
+import math
+import time
+import shutil
+import tempfile
+import threading
+import importlib
+import subprocess
+from typing import Dict, List, Optional
+from openpyxl import load_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mock_t24_server import start_mock_server, build_ground_truth, load_hierarchy, DEFAULT_MOCK_CONFIG
+from atomic_io import atomic_write_json
+from driver_instrumentation import PHASES, OTHER_PHASE
+from browser_profiles import get_profile_name, describe_profile
+from browser_recycling import proc_tree_rss_kb
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+RSS_SAMPLE_INTERVAL = 0.5  # seconds
+
+# crawler -> where it lives and where its rows end up (relative to the run directory)
+CRAWLERS = {
+    'crawl_menu': {
+        'module': 'crawler',
+        'output_file': 'uiMap_selenium_fullrun_final_stats.xlsx',
+        'columns': {'page': 'pageName', 'id': 'elementId', 'name': 'elementNameAttr'},
+    },
+    'crawl_fast': {
+        'module': 'crawler_fast',
+        'output_file': 'uiMap_fast.xlsx',
+        'columns': {'page': 'page', 'id': 'id', 'name': 'name'},
+    },
+    'crawl_with_iframe_support': {
+        'module': 'crawler_iframe_aware',
+        'output_file': 'uiMap_output_with_iframes.xlsx',
+        'columns': {'page': 'page', 'id': 'id', 'name': 'name'},
+    },
+}
+
+
+# ==================== MEASUREMENT HELPERS ====================
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no values)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class RssSampler:
+    """Background sampler of peak RSS for this process + every driver's process tree."""
+
+    def __init__(self, drivers: List, interval: float = RSS_SAMPLE_INTERVAL):
+        self.drivers = drivers
+        self.interval = interval
+        self.peak_kb = 0
+        self.peak_browser_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        # Drivers are children of this process, so its tree already includes the browsers
+        total_kb = proc_tree_rss_kb(os.getpid())
+        browser_kb = 0
+        for driver in list(self.drivers):
+            try:
+                browser_kb += proc_tree_rss_kb(driver.service.process.pid)
+            except Exception:
+                pass
+        self.peak_kb = max(self.peak_kb, total_kb)
+        self.peak_browser_kb = max(self.peak_browser_kb, browser_kb)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._sample()
+
+
+def instrument_setup_driver(module, drivers: List, command_times: List[float]):
+    """
+    Replace module.setup_driver so every driver it creates counts its WebDriver commands.
+    Returns the original function (restore with module.setup_driver = original).
+    """
+    original = module.setup_driver
+
+    def setup_driver(*args, **kwargs):
+        driver = original(*args, **kwargs)
+        raw_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            command_times.append(time.perf_counter())
+            return raw_execute(driver_command, params)
+
+        driver.execute = execute  # WebElement calls also go through driver.execute
+        drivers.append(driver)
+        return driver
+
+    module.setup_driver = setup_driver
+    return original
+
+
+def phase_breakdown(drivers: List, pages: int) -> Dict:
+    """Per-phase commands and wall ms per page, summed over every driver's recorder."""
+    totals = {}
+    for driver in drivers:
+        recorder = getattr(driver, 'recorder', None)
+        if recorder is None:
+            continue
+        for phase, entry in recorder.run.items():
+            bucket = totals.setdefault(phase, {'cmds': 0, 'wall_ms': 0.0})
+            bucket['cmds'] += entry['cmds']
+            bucket['wall_ms'] += entry['wall_ms']
+    return {
+        phase: {
+            'cmds_per_page': round(totals[phase]['cmds'] / pages, 1) if pages else 0,
+            'ms_per_page': round(totals[phase]['wall_ms'] / pages, 1) if pages else 0,
+        }
+        for phase in PHASES + [OTHER_PHASE] if phase in totals
+    }
+
+
+# ==================== RECALL ====================
+
+def read_crawler_rows(filepath: str, columns: Dict[str, str]) -> List[Dict]:
+    """Read (page, id, name) of every row the crawler exported."""
+    if not os.path.exists(filepath):
+        return []
+    wb = load_workbook(filepath, read_only=True)
+    ws = wb.active
+    rows = ws.iter_rows(values_only=True)
+    header = [str(h) if h is not None else '' for h in next(rows, [])]
+    index = {key: header.index(col) for key, col in columns.items() if col in header}
+    result = []
+    for row in rows:
+        result.append({
+            key: (str(row[i]) if i < len(row) and row[i] is not None else '')
+            for key, i in index.items()
+        })
+    wb.close()
+    return result
+
+
+def measure_recall(rows: List[Dict], ground_truth: Dict[str, Dict]) -> Dict:
+    """Share of ground-truth fields (matched by id, else name) and pages found in the crawler output."""
+    found_ids = {}
+    found_names = {}
+    for row in rows:
+        page = row.get('page', '')
+        if row.get('id'):
+            found_ids.setdefault(page, set()).add(row['id'])
+        if row.get('name'):
+            found_names.setdefault(page, set()).add(row['name'])
+
+    expected_fields = matched_fields = 0
+    expected_pages = matched_pages = 0
+    missed_pages = []
+    for page, truth in ground_truth.items():
+        if not truth['fields']:
+            continue
+        expected_pages += 1
+        page_matched = 0
+        for field in truth['fields']:
+            expected_fields += 1
+            if (field['id'] and field['id'] in found_ids.get(page, ())) or field['name'] in found_names.get(page, ()):
+                page_matched += 1
+        matched_fields += page_matched
+        if page_matched:
+            matched_pages += 1
+        else:
+            missed_pages.append(page)
+
+    truth_keys = {
+        (page, f['id'] or f['name'])
+        for page, truth in ground_truth.items() for f in truth['fields']
+    }
+    unexpected = sum(
+        1 for row in rows
+        if (row.get('page', ''), row.get('id') or row.get('name')) not in truth_keys
+    )
+
+    return {
+        'expected_fields': expected_fields,
+        'matched_fields': matched_fields,
+        'field_recall': round(matched_fields / expected_fields, 4) if expected_fields else None,
+        'expected_pages': expected_pages,
+        'matched_pages': matched_pages,
+        'page_recall': round(matched_pages / expected_pages, 4) if expected_pages else None,
+        'unexpected_rows': unexpected,
+        'missed_pages_sample': missed_pages[:20],
+    }
+
+
+# ==================== RUN ====================
+
+def trim_hierarchy(tree: List[Dict], max_pages: int) -> List[Dict]:
+    """Copy of the hierarchy keeping only the first max_pages leaves (and their parents)."""
+    remaining = [max_pages]
+
+    def trim(node):
+        if node.get('type') == 'leaf':
+            if remaining[0] <= 0:
+                return None
+            remaining[0] -= 1
+            return dict(node)
+        children = [c for c in (trim(child) for child in node.get('children', [])) if c is not None]
+        if not children and node.get('children'):
+            return None
+        return {**node, 'children': children}
+
+    trimmed = []
+    for section in tree:
+        kept = trim(section)
+        if kept is not None:
+            trimmed.append(kept)
+    return trimmed
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return ''
+
+
+def run_benchmark(crawler_name: str, max_pages: int = None, mock_config: Dict = None, keep_workdir: bool = False,
+                  browser_profile: str = None) -> Dict:
+    """Run one crawler end to end against a fresh mock server and return the metrics."""
+    if crawler_name not in CRAWLERS:
+        raise ValueError(f"Unknown crawler '{crawler_name}' (choose from {', '.join(CRAWLERS)})")
+    spec = CRAWLERS[crawler_name]
+
+    workdir = tempfile.mkdtemp(prefix=f'bench_{crawler_name}_')
+    config = {**DEFAULT_MOCK_CONFIG, 'port': 0, **(mock_config or {})}
+    if max_pages:
+        hierarchy_file = os.path.join(workdir, 'menu_hierarchy_bench.json')
+        atomic_write_json(hierarchy_file, trim_hierarchy(load_hierarchy(config['hierarchy_file']), max_pages), keep_backup=False)
+        config['hierarchy_file'] = hierarchy_file
+
+    ground_truth = build_ground_truth(config)
+    server, url = start_mock_server(config)
+    print(f"🧪 Mock T24 at {url} ({len(ground_truth)} pages)")
+
+    # Both env var families used by the crawlers; the mock accepts any non-empty credentials
+    env_overrides = {
+        'APP_URL': url, 'APP_USERNAME': config['username'] or 'BENCH', 'APP_PASSWORD': config['password'] or 'bench',
+        'T24_URL': url, 'T24_USERNAME': config['username'] or 'BENCH', 'T24_PASSWORD': config['password'] or 'bench',
+        'MENU_HIERARCHY_FILE': config['hierarchy_file'],
+        'BROWSER_PROFILE': get_profile_name(browser_profile),
+    }
+    saved_env = {key: os.environ.get(key) for key in env_overrides}
+    os.environ.update(env_overrides)
+
+    module = importlib.import_module(spec['module'])
+    if hasattr(module, 'HIERARCHY_FILE'):
+        module.HIERARCHY_FILE = config['hierarchy_file']
+
+    drivers, command_times = [], []
+    original_setup = instrument_setup_driver(module, drivers, command_times)
+    sampler = RssSampler(drivers)
+    original_cwd = os.getcwd()
+    error = ''
+
+    os.chdir(workdir)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        getattr(module, crawler_name)()
+    except BaseException as e:  # crawl errors (and Ctrl+C) still produce a partial report
+        error = f"{type(e).__name__}: {e}"
+        print(f"❌ Crawler stopped: {error}")
+    finally:
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        module.setup_driver = original_setup
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        rows = read_crawler_rows(os.path.join(workdir, spec['output_file']), spec['columns'])
+        os.chdir(original_cwd)
+        server.shutdown()
+        server.server_close()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    # Page boundaries = popup requests; last page ends with the crawl
+    popup_times = [t for t, _ in server.popup_log]
+    boundaries = popup_times + [start + elapsed]
+    page_latencies = [(boundaries[i + 1] - boundaries[i]) * 1000 for i in range(len(popup_times))]
+
+    setup_commands = sum(1 for t in command_times if not popup_times or t < popup_times[0])
+    page_commands = []
+    for i in range(len(popup_times)):
+        page_commands.append(sum(1 for t in command_times if boundaries[i] <= t < boundaries[i + 1]))
+
+    pages = len(popup_times)
+    result = {
+        'crawler': crawler_name,
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'error': error,
+        'browser': describe_profile(env_overrides['BROWSER_PROFILE']),
+        'mock_config': {k: v for k, v in config.items() if k not in ('username', 'password')},
+        'pages_expected': len(ground_truth),
+        'pages_visited': pages,
+        'elapsed_s': round(elapsed, 2),
+        'pages_per_min': round(pages / elapsed * 60, 2) if elapsed else 0,
+        'latency_ms': {
+            'p50': round(percentile(page_latencies, 50) or 0, 1),
+            'p95': round(percentile(page_latencies, 95) or 0, 1),
+            'p99': round(percentile(page_latencies, 99) or 0, 1),
+            'mean': round(sum(page_latencies) / pages, 1) if pages else 0,
+        },
+        'webdriver_commands': {
+            'total': len(command_times),
+            'setup': setup_commands,
+            'per_page_mean': round(sum(page_commands) / pages, 1) if pages else 0,
+            'per_page_p95': percentile(page_commands, 95) or 0,
+        },
+        'phases': phase_breakdown(drivers, pages),
+        'peak_rss_mb': round(sampler.peak_kb / 1024, 1),
+        'peak_browser_rss_mb': round(sampler.peak_browser_kb / 1024, 1),
+        'logins': server.stats.get('logins', 0),
+        'mock_requests': dict(server.stats),
+        'rows_exported': len(rows),
+        'recall': measure_recall(rows, ground_truth),
+    }
+    return result
+
+
+def save_result(result: Dict) -> str:
+    """Write a run to benchmark_results/<crawler>_<timestamp>.json."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    filepath = os.path.join(RESULTS_DIR, f"{result['crawler']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    atomic_write_json(filepath, result, keep_backup=False, indent=2)
+    return filepath
+
+
+def print_result(result: Dict):
+    print("\n" + "="*70)
+    print(f"BENCHMARK: {result['crawler']}  (commit {result['commit'] or '?'}, browser profile {result['browser']['browser_profile']})")
+    print("="*70)
+    print(f"📄 Pages: {result['pages_visited']}/{result['pages_expected']} in {result['elapsed_s']}s "
+          f"→ {result['pages_per_min']} pages/min")
+    lat = result['latency_ms']
+    print(f"⏱️ Per-page latency: p50 {lat['p50']}ms | p95 {lat['p95']}ms | p99 {lat['p99']}ms")
+    cmds = result['webdriver_commands']
+    print(f"🔁 WebDriver commands: {cmds['per_page_mean']}/page (p95 {cmds['per_page_p95']}), {cmds['setup']} setup, {cmds['total']} total")
+    print(f"🧠 Peak RSS: {result['peak_rss_mb']} MB (browser {result['peak_browser_rss_mb']} MB)")
+    recall = result['recall']
+    print(f"🎯 Recall: fields {recall['field_recall']} ({recall['matched_fields']}/{recall['expected_fields']}), "
+          f"pages {recall['page_recall']} ({recall['matched_pages']}/{recall['expected_pages']}), "
+          f"{recall['unexpected_rows']} unexpected rows")
+    if result['error']:
+        print(f"⚠️ Stopped early: {result['error']}")
+
+
+def main():
+    crawler_name = sys.argv[1] if len(sys.argv) > 1 else 'crawl_fast'
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    browser_profile = sys.argv[3] if len(sys.argv) > 3 else None
+
+    result = run_benchmark(crawler_name, max_pages, browser_profile=browser_profile)
+    print_result(result)
+    print(f"\n💾 Saved to {save_result(result)}")
+
+
+if __name__ == '__main__':
+    main()
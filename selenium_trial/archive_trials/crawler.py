@@ -2,49 +2,73 @@
 
 import time
 import os
-import json
-from typing import List, Dict, Set
+import sys
+from typing import List, Dict, Set, Iterable
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.action_chains import ActionChains
 import openpyxl
 from openpyxl import Workbook
-from openpyxl import load_workbook
+
+# Shared helpers live in the parent selenium_trial/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from menu_expansion import expand_menus_batched
+from browser_profiles import get_profile_name, build_chrome_options
+from docommand_dispatch import DEFAULT_HIERARCHY_FILE, load_leaf_pages, open_page_by_docommand, docommand_id_from_href
+from page_readiness import wait_for_page_ready
+from bulk_extraction import extract_fields_bulk
+from cdp_extraction import use_cdp_backend, extract_fields_cdp
+from page_fingerprint import FingerprintCache, page_fingerprint
+from ui_map_store import open_store
+from seen_rows_index import SeenRowIndex, open_for_journal, save_for_journal, intern_row
+from incremental_crawl import INCREMENTAL_FROM, diff_hierarchies, split_previous_rows, print_diff, save_incremental_report
+from streaming_output import JsonlSink, iter_jsonl
+from checkpoint_journal import CheckpointJournal
+from atomic_io import save_workbook_atomic, load_workbook_with_fallback
+from browser_recycling import RecyclePolicy, RECYCLE_COLUMNS
+from driver_instrumentation import PHASE_COLUMNS, instrument_driver, crawl_phase, start_page, page_phase_stats, print_phase_summary
 
 # Load environment variables
 load_dotenv()
 
-# Checkpoint file
+# Checkpoint journal: one line per processed page (see checkpoint_journal.py)
 CHECKPOINT_FILE = 'crawler_checkpoint.json'
+checkpoint_journal = CheckpointJournal(CHECKPOINT_FILE)
+
+# Dispatch mode: open pages with docommand(<id>) from the menu hierarchy instead of clicking links
+DISPATCH_MODE = os.getenv('DISPATCH_MODE', 'click').lower() == 'docommand'
+HIERARCHY_FILE = os.getenv('MENU_HIERARCHY_FILE', DEFAULT_HIERARCHY_FILE)
 
 
 def load_checkpoint() -> Dict:
-    """Load checkpoint data from file."""
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {'processed_items': [], 'last_index': 0}
-    return {'processed_items': [], 'last_index': 0}
+    """Replay the checkpoint journal: compacted snapshot + one record per processed page."""
+    try:
+        state, records = checkpoint_journal.load()
+    except Exception:
+        return {'processed_items': [], 'last_index': 0}
+    
+    processed_items = list(state.get('processed_items', []))
+    last_index = state.get('last_index', 0)
+    for record in records:
+        processed_items.append(record.get('item'))
+        last_index = max(last_index, record.get('index', 0))
+    
+    return {'processed_items': processed_items, 'last_index': last_index}
 
 
-def save_checkpoint(processed_items: List[str], last_index: int):
-    """Save checkpoint data to file with immediate flush."""
+def save_checkpoint(item: str, last_index: int, processed_items: Set[str]):
+    """Append one processed page to the checkpoint journal; compact into a snapshot when due."""
     try:
-        with open(CHECKPOINT_FILE, 'w') as f:
-            # Remove indent for faster writing, remove fsync for speed
-            json.dump({
-                'processed_items': processed_items,
+        checkpoint_journal.append({'item': item, 'index': last_index})
+        if checkpoint_journal.needs_compaction():
+            checkpoint_journal.compact({
+                'processed_items': sorted(processed_items),
                 'last_index': last_index,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }, f)
-            f.flush()  # Flush to OS buffer (fast)
-            # Removed os.fsync() - too slow, flush() is enough
+            })
     except Exception as e:
         print(f"⚠️ Failed to save checkpoint: {e}")
 
@@ -53,7 +77,7 @@ def clear_checkpoint():
     """Clear checkpoint file after successful completion."""
     try:
         if os.path.exists(CHECKPOINT_FILE):
-            os.remove(CHECKPOINT_FILE)
+            checkpoint_journal.clear()
             print("✅ Checkpoint cleared")
     except Exception as e:
         print(f"⚠️ Failed to clear checkpoint: {e}")
@@ -63,7 +87,7 @@ def load_existing_data(filepath: str) -> List[Dict]:
     """Load existing data from Excel file if resuming."""
     if os.path.exists(filepath):
         try:
-            wb = load_workbook(filepath)
+            wb = load_workbook_with_fallback(filepath, read_only=True)
             ws = wb.active
             data = []
             
@@ -80,6 +104,7 @@ def load_existing_data(filepath: str) -> List[Dict]:
                         'tagName': row[6],
                         'type': row[7]
                     })
+            wb.close()
             
             print(f"📂 Loaded {len(data)} existing records from {filepath}")
             return data
@@ -89,16 +114,15 @@ def load_existing_data(filepath: str) -> List[Dict]:
     return []
 
 
-def setup_driver():
-    """Setup Chrome driver with options."""
-    chrome_options = Options()
-    # chrome_options.add_argument('--headless')  # Comment out to see the browser
-    chrome_options.add_argument('--start-maximized')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+def setup_driver(profile: str = None):
+    """Setup Chrome driver with the run's browser profile (BROWSER_PROFILE=default|performance)."""
+    profile = get_profile_name(profile)
+    chrome_options = build_chrome_options(profile)
     
     driver = webdriver.Chrome(options=chrome_options)
     driver.implicitly_wait(3)
+    driver.browser_profile = profile  # recorded in the run stats
+    instrument_driver(driver)  # count/time every WebDriver command per crawl phase
     return driver
 
 
@@ -158,15 +182,46 @@ def get_menu_frame(driver, wait=False):
 
 def extract_xpaths_from_element(element) -> Dict:
     """Extract XPath and attributes from a single element."""
+    try:
+        # Get attributes
+        attrs = {
+            'id': element.get_attribute('id') or '',
+            'name': element.get_attribute('name') or '',
+            'className': element.get_attribute('class') or '',
+            'tagName': element.tag_name,
+            'type': element.get_attribute('type') or ''
+        }
+    except Exception as e:
+        print(f"    ⚠️ Error extracting from element: {e}")
+        return {}
+    
+    return build_field_data(attrs)
+
+
+def row_dedup_key(item: Dict) -> tuple:
+    """Deduplication key of a uiMap row - page + xpath + all element columns."""
+    return (
+        item.get('page', ''),
+        item.get('relativeXpath', ''),
+        item.get('elementName', ''),
+        item.get('id', ''),
+        item.get('name', ''),
+        item.get('className', ''),
+        item.get('tagName', ''),
+        item.get('type', '')
+    )
+
+
+def build_field_data(attrs: Dict) -> Dict:
+    """Build a uiMap row (prefixed elementName + relativeXpath) from field attributes."""
     data = {}
     
     try:
-        # Get attributes
-        data['id'] = element.get_attribute('id') or ''
-        data['name'] = element.get_attribute('name') or ''
-        data['className'] = element.get_attribute('class') or ''
-        data['tagName'] = element.tag_name
-        data['type'] = element.get_attribute('type') or ''
+        data['id'] = attrs.get('id') or ''
+        data['name'] = attrs.get('name') or ''
+        data['className'] = attrs.get('className') or ''
+        data['tagName'] = attrs.get('tagName') or ''
+        data['type'] = attrs.get('type') or ''
         
         # Generate element name with prefix
         elem_id = data['id']
@@ -275,10 +330,22 @@ def extract_xpaths_from_page(driver, page_name: str, global_seen_xpaths: set = N
     '''
     
     try:
-        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        fields = None
+        if use_cdp_backend():
+            try:
+                # Read the fields from one DOM snapshot (top document, as below)
+                fields = [build_field_data(field) for field in extract_fields_cdp(driver, selector, frames=False)[0][1]]
+            except Exception:
+                fields = None
+        if fields is None:
+            try:
+                # One script returns every field's attributes - no per-element round trips
+                fields = [build_field_data(field) for field in extract_fields_bulk(driver, selector)]
+            except Exception:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                fields = [extract_xpaths_from_element(elem) for elem in elements]
         
-        for elem in elements:
-            data = extract_xpaths_from_element(elem)
+        for data in fields:
             xpath = data.get('relativeXpath')
             
             if xpath:
@@ -306,18 +373,17 @@ def extract_xpaths_from_page(driver, page_name: str, global_seen_xpaths: set = N
     return elements_data
 
 
-def export_to_excel(data: List[Dict], filepath: str, sheet_name: str = 'T24ModelBank'):
-    """Export data to Excel - overwrites file with all data."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
+def export_to_excel(data: Iterable[Dict], filepath: str, sheet_name: str = 'T24ModelBank'):
+    """Export data to Excel - overwrites file with all data (streamed, write-only workbook)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
     
     # Headers
     headers = ['pageName', 'elementName', 'relativeXpath', 'elementId', 'elementNameAttr', 'className', 'tagName', 'inputType']
     ws.append(headers)
     
     # Data rows - deduplicate by complete row, not just XPath
-    seen_rows = set()
+    seen_rows = SeenRowIndex()
     unique_count = 0
     for row in data:
         # Create key from all columns
@@ -347,24 +413,34 @@ def export_to_excel(data: List[Dict], filepath: str, sheet_name: str = 'T24Model
             ])
             unique_count += 1
     
-    wb.save(filepath)
+    save_workbook_atomic(wb, filepath)
     print(f"💾 Saved {unique_count} unique rows to {filepath}")
 
 
-def export_stats_to_excel(stats_data: List[Dict], filepath: str):
-    """Export page statistics to Excel."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = 'Page Stats'
+def export_stats_to_excel(stats_data: Iterable[Dict], filepath: str):
+    """Export page statistics to Excel (with per-page readiness wait timings when recorded).
+    Browser recycle events (rows with event='recycle') go to their own sheet."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Page Stats')
     
     # Headers
-    ws.append(['pageName', 'xpath_count'])
+    wait_columns = ['window_ms', 'ready_state_ms', 'frame_ms', 'fields_ms', 'total_wait_ms', 'timed_out'] + PHASE_COLUMNS + ['browser_profile', 'fingerprint_cache']
+    ws.append(['pageName', 'xpath_count'] + wait_columns)
     
     # Data rows
+    recycle_events = []
     for row in stats_data:
-        ws.append([row['page'], row['count']])
+        if row.get('event') == 'recycle':
+            recycle_events.append(row)
+            continue
+        ws.append([row['page'], row['count']] + [row.get(col, '') for col in wait_columns])
     
-    wb.save(filepath)
+    recycle_ws = wb.create_sheet('Browser Recycles')
+    recycle_ws.append(RECYCLE_COLUMNS)
+    for event in recycle_events:
+        recycle_ws.append([event.get(col, '') for col in RECYCLE_COLUMNS])
+    
+    save_workbook_atomic(wb, filepath)
 
 
 def expand_all_menus_recursive(driver):
@@ -374,6 +450,13 @@ def expand_all_menus_recursive(driver):
     driver.switch_to.default_content()
     get_menu_frame(driver, wait=True)  # Only wait on initial call
     
+    try:
+        expanded_total = expand_menus_batched(driver)['total']
+        print(f"📂 Expansion complete: {expanded_total} total nodes expanded\n")
+        return expanded_total
+    except Exception as e:
+        print(f"⚠️ Batched expansion failed ({str(e)[:60]}), falling back to clicking icons")
+    
     expanded_total = 0
     max_passes = 20  # Maximum expansion passes
     
@@ -426,6 +509,15 @@ def expand_all_menus_recursive(driver):
     return expanded_total
 
 
+def reopen_session(driver, url: str, username: str, password: str):
+    """Login on a fresh driver and bring the menu back to the state the crawl loop expects."""
+    login(driver, url, username, password)
+    if not get_menu_frame(driver, wait=True):
+        raise RuntimeError("menu frame not found after re-login")
+    if not DISPATCH_MODE:
+        expand_all_menus_recursive(driver)
+
+
 def crawl_menu():
     """Main crawler function with automatic recursive menu expansion."""
     # Configuration
@@ -434,40 +526,65 @@ def crawl_menu():
     PASSWORD = os.getenv('APP_PASSWORD', '123456')
     OUTPUT_FILE = 'uiMap_selenium_fullrun_final_stats.xlsx'
     STATS_FILE = 'page_stats_final.xlsx'
+    # Rows/stats stream here as pages complete; the .xlsx files are built from them once at the end
+    ROWS_FILE = 'uiMap_selenium_fullrun_final_stats.rows.jsonl'
+    STATS_ROWS_FILE = 'page_stats_final.rows.jsonl'
+    SEEN_INDEX_FILE = 'uiMap_selenium_fullrun_final_stats.seen.idx'  # row digests of ROWS_FILE, mapped on resume
     
     driver = setup_driver()
+    recycle_policy = RecyclePolicy()
+    fingerprint_cache = FingerprintCache()  # unchanged forms reuse last run's rows
+    ui_store = open_store()  # SQLite UI map (pages/fields/stats per run); the .xlsx is exported from the rows
     
     # Load checkpoint and existing data
     checkpoint = load_checkpoint()
     processed_items_set = set(checkpoint.get('processed_items', []))
     start_index = checkpoint.get('last_index', 0)
     
-    # Load existing data if resuming (check if Excel exists)
-    all_data = []
-    stats_data = []  # Track page statistics
-    global_seen_rows = set()  # GLOBAL deduplication: track complete rows, not just XPaths
-    
-    if os.path.exists(OUTPUT_FILE):
-        all_data = load_existing_data(OUTPUT_FILE)
-        print(f"📂 Loaded {len(all_data)} existing records from {OUTPUT_FILE}")
-        # Build global seen set from existing data - using ALL columns as key
-        for item in all_data:
-            row_key = (
-                item.get('page', ''),
-                item.get('relativeXpath', ''),
-                item.get('elementName', ''),
-                item.get('id', ''),
-                item.get('name', ''),
-                item.get('className', ''),
-                item.get('tagName', ''),
-                item.get('type', '')
-            )
-            global_seen_rows.add(row_key)
+    # Load existing data if resuming (row journal first, Excel from older runs otherwise)
+    row_sink = JsonlSink(ROWS_FILE)
+    stats_sink = JsonlSink(STATS_ROWS_FILE)
+    
+    # Incremental mode: only leaves added/changed since the previous hierarchy get crawled
+    incremental = None
+    carried_rows = []
+    if INCREMENTAL_FROM:
+        incremental = diff_hierarchies(INCREMENTAL_FROM, HIERARCHY_FILE)
+        print_diff(incremental)
+        if os.path.getsize(ROWS_FILE) == 0 and not os.path.exists(OUTPUT_FILE):
+            print(f"⚠️ No previous UI map ({OUTPUT_FILE}) to carry rows from - crawling every page")
+            incremental = None
+    
+    if os.path.getsize(ROWS_FILE) == 0 and os.path.exists(OUTPUT_FILE):
+        previous_rows = [intern_row(row) for row in load_existing_data(OUTPUT_FILE)]
+        if incremental:
+            # Unchanged pages keep their rows; removed pages are pruned
+            previous_rows, pruned = split_previous_rows(previous_rows, incremental)
+            save_incremental_report(incremental, len(previous_rows), pruned)
+            print(f"   📦 Carried over {len(previous_rows)} rows, pruned {sum(pruned.values())} rows of {len(pruned)} removed pages")
+        row_sink.append(previous_rows)
+        carried_rows = previous_rows
+    
+    # GLOBAL deduplication: digests of complete rows (ALL columns as key), not just XPaths
+    global_seen_rows = open_for_journal(SEEN_INDEX_FILE, ROWS_FILE, lambda: iter_jsonl(ROWS_FILE), row_dedup_key)
+    total_rows = len(global_seen_rows)
+    unjournaled_pages = 0  # pages whose keys went into the index but whose rows never reached the journal
+    if total_rows:
+        print(f"📂 Loaded {total_rows} existing records from {ROWS_FILE}")
         print(f"   🔍 Tracking {len(global_seen_rows)} existing rows for deduplication")
     
     if start_index > 0:
         print(f"\n🔄 RESUMING from index {start_index} ({len(processed_items_set)} items already processed)\n")
     
+    run_id = None
+    if ui_store:
+        run_id = ui_store.start_run('crawl_menu', resume=start_index > 0, browser_profile=driver.browser_profile,
+                                    hierarchy_file=HIERARCHY_FILE if DISPATCH_MODE or incremental else '')
+        if carried_rows:
+            ui_store.record_rows(run_id, carried_rows)
+        print(f"🗄️ UI map store: run #{run_id} in {ui_store.path}")
+    
+    total = None
     try:
         # Login
         login(driver, URL, USERNAME, PASSWORD)
@@ -477,37 +594,52 @@ def crawl_menu():
             print("❌ Failed to find menu frame")
             return
         
-        # Find container
-        container = driver.find_element(By.XPATH, "//div[starts-with(@id,'pane')]")
-        print(f"📦 Container found: {container.get_attribute('id')}\n")
-        
-        # Auto-expand all menus
-        expand_all_menus_recursive(driver)
-        
-        # Re-query after expansion and BUILD LINK LIST ONCE
-        driver.switch_to.default_content()
-        get_menu_frame(driver)  # No wait needed - already loaded
-        container = driver.find_element(By.XPATH, "//div[starts-with(@id,'pane')]")
-        
-        # Find ALL leaf nodes with docommand
-        all_leaves = container.find_elements(By.XPATH, ".//li[.//a[starts-with(@href,'javascript:docommand(')]]")
+        if DISPATCH_MODE:
+            # Page list and docommand ids come from the hierarchy file - no expansion or link scan
+            print(f"\n📋 Dispatch mode: loading menu items from {HIERARCHY_FILE}")
+            leaf_pages = load_leaf_pages(HIERARCHY_FILE)
+            items_to_process = [page['text'] for page in leaf_pages]
+            command_ids = [page['unique_id'] for page in leaf_pages]
+        else:
+            # Find container
+            container = driver.find_element(By.XPATH, "//div[starts-with(@id,'pane')]")
+            print(f"📦 Container found: {container.get_attribute('id')}\n")
+            
+            # Auto-expand all menus
+            expand_all_menus_recursive(driver)
+            
+            # Re-query after expansion and BUILD LINK LIST ONCE
+            driver.switch_to.default_content()
+            get_menu_frame(driver)  # No wait needed - already loaded
+            container = driver.find_element(By.XPATH, "//div[starts-with(@id,'pane')]")
+            
+            # Find ALL leaf nodes with docommand
+            all_leaves = container.find_elements(By.XPATH, ".//li[.//a[starts-with(@href,'javascript:docommand(')]]")
+            
+            # Build a simple list of link texts only (hierarchy extraction moved to click time)
+            print(f"\n📋 Building menu item list...")
+            items_to_process = []
+            for leaf in all_leaves:
+                if leaf.is_displayed():
+                    try:
+                        link = leaf.find_element(By.XPATH, ".//a")
+                        if link.is_displayed():
+                            text = link.text.strip() or "Unknown"
+                            # Store just text - get hierarchy when actually clicking
+                            items_to_process.append(text)
+                    except:
+                        pass
         
-        # Build a simple list of link texts only (hierarchy extraction moved to click time)
-        print(f"\n📋 Building menu item list...")
-        items_to_process = []
-        for leaf in all_leaves:
-            if leaf.is_displayed():
-                try:
-                    link = leaf.find_element(By.XPATH, ".//a")
-                    if link.is_displayed():
-                        text = link.text.strip() or "Unknown"
-                        # Store just text - get hierarchy when actually clicking
-                        items_to_process.append(text)
-                except:
-                    pass
+        if incremental:
+            keep = [i for i, text in enumerate(items_to_process) if text in incremental['crawl_pages']]
+            print(f"🔀 Incremental: {len(keep)} of {len(items_to_process)} leaves changed since {os.path.basename(INCREMENTAL_FROM)}")
+            items_to_process = [items_to_process[i] for i in keep]
+            if DISPATCH_MODE:
+                command_ids = [command_ids[i] for i in keep]
         
         total = len(items_to_process)
-        print(f"🎯 Found {total} visible/clickable leaf nodes\n")
+        print(f"🎯 Found {total} visible/clickable leaf nodes")
+        print(f"♻️ Browser recycling: {recycle_policy.describe()}\n")
         
         # Process each item by finding it fresh each time (avoid stale element)
         for i in range(total):
@@ -517,99 +649,152 @@ def crawl_menu():
             
             text = items_to_process[i]
             
+            # Restart the browser every N pages / above the RSS limit - rows are already on disk,
+            # the loop just carries on from this index with the new session
+            recycle_reason = recycle_policy.should_recycle(driver)
+            if recycle_reason:
+                try:
+                    driver, event = recycle_policy.recycle(
+                        driver, recycle_reason, setup_driver,
+                        lambda d: reopen_session(d, URL, USERNAME, PASSWORD),
+                        page_index=i, page=text
+                    )
+                except Exception as e:
+                    # recycle() already retried and quit every browser it started
+                    print(f"❌ Browser could not be restarted ({str(e)[:80]})")
+                    print(f"💾 Progress saved in checkpoint. Run script again to resume from [{i+1}/{total}]")
+                    driver = None
+                    break
+                stats_sink.append([{'event': 'recycle', **event}])
+            
             print(f"[{i+1}/{total}] 🖱️ Clicking: {text}")
+            start_page(driver)
             
             # Re-query just this ONE link by text
-            driver.switch_to.default_content()
-            get_menu_frame(driver)  # No wait - frames already loaded
+            with crawl_phase(driver, 'menu_frame'):
+                driver.switch_to.default_content()
+                get_menu_frame(driver)  # No wait - frames already loaded
             
-            try:
-                # Find the specific link by its text
-                link = driver.find_element(By.XPATH, f".//a[starts-with(@href='javascript:docommand(') and text()='{text}']")
-            except:
-                # Fallback: try finding by partial text if exact match fails
-                try:
-                    link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{text[:20]}')]")
-                except:
+            link = None
+            if not DISPATCH_MODE:
+                with crawl_phase(driver, 'link_lookup'):
+                    try:
+                        # Find the specific link by its text
+                        link = driver.find_element(By.XPATH, f".//a[starts-with(@href='javascript:docommand(') and text()='{text}']")
+                    except:
+                        # Fallback: try finding by partial text if exact match fails
+                        try:
+                            link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{text[:20]}')]")
+                        except:
+                            link = None
+                if link is None:
                     print(f"    ⚠️ Could not find link, skipping")
                     continue
             
+            command_id = command_ids[i] if DISPATCH_MODE else None
+            if command_id is None and fingerprint_cache.enabled:
+                with crawl_phase(driver, 'link_lookup'):
+                    try:
+                        command_id = docommand_id_from_href(link.get_attribute('href'))
+                    except:
+                        command_id = None
+            
             # Check if already processed (by page name only)
             if text in processed_items_set:
                 print(f"    ⏭️ Already processed")
                 continue
             
-            # Scroll into view before clicking (minimal delay)
-            try:
-                driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", link)
-            except:
-                pass
-            
-            # Store original window handle
-            main_window = driver.current_window_handle
+            with crawl_phase(driver, 'click'):
+                # Scroll into view before clicking (minimal delay)
+                if link is not None:
+                    try:
+                        driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", link)
+                    except:
+                        pass
+                
+                # Store original window handle (and all known handles to spot the popup)
+                main_window = driver.current_window_handle
+                known_handles = driver.window_handles
             
             # Click the link with multiple fallback methods
             try:
-                # Try regular click first
-                try:
-                    link.click()
-                except:
-                    # Try JavaScript click as fallback
-                    driver.execute_script("arguments[0].click();", link)
+                with crawl_phase(driver, 'click'):
+                    if DISPATCH_MODE:
+                        # Invoke the menu's own docommand with the stored id
+                        opened = open_page_by_docommand(driver, command_ids[i])
+                    else:
+                        opened = True
+                        # Try regular click first
+                        try:
+                            link.click()
+                        except:
+                            # Try JavaScript click as fallback
+                            driver.execute_script("arguments[0].click();", link)
+                if not opened:
+                    print(f"    ⚠️ docommand() not available in menu frame, skipping")
+                    continue
                 
-                time.sleep(0.3)  # Reduced wait for popup
+                # Wait for popup window, readyState, nested frame and settled field count
+                with crawl_phase(driver, 'popup_wait'):
+                    readiness = wait_for_page_ready(driver, known_handles)
                 
-                # Check if popup opened
-                windows = driver.window_handles
-                if len(windows) > 1:
-                    # Switch to popup
-                    driver.switch_to.window(windows[-1])
-                    # Removed verbose logging for speed
-                    
-                    time.sleep(0.2)  # Minimal wait for page load
-                    
+                if readiness['popup_opened']:
                     # Extract XPaths with GLOBAL row-level deduplication
-                    extracted = extract_xpaths_from_page(driver, text, global_seen_rows)
-                    all_data.extend(extracted)
-                    stats_data.append({'page': text, 'count': len(extracted)})
-                    print(f"    ✅ {len(extracted)} elements")  # Condensed output
+                    # (same form as last run -> cached rows, no extraction)
+                    with crawl_phase(driver, 'extract'):
+                        unjournaled_pages += 1
+                        fingerprint = page_fingerprint(driver) if fingerprint_cache.enabled else None
+                        page_rows = fingerprint_cache.lookup(command_id, fingerprint, text)
+                        cache_result = 'miss' if fingerprint_cache.enabled else ''
+                        if page_rows is not None:
+                            cache_result = 'hit'
+                        else:
+                            # The cache keeps the whole page - a replayed page must not cache as empty
+                            page_rows = extract_xpaths_from_page(driver, text)
+                            fingerprint_cache.store(command_id, fingerprint, text, page_rows)
+                        extracted = [row for row in page_rows if row_dedup_key(row) not in global_seen_rows]
+                        global_seen_rows.update(row_dedup_key(row) for row in extracted)
+                    row_sink.append(extracted)
+                    unjournaled_pages -= 1
+                    total_rows += len(extracted)
+                    cached_note = ', cached' if cache_result == 'hit' else ''
+                    print(f"    ✅ {len(extracted)} elements (waited {readiness['total_wait_ms']}ms{cached_note})")  # Condensed output
                     
                     # Close popup
-                    driver.close()
-                    driver.switch_to.window(main_window)
+                    with crawl_phase(driver, 'close'):
+                        driver.close()
+                        driver.switch_to.window(main_window)
+                    page_stats = {'page': text, 'count': len(extracted), **readiness, **page_phase_stats(driver),
+                                  'browser_profile': driver.browser_profile, 'fingerprint_cache': cache_result}
                 else:
                     print(f"    ⚠️ No popup opened")
-                    stats_data.append({'page': text, 'count': 0})
+                    extracted = page_rows = []
+                    page_stats = {'page': text, 'count': 0, **readiness, **page_phase_stats(driver), 'browser_profile': driver.browser_profile}
+                stats_sink.append([page_stats])
+                
+                # Page rows + stats in one transaction (the whole page - a replayed page's
+                # rows are all in global_seen_rows and must not wipe what the run stored)
+                if ui_store:
+                    try:
+                        ui_store.record_page(run_id, text, page_rows, page_stats, command_id)
+                    except Exception as store_error:
+                        print(f"    ⚠️ UI map store write failed: {str(store_error)[:60]}")
                 
-                # Mark as processed and save checkpoint every 10 items
+                # Mark as processed - one journal line per page
                 processed_items_set.add(text)
-                if (i + 1) % 10 == 0:
-                    save_checkpoint(list(processed_items_set), i + 1)
+                save_checkpoint(text, i + 1, processed_items_set)
+                recycle_policy.page_done()
                 
-                # Save Excel incrementally every 50 items
+                # Rows are already on disk - just report progress every 50 items
                 if (i + 1) % 50 == 0:
-                    try:
-                        export_to_excel(all_data, OUTPUT_FILE)
-                        export_stats_to_excel(stats_data, STATS_FILE)
-                        print(f"    💾 Checkpoint: Saved {len(all_data)} elements to Excel")
-                    except Exception as save_err:
-                        print(f"    ⚠️ Incremental save failed: {save_err}")
+                    print(f"    💾 Checkpoint: {total_rows} elements in {ROWS_FILE}")
                 
             except Exception as e:
                 print(f"    ❌ Error: {e}")
-                # Even if error, mark as attempted and save checkpoint every 10 items
+                # Even if error, mark as attempted and journal it
                 processed_items_set.add(text)
-                if (i + 1) % 10 == 0:
-                    save_checkpoint(list(processed_items_set), i + 1)
-                
-                # Save Excel on error too (every 50 items)
-                if (i + 1) % 50 == 0 and all_data:
-                    try:
-                        export_to_excel(all_data, OUTPUT_FILE)
-                        export_stats_to_excel(stats_data, STATS_FILE)
-                        print(f"    💾 Checkpoint: Saved {len(all_data)} elements to Excel (after error)")
-                    except Exception as save_err:
-                        print(f"    ⚠️ Incremental save failed: {save_err}")
+                save_checkpoint(text, i + 1, processed_items_set)
+                recycle_policy.page_done()
                 
                 # Return to main window if stuck
                 try:
@@ -617,37 +802,58 @@ def crawl_menu():
                 except:
                     pass
         
-        print(f"\n✨ Complete! Clicked {total} leaves, extracted {len(all_data)} elements")
+        if driver is not None:
+            print(f"\n✨ Complete! Clicked {total} leaves, extracted {total_rows} elements")
+            print_phase_summary(driver, len(processed_items_set))
+        fingerprint_cache.print_summary()
+        if recycle_policy.events:
+            print(f"♻️ Browser recycled {len(recycle_policy.events)} times "
+                  f"({sum(e['recycle_ms'] for e in recycle_policy.events) / 1000:.1f}s total)")
         
     except KeyboardInterrupt:
         print(f"\n\n⚠️ Interrupted by user (Ctrl+C)")
-        print(f"📊 Processed {len(all_data)} elements so far")
+        print(f"📊 Processed {total_rows} elements so far")
     except Exception as e:
         print(f"❌ Error during crawl: {e}")
         import traceback
         traceback.print_exc()
     
     finally:
-        # Always export whatever data was collected
-        if all_data:
-            print(f"\n💾 Exporting {len(all_data)} elements to {OUTPUT_FILE}")
+        row_sink.close()
+        stats_sink.close()
+        fingerprint_cache.close()
+        if ui_store:
+            # An interrupted run stays 'running' so the resumed crawl keeps writing to it
+            if run_id is not None and total is not None and len(processed_items_set) >= total:
+                ui_store.finish_run(run_id, 'complete')
+            ui_store.close()
+        checkpoint_journal.close()
+        
+        # Always export whatever data was collected - one streamed pass over the row journal
+        if total_rows:
+            print(f"\n💾 Exporting {total_rows} elements to {OUTPUT_FILE}")
             try:
-                export_to_excel(all_data, OUTPUT_FILE)
-                export_stats_to_excel(stats_data, STATS_FILE)
+                export_to_excel(iter_jsonl(ROWS_FILE), OUTPUT_FILE)
+                export_stats_to_excel(iter_jsonl(STATS_ROWS_FILE), STATS_FILE)
                 print(f"✅ Successfully exported to {OUTPUT_FILE}")
                 print(f"✅ Successfully exported stats to {STATS_FILE}")
                 
-                # Clear checkpoint only if all items processed
-                if len(processed_items_set) >= total:
+                # Clear checkpoint (and row journals) only if all items processed
+                if total is not None and len(processed_items_set) >= total:
                     clear_checkpoint()
+                    row_sink.remove()
+                    stats_sink.remove()
                     print("✅ All items processed - checkpoint cleared")
             except Exception as export_error:
                 print(f"❌ Export failed: {export_error}")
         else:
             print("\n⚠️ No data collected to export")
+        if unjournaled_pages == 0:  # otherwise resume rebuilds the index from the journal
+            save_for_journal(global_seen_rows, SEEN_INDEX_FILE, ROWS_FILE)
         
-        print("\n🔚 Closing browser...")
-        driver.quit()
+        if driver is not None:
+            print("\n🔚 Closing browser...")
+            driver.quit()
 
 
 if __name__ == '__main__':
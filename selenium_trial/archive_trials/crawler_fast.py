@@ -12,7 +12,6 @@ Speed optimizations:
 
 import time
 import os
-import json
 from typing import List, Dict, Set
 from dotenv import load_dotenv
 from selenium import webdriver
@@ -20,7 +19,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import openpyxl
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
 
 load_dotenv()
 
@@ -31,14 +30,28 @@ CHECKPOINT_FILE = 'crawler_fast_checkpoint.json'
 MAX_RETRIES = 2  # Retry failed pages up to 2 times
 
 from crawler import setup_driver, login, get_menu_frame
+from menu_expansion import expand_menus_batched
+from bulk_extraction import extract_fields_bulk
+from frame_walker import extract_across_frames, load_frame_cache, save_frame_cache
+from cdp_extraction import use_cdp_backend, extract_fields_cdp
+from ui_map_store import open_store
+from seen_rows_index import SeenRowIndex
+from atomic_io import atomic_write_json, load_json_validated, load_workbook_with_fallback, save_workbook_atomic, backup_path
+from browser_recycling import RecyclePolicy, RECYCLE_COLUMNS
+from driver_instrumentation import PHASE_COLUMNS, crawl_phase, start_page, page_phase_values, print_phase_summary, carry_run_totals
 
 
 def expand_all_menus_fast(driver):
-    """Expand all menus - FAST version without sleeps."""
+    """Expand all menus - FAST version: whole tree in one script, click loop as fallback."""
     print("🔧 Auto-expanding all menu items...")
     driver.switch_to.default_content()
     get_menu_frame(driver)
     
+    try:
+        return expand_menus_batched(driver, whole_tree=True)['total']
+    except Exception as e:
+        print(f"⚠️ Batched expansion failed ({str(e)[:60]}), falling back to clicking icons")
+    
     expanded_total = 0
     max_passes = 20
     
@@ -75,9 +88,10 @@ def expand_all_menus_fast(driver):
     return expanded_total
 
 
-def extract_xpaths_fast(driver, page_name: str, seen_rows: Set) -> tuple:
+def extract_xpaths_fast(driver, page_name: str, seen_rows: Set, frame_cache: Dict = None) -> tuple:
     """
-    Fast extraction from main document + iframes.
+    Fast extraction from main document + all nested frames/iframes.
+    frame_cache (see frame_walker) sends known applications straight to their field frames.
     Returns: (extracted_list, stats_dict)
     """
     extracted = []
@@ -94,18 +108,33 @@ def extract_xpaths_fast(driver, page_name: str, seen_rows: Set) -> tuple:
     # Simpler selector - just the essentials
     selector = 'input, select, textarea'
     
-    def extract_from_context(context_name="main"):
-        """Extract from current context."""
+    def extract_from_context(context_name="main", fields=None):
+        """Extract from current context (or from fields already read)."""
         found = []
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if fields is None:
+                try:
+                    # One script per frame returns every field - no per-element round trips
+                    fields = extract_fields_bulk(driver, selector)
+                except Exception:
+                    fields = []
+                    for elem in driver.find_elements(By.CSS_SELECTOR, selector):
+                        try:
+                            fields.append({
+                                'tagName': elem.tag_name,
+                                'id': elem.get_attribute('id') or '',
+                                'name': elem.get_attribute('name') or '',
+                                'type': elem.get_attribute('type') or ''
+                            })
+                        except:
+                            continue
             
-            for idx, elem in enumerate(elements):
+            for field in fields:
                 try:
-                    tag = elem.tag_name
-                    elem_id = elem.get_attribute('id') or ''
-                    elem_name = elem.get_attribute('name') or ''
-                    elem_type = elem.get_attribute('type') or ''
+                    tag = field['tagName']
+                    elem_id = field['id']
+                    elem_name = field['name']
+                    elem_type = field['type']
                     
                     # Skip hidden inputs - they're not fillable
                     if tag == 'input' and elem_type == 'hidden':
@@ -144,45 +173,45 @@ def extract_xpaths_fast(driver, page_name: str, seen_rows: Set) -> tuple:
         
         return found
     
-    # Extract from main
-    main_results = extract_from_context("main")
-    extracted.extend(main_results)
-    stats['main_count'] = len(main_results)
+    frame_results = None
+    if use_cdp_backend():
+        # One DOM snapshot holds the main document and every frame
+        try:
+            frame_results = [(context_name, extract_from_context(context_name, fields))
+                             for context_name, fields in extract_fields_cdp(driver, selector)]
+        except Exception:
+            frame_results = None
     
-    # Extract from iframes
-    try:
-        iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-        stats['total_iframes'] = len(iframes)
-        
-        for idx, iframe in enumerate(iframes):
-            try:
-                driver.switch_to.frame(iframe)
-                iframe_results = extract_from_context(f"iframe_{idx}")
-                extracted.extend(iframe_results)
-                stats['iframe_count'] += len(iframe_results)
-                driver.switch_to.default_content()
-            except:
-                try:
-                    driver.switch_to.default_content()
-                except:
-                    pass
-    except:
-        pass
+    # Extract from the main document and every nested frame/iframe
+    # (remembered frame paths for this application are tried first)
+    if frame_results is None:
+        try:
+            frame_results = extract_across_frames(driver, extract_from_context, frame_cache, page_name)
+        except Exception:
+            frame_results = []
+    
+    stats['total_iframes'] = sum(1 for name, _ in frame_results if name != 'main')
+    for context_name, results in frame_results:
+        extracted.extend(results)
+        if context_name == 'main':
+            stats['main_count'] = len(results)
+        else:
+            stats['iframe_count'] += len(results)
     
     stats['extraction_time_ms'] = int((time.time() - start_time) * 1000)
     
     return extracted, stats
 
 
+def is_valid_checkpoint(data) -> bool:
+    """A usable checkpoint names the last finished page and its index."""
+    return (isinstance(data, dict) and isinstance(data.get('page_index'), int)
+            and data['page_index'] >= 0 and bool(data.get('page_name')))
+
+
 def load_checkpoint():
-    """Load checkpoint if exists."""
-    if os.path.exists(CHECKPOINT_FILE):
-        try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return None
-    return None
+    """Load checkpoint if exists - falls back to the backup generation if it is damaged."""
+    return load_json_validated(CHECKPOINT_FILE, is_valid_checkpoint)
 
 
 def save_checkpoint(page_index, page_name, total):
@@ -193,25 +222,25 @@ def save_checkpoint(page_index, page_name, total):
         'total': total,
         'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
     }
-    with open(CHECKPOINT_FILE, 'w') as f:
-        json.dump(checkpoint, f, indent=2)
+    atomic_write_json(CHECKPOINT_FILE, checkpoint, indent=2)
 
 
 def clear_checkpoint():
-    """Remove checkpoint file."""
-    if os.path.exists(CHECKPOINT_FILE):
-        os.remove(CHECKPOINT_FILE)
+    """Remove checkpoint file (and its backup)."""
+    for path in (CHECKPOINT_FILE, backup_path(CHECKPOINT_FILE)):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 def initialize_files(resume=False):
     """Create or load Excel files."""
     if resume and os.path.exists(XPATH_OUTPUT_FILE):
         # Load existing workbooks
-        xpath_wb = load_workbook(XPATH_OUTPUT_FILE)
+        xpath_wb = load_workbook_with_fallback(XPATH_OUTPUT_FILE)
         xpath_ws = xpath_wb.active
-        stats_wb = load_workbook(STATS_OUTPUT_FILE)
+        stats_wb = load_workbook_with_fallback(STATS_OUTPUT_FILE)
         stats_ws = stats_wb.active
-        zero_wb = load_workbook(ZERO_ELEMENTS_FILE) if os.path.exists(ZERO_ELEMENTS_FILE) else Workbook()
+        zero_wb = load_workbook_with_fallback(ZERO_ELEMENTS_FILE) if os.path.exists(ZERO_ELEMENTS_FILE) else Workbook()
         zero_ws = zero_wb.active
     else:
         # Create new workbooks
@@ -223,7 +252,7 @@ def initialize_files(resume=False):
         stats_wb = Workbook()
         stats_ws = stats_wb.active
         stats_ws.title = 'Stats'
-        stats_ws.append(['page', 'elements', 'main', 'iframes_found', 'iframes_extracted', 'time_ms', 'timestamp'])
+        stats_ws.append(['page', 'elements', 'main', 'iframes_found', 'iframes_extracted', 'time_ms', 'timestamp'] + PHASE_COLUMNS + ['browser_profile'])
         
         zero_wb = Workbook()
         zero_ws = zero_wb.active
@@ -233,6 +262,21 @@ def initialize_files(resume=False):
     return xpath_wb, xpath_ws, stats_wb, stats_ws, zero_wb, zero_ws
 
 
+def get_recycle_sheet(stats_wb):
+    """'Browser Recycles' sheet of the stats workbook (created on first use, kept on resume)."""
+    if 'Browser Recycles' in stats_wb.sheetnames:
+        return stats_wb['Browser Recycles']
+    ws = stats_wb.create_sheet('Browser Recycles')
+    ws.append(RECYCLE_COLUMNS)
+    return ws
+
+
+def reopen_session(driver, url, username, password):
+    """Login on a fresh driver and expand the menu again."""
+    login(driver, url, username, password)
+    expand_all_menus_fast(driver)
+
+
 def crawl_fast():
     """Fast crawler - optimized for speed with checkpoint/resume support."""
     print("="*70)
@@ -247,12 +291,17 @@ def crawl_fast():
         print(f"   Last run: {checkpoint['timestamp']}\n")
     
     xpath_wb, xpath_ws, stats_wb, stats_ws, zero_wb, zero_ws = initialize_files(resume)
+    recycle_ws = get_recycle_sheet(stats_wb)
+    recycle_policy = RecyclePolicy()
     
-    seen_rows = set()
+    seen_rows = SeenRowIndex()
+    frame_cache = load_frame_cache()
     xpath_count = 0
     zero_count = 0
     
     driver = setup_driver()
+    ui_store = open_store()
+    run_id = ui_store.start_run('crawl_fast', resume=resume, browser_profile=driver.browser_profile) if ui_store else None
     
     try:
         # Login
@@ -303,6 +352,7 @@ def crawl_fast():
         total = len(items)
         print(f"🎯 Processing {total} unique pages (from {original_count} total menu items)")
         
+        print(f"♻️ Browser recycling: {recycle_policy.describe()}")
         if resume:
             print(f"⏩ Skipping first {start_index} pages (already processed)\n")
         else:
@@ -315,6 +365,19 @@ def crawl_fast():
             page_start = time.time()
             page_name = items[i]
             
+            # Planned restart every N pages / above the RSS limit (crashes are still handled below)
+            recycle_reason = recycle_policy.should_recycle(driver)
+            if recycle_reason:
+                try:
+                    driver, event = recycle_policy.recycle(
+                        driver, recycle_reason, setup_driver,
+                        lambda d: reopen_session(d, url, username, password),
+                        page_index=i, page=page_name
+                    )
+                    recycle_ws.append([event[col] for col in RECYCLE_COLUMNS])
+                except Exception as e:
+                    print(f"  ⚠️ Recycle failed ({str(e)[:60]}) - the crash check will restart the browser")
+            
             print(f"[{i+1}/{total}] {page_name}")
             
             # Try to process page, restart browser if crashed
@@ -322,6 +385,7 @@ def crawl_fast():
             attempt = 0
             
             while attempt <= MAX_RETRIES and not success:
+                start_page(driver)
                 try:
                     # Check if browser is alive
                     try:
@@ -334,73 +398,69 @@ def crawl_fast():
                         except:
                             pass
                         
-                        driver = setup_driver()
-                        login(driver, url, username, password)
-                        expand_all_menus_fast(driver)
+                        crashed_driver, driver = driver, setup_driver()
+                        carry_run_totals(crashed_driver, driver)
+                        reopen_session(driver, url, username, password)
+                        recycle_policy.pages_since_recycle = 0
                         print(f"  ✅ Browser restarted, continuing...")
                     
                     # Re-find link
-                    driver.switch_to.default_content()
-                    get_menu_frame(driver)
+                    with crawl_phase(driver, 'menu_frame'):
+                        driver.switch_to.default_content()
+                        get_menu_frame(driver)
                     
-                    try:
-                        link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
-                    except:
+                    with crawl_phase(driver, 'link_lookup'):
                         try:
-                            link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                            link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
                         except:
-                            print(f"  ⚠️ Link not found, skipping...")
-                            success = True  # Mark as success to move to next page
-                            break
-                    
-                    main_window = driver.current_window_handle
+                            try:
+                                link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                            except:
+                                link = None
+                    if link is None:
+                        print(f"  ⚠️ Link not found, skipping...")
+                        success = True  # Mark as success to move to next page
+                        break
                     
                     # Click and wait for popup
-                    link.click()
+                    with crawl_phase(driver, 'click'):
+                        main_window = driver.current_window_handle
+                        link.click()
                     
-                    # Wait for popup window (max 2 seconds)
-                    WebDriverWait(driver, 2).until(lambda d: len(d.window_handles) > 1)
-                    
-                    # Switch to popup
-                    driver.switch_to.window(driver.window_handles[-1])
-                    
-                    # Wait for page body
-                    WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-                    
-                    # Quick check if page has any inputs at all
-                    try:
-                        WebDriverWait(driver, 1).until(
-                            lambda d: len(d.find_elements(By.CSS_SELECTOR, 'input, select, textarea')) > 0
-                        )
-                        # If inputs exist, wait a bit more for dealbox fields to load
+                    with crawl_phase(driver, 'popup_wait'):
+                        # Wait for popup window (max 2 seconds)
+                        WebDriverWait(driver, 2).until(lambda d: len(d.window_handles) > 1)
+                        
+                        # Switch to popup
+                        driver.switch_to.window(driver.window_handles[-1])
+                        
+                        # Wait for page body
+                        WebDriverWait(driver, 2).until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
+                        
+                        # Quick check if page has any inputs at all
                         try:
-                            WebDriverWait(driver, 2).until(
-                                lambda d: len(d.find_elements(By.CSS_SELECTOR, '.dealbox, [id^="fieldName:"]')) > 0
+                            WebDriverWait(driver, 1).until(
+                                lambda d: len(d.find_elements(By.CSS_SELECTOR, 'input, select, textarea')) > 0
                             )
+                            # If inputs exist, wait a bit more for dealbox fields to load
+                            try:
+                                WebDriverWait(driver, 2).until(
+                                    lambda d: len(d.find_elements(By.CSS_SELECTOR, '.dealbox, [id^="fieldName:"]')) > 0
+                                )
+                            except:
+                                pass  # Inputs exist but not dealbox type, proceed anyway
                         except:
-                            pass  # Inputs exist but not dealbox type, proceed anyway
-                    except:
-                        pass  # No inputs at all, skip waiting
+                            pass  # No inputs at all, skip waiting
                     
                     # Extract XPaths
-                    extracted, stats = extract_xpaths_fast(driver, page_name, seen_rows)
+                    with crawl_phase(driver, 'extract'):
+                        extracted, stats = extract_xpaths_fast(driver, page_name, seen_rows, frame_cache)
                     
                     # Save XPath rows
                     for xp in extracted:
                         xpath_ws.append([xp['page'], xp['xpath'], xp['id'], xp['name'], xp['tag'], xp['type'], xp['context']])
                         xpath_count += 1
                     
-                    # Save stats row
-                    stats_ws.append([
-                        page_name,
-                        len(extracted),
-                        stats['main_count'],
-                        stats['total_iframes'],
-                        stats['iframe_count'],
-                        stats['extraction_time_ms'],
-                        time.strftime('%H:%M:%S')
-                    ])
-                    
                     # Track zero-element pages separately
                     if len(extracted) == 0:
                         zero_count += 1
@@ -414,8 +474,27 @@ def crawl_fast():
                         ])
                     
                     # Close popup
-                    driver.close()
-                    driver.switch_to.window(main_window)
+                    with crawl_phase(driver, 'close'):
+                        driver.close()
+                        driver.switch_to.window(main_window)
+                    
+                    # Save stats row (with the per-phase WebDriver command breakdown)
+                    stats_ws.append([
+                        page_name,
+                        len(extracted),
+                        stats['main_count'],
+                        stats['total_iframes'],
+                        stats['iframe_count'],
+                        stats['extraction_time_ms'],
+                        time.strftime('%H:%M:%S')
+                    ] + page_phase_values(driver) + [driver.browser_profile])
+                    
+                    # Page rows + stats in one transaction
+                    if ui_store:
+                        try:
+                            ui_store.record_page(run_id, page_name, extracted, {**stats, 'browser_profile': driver.browser_profile})
+                        except Exception as store_error:
+                            print(f"  ⚠️ UI map store write failed: {str(store_error)[:60]}")
                     
                     success = True
                     
@@ -439,12 +518,14 @@ def crawl_fast():
             
             # Save checkpoint after each page
             save_checkpoint(i, page_name, total)
+            recycle_policy.page_done()
             
             # Save files every 100 items
             if (i + 1) % 100 == 0:
-                xpath_wb.save(XPATH_OUTPUT_FILE)
-                stats_wb.save(STATS_OUTPUT_FILE)
-                zero_wb.save(ZERO_ELEMENTS_FILE)
+                save_workbook_atomic(xpath_wb, XPATH_OUTPUT_FILE)
+                save_workbook_atomic(stats_wb, STATS_OUTPUT_FILE)
+                save_workbook_atomic(zero_wb, ZERO_ELEMENTS_FILE)
+                save_frame_cache(frame_cache)
                 elapsed = int(time.time() - start_time)
                 pages_done = i + 1 - start_index
                 avg_per_page = elapsed / pages_done if pages_done > 0 else 0
@@ -452,10 +533,12 @@ def crawl_fast():
                 print(f"  💾 Progress: {i+1}/{total} | Avg: {avg_per_page:.1f}s/page | ETA: {remaining}min")
         
         # Final save
-        xpath_wb.save(XPATH_OUTPUT_FILE)
-        stats_wb.save(STATS_OUTPUT_FILE)
-        zero_wb.save(ZERO_ELEMENTS_FILE)
+        save_workbook_atomic(xpath_wb, XPATH_OUTPUT_FILE)
+        save_workbook_atomic(stats_wb, STATS_OUTPUT_FILE)
+        save_workbook_atomic(zero_wb, ZERO_ELEMENTS_FILE)
         clear_checkpoint()
+        if ui_store:
+            ui_store.finish_run(run_id, 'complete')
         
         total_time = int(time.time() - start_time)
         pages_done = total - start_index
@@ -465,6 +548,10 @@ def crawl_fast():
         print(f"   Total: {xpath_count} XPaths from {total} pages")
         print(f"   Zero-element pages: {zero_count}")
         print(f"   Time: {total_time}s ({avg_time:.1f}s per page)")
+        print_phase_summary(driver, pages_done)
+        if recycle_policy.events:
+            print(f"   Browser recycled {len(recycle_policy.events)} times "
+                  f"({sum(e['recycle_ms'] for e in recycle_policy.events) / 1000:.1f}s total)")
         print(f"\n📊 Files:")
         print(f"   1. {XPATH_OUTPUT_FILE} - XPath records")
         print(f"   2. {STATS_OUTPUT_FILE} - All page statistics")
@@ -472,9 +559,9 @@ def crawl_fast():
         
     except KeyboardInterrupt:
         print("\n\n⏸️ Interrupted - Saving...")
-        xpath_wb.save(XPATH_OUTPUT_FILE)
-        stats_wb.save(STATS_OUTPUT_FILE)
-        zero_wb.save(ZERO_ELEMENTS_FILE)
+        save_workbook_atomic(xpath_wb, XPATH_OUTPUT_FILE)
+        save_workbook_atomic(stats_wb, STATS_OUTPUT_FILE)
+        save_workbook_atomic(zero_wb, ZERO_ELEMENTS_FILE)
         print(f"💾 Checkpoint saved. Run again to resume from page {xpath_count}")
         
     except Exception as e:
@@ -483,6 +570,9 @@ def crawl_fast():
         traceback.print_exc()
         
     finally:
+        save_frame_cache(frame_cache)
+        if ui_store:
+            ui_store.close()
         try:
             driver.quit()
         except:
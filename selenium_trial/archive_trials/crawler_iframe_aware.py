@@ -29,11 +29,18 @@ STATS_OUTPUT_FILE = 'page_statistics_with_iframes.xlsx'
 
 # Import functions from original crawler
 from crawler import setup_driver, login, get_menu_frame, expand_all_menus_recursive
+from bulk_extraction import extract_fields_bulk
+from frame_walker import extract_across_frames, load_frame_cache, save_frame_cache
+from cdp_extraction import use_cdp_backend, extract_fields_cdp
+from ui_map_store import open_store
+from seen_rows_index import SeenRowIndex
+from driver_instrumentation import PHASE_COLUMNS, crawl_phase, start_page, page_phase_stats, print_phase_summary
 
 
-def extract_xpaths_with_iframes(driver, page_name: str, seen_rows: Set) -> List[Dict]:
+def extract_xpaths_with_iframes(driver, page_name: str, seen_rows: Set, frame_cache: Dict = None) -> List[Dict]:
     """
-    Extract XPaths from main document AND all iframes.
+    Extract XPaths from main document AND all nested frames/iframes.
+    Each row's 'context' is its frame path ('main', 'frame_1/iframe_0', ...).
     Returns list of dictionaries with XPath data.
     """
     all_extracted = []
@@ -47,114 +54,128 @@ def extract_xpaths_with_iframes(driver, page_name: str, seen_rows: Set) -> List[
         input:not([type]), textarea, select
     '''
     
-    def extract_from_context(context_name="main"):
-        """Extract fields from current context (main or iframe)."""
+    def read_fields_per_element():
+        """Fallback: read field attributes one WebDriver call at a time."""
+        fields = []
+        for elem in driver.find_elements(By.CSS_SELECTOR, selector):
+            try:
+                field = {
+                    'id': elem.get_attribute('id') or '',
+                    'name': elem.get_attribute('name') or '',
+                    'className': elem.get_attribute('class') or '',
+                    'type': elem.get_attribute('type') or '',
+                    'placeholder': elem.get_attribute('placeholder') or '',
+                    'value': elem.get_attribute('value') or '',
+                    'text': elem.text.strip() or '',
+                    'tagName': elem.tag_name.lower(),
+                    'fullXpath': ''
+                }
+                try:
+                    field['fullXpath'] = driver.execute_script(
+                        "function getXPath(element) {"
+                        "  if (element.id !== '') return '//*[@id=\"' + element.id + '\"]';"
+                        "  if (element === document.body) return '/html/body';"
+                        "  var ix = 0;"
+                        "  var siblings = element.parentNode.childNodes;"
+                        "  for (var i = 0; i < siblings.length; i++) {"
+                        "    var sibling = siblings[i];"
+                        "    if (sibling === element) return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';"
+                        "    if (sibling.nodeType === 1 && sibling.tagName === element.tagName) ix++;"
+                        "  }"
+                        "}"
+                        "return getXPath(arguments[0]);", elem
+                    ) or ''
+                except:
+                    pass
+                fields.append(field)
+            except Exception as e:
+                continue
+        return fields
+    
+    def extract_from_context(context_name="main", fields=None):
+        """Extract fields from current context (main or a frame path), or rows for fields already read."""
         extracted = []
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-            
-            for elem in elements:
+            if fields is None:
                 try:
-                    # Get attributes
-                    elem_id = elem.get_attribute('id') or ''
-                    elem_name = elem.get_attribute('name') or ''
-                    elem_class = elem.get_attribute('class') or ''
-                    elem_type = elem.get_attribute('type') or ''
-                    elem_placeholder = elem.get_attribute('placeholder') or ''
-                    elem_value = elem.get_attribute('value') or ''
-                    elem_text = elem.text.strip() or ''
-                    tag_name = elem.tag_name.lower()
-                    
-                    # Generate element name
-                    element_name = elem_id or elem_name or elem_placeholder or f"{tag_name}_{len(extracted)}"
-                    
-                    # Generate XPaths
-                    relative_xpath = ''
-                    if elem_id:
-                        relative_xpath = f"//{tag_name}[@id='{elem_id}']"
-                    elif elem_name:
-                        relative_xpath = f"//{tag_name}[@name='{elem_name}']"
-                    elif elem_placeholder:
-                        relative_xpath = f"//{tag_name}[@placeholder='{elem_placeholder}']"
-                    else:
-                        # Fallback to index-based
-                        relative_xpath = f"(//{tag_name})[{len(extracted)+1}]"
-                    
-                    # Full XPath (using Selenium)
-                    full_xpath = ''
-                    try:
-                        full_xpath = driver.execute_script(
-                            "function getXPath(element) {"
-                            "  if (element.id !== '') return '//*[@id=\"' + element.id + '\"]';"
-                            "  if (element === document.body) return '/html/body';"
-                            "  var ix = 0;"
-                            "  var siblings = element.parentNode.childNodes;"
-                            "  for (var i = 0; i < siblings.length; i++) {"
-                            "    var sibling = siblings[i];"
-                            "    if (sibling === element) return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';"
-                            "    if (sibling.nodeType === 1 && sibling.tagName === element.tagName) ix++;"
-                            "  }"
-                            "}"
-                            "return getXPath(arguments[0]);", elem
-                        )
-                    except:
-                        full_xpath = relative_xpath
-                    
-                    # Create unique key
-                    row_key = (page_name, relative_xpath, element_name, elem_id, elem_name, 
-                              elem_class, tag_name, elem_type)
-                    
-                    if row_key not in seen_rows:
-                        seen_rows.add(row_key)
-                        extracted.append({
-                            'page': page_name,
-                            'relativeXpath': relative_xpath,
-                            'fullXpath': full_xpath,
-                            'elementName': element_name,
-                            'id': elem_id,
-                            'name': elem_name,
-                            'className': elem_class,
-                            'tagName': tag_name,
-                            'type': elem_type,
-                            'placeholder': elem_placeholder,
-                            'value': elem_value,
-                            'text': elem_text,
-                            'context': context_name
-                        })
-                except Exception as e:
-                    continue
+                    # One script per frame returns every field - no per-element round trips
+                    fields = extract_fields_bulk(driver, selector)
+                except Exception:
+                    fields = read_fields_per_element()
+            
+            for field in fields:
+                elem_id = field.get('id') or ''
+                elem_name = field.get('name') or ''
+                elem_class = field.get('className') or ''
+                elem_type = field.get('type') or ''
+                elem_placeholder = field.get('placeholder') or ''
+                elem_value = field.get('value') or ''
+                elem_text = field.get('text') or ''
+                tag_name = field.get('tagName', '').lower()
+                
+                # Generate element name
+                element_name = elem_id or elem_name or elem_placeholder or f"{tag_name}_{len(extracted)}"
+                
+                # Generate XPaths
+                relative_xpath = ''
+                if elem_id:
+                    relative_xpath = f"//{tag_name}[@id='{elem_id}']"
+                elif elem_name:
+                    relative_xpath = f"//{tag_name}[@name='{elem_name}']"
+                elif elem_placeholder:
+                    relative_xpath = f"//{tag_name}[@placeholder='{elem_placeholder}']"
+                else:
+                    # Fallback to index-based
+                    relative_xpath = f"(//{tag_name})[{len(extracted)+1}]"
+                
+                # Full XPath (computed in the browser)
+                full_xpath = field.get('fullXpath') or relative_xpath
+                
+                # Create unique key
+                row_key = (page_name, relative_xpath, element_name, elem_id, elem_name, 
+                          elem_class, tag_name, elem_type)
+                
+                if row_key not in seen_rows:
+                    seen_rows.add(row_key)
+                    extracted.append({
+                        'page': page_name,
+                        'relativeXpath': relative_xpath,
+                        'fullXpath': full_xpath,
+                        'elementName': element_name,
+                        'id': elem_id,
+                        'name': elem_name,
+                        'className': elem_class,
+                        'tagName': tag_name,
+                        'type': elem_type,
+                        'placeholder': elem_placeholder,
+                        'value': elem_value,
+                        'text': elem_text,
+                        'context': context_name
+                    })
         except Exception as e:
             pass
         
         return extracted
     
-    # 1. Extract from main document
-    main_extracted = extract_from_context("main")
-    all_extracted.extend(main_extracted)
+    # CDP backend: one DOM snapshot holds the main document and every frame
+    if use_cdp_backend():
+        try:
+            for context_name, fields in extract_fields_cdp(driver, selector):
+                all_extracted.extend(extract_from_context(context_name, fields))
+            return all_extracted
+        except Exception as e:
+            print(f"   ⚠️ CDP snapshot failed, walking frames instead: {str(e)[:60]}")
     
-    # 2. Find and process all iframes
+    # Walk the main document and every nested frame/iframe
+    # (remembered frame paths for this application are tried first)
     try:
-        iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-        
-        for idx, iframe in enumerate(iframes):
-            try:
-                # Switch to iframe
-                driver.switch_to.frame(iframe)
-                
-                # Extract from iframe
-                iframe_extracted = extract_from_context(f"iframe_{idx}")
-                all_extracted.extend(iframe_extracted)
-                
-                # Switch back to main document
-                driver.switch_to.default_content()
-            except Exception as e:
-                # If switch fails, make sure we're back in main context
-                try:
-                    driver.switch_to.default_content()
-                except:
-                    pass
+        for context_name, extracted in extract_across_frames(driver, extract_from_context, frame_cache, page_name):
+            all_extracted.extend(extracted)
     except Exception as e:
-        pass
+        try:
+            driver.switch_to.default_content()
+        except:
+            pass
     
     return all_extracted
 
@@ -181,7 +202,7 @@ def initialize_xlsx_files():
         'ErrorMessage', 'Timestamp', 'InputCount', 'SelectCount', 'TextareaCount',
         'TotalInputElements', 'VisibleInputs', 'HiddenInputs', 'ExtractedFromMain',
         'ExtractedFromIframes'
-    ]
+    ] + PHASE_COLUMNS + ['BrowserProfile']
     stats_ws.append(stats_headers)
     
     print(f"📊 Created fresh files:")
@@ -313,7 +334,7 @@ def save_stats_row(ws, stats: Dict):
         stats['HiddenInputs'],
         stats['ExtractedFromMain'],
         stats['ExtractedFromIframes']
-    ])
+    ] + [stats.get(col, 0) for col in PHASE_COLUMNS] + [stats.get('BrowserProfile', '')])
 
 
 def crawl_with_iframe_support():
@@ -330,11 +351,14 @@ def crawl_with_iframe_support():
     xpath_wb, xpath_ws, stats_wb, stats_ws = initialize_xlsx_files()
     
     # Track what we've seen to avoid duplicates
-    global_seen_rows = set()
+    global_seen_rows = SeenRowIndex()
+    frame_cache = load_frame_cache()
     xpath_count = 0
     
     # Setup driver
     driver = setup_driver()
+    ui_store = open_store()
+    run_id = ui_store.start_run('crawl_with_iframe_support', browser_profile=driver.browser_profile) if ui_store else None
     
     try:
         # Login
@@ -376,42 +400,51 @@ def crawl_with_iframe_support():
             page_name = items_to_process[i]
             
             print(f"[{i+1}/{total}] 🖱️ {page_name}")
+            start_page(driver)
             
             # Re-find link
-            driver.switch_to.default_content()
-            get_menu_frame(driver)
+            with crawl_phase(driver, 'menu_frame'):
+                driver.switch_to.default_content()
+                get_menu_frame(driver)
             
-            try:
-                link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
-            except:
+            with crawl_phase(driver, 'link_lookup'):
                 try:
-                    link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                    link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
                 except:
-                    print(f"    ⚠️ Could not find link")
-                    continue
+                    try:
+                        link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                    except:
+                        link = None
+            if link is None:
+                print(f"    ⚠️ Could not find link")
+                continue
             
             main_window = driver.current_window_handle
             
             try:
                 # Click link
-                try:
-                    link.click()
-                except:
-                    driver.execute_script("arguments[0].click();", link)
-                
-                time.sleep(0.3)
+                with crawl_phase(driver, 'click'):
+                    try:
+                        link.click()
+                    except:
+                        driver.execute_script("arguments[0].click();", link)
                 
                 # Check if popup opened
-                windows = driver.window_handles
-                if len(windows) > 1:
-                    driver.switch_to.window(windows[-1])
+                with crawl_phase(driver, 'popup_wait'):
                     time.sleep(0.3)
-                    
+                    windows = driver.window_handles
+                    if len(windows) > 1:
+                        driver.switch_to.window(windows[-1])
+                        time.sleep(0.3)
+                
+                if len(windows) > 1:
                     # ANALYZE PAGE
-                    stats = analyze_page(driver, page_name)
+                    with crawl_phase(driver, 'analyze'):
+                        stats = analyze_page(driver, page_name)
                     
                     # EXTRACT XPATHS (with iframe support)
-                    extracted = extract_xpaths_with_iframes(driver, page_name, global_seen_rows)
+                    with crawl_phase(driver, 'extract'):
+                        extracted = extract_xpaths_with_iframes(driver, page_name, global_seen_rows, frame_cache)
                     
                     # Count context breakdown
                     main_count = sum(1 for x in extracted if x.get('context') == 'main')
@@ -431,12 +464,22 @@ def crawl_with_iframe_support():
                     if stats['HasIframes']:
                         print(f"       📦 {stats['IframeCount']} iframe(s) processed")
                     
-                    # Save stats row
+                    # Close popup
+                    with crawl_phase(driver, 'close'):
+                        driver.close()
+                        driver.switch_to.window(main_window)
+                    
+                    # Save stats row (with the per-phase WebDriver command breakdown)
+                    stats.update(page_phase_stats(driver))
+                    stats['BrowserProfile'] = driver.browser_profile
                     save_stats_row(stats_ws, stats)
                     
-                    # Close popup
-                    driver.close()
-                    driver.switch_to.window(main_window)
+                    # Page rows + stats in one transaction
+                    if ui_store:
+                        try:
+                            ui_store.record_page(run_id, page_name, extracted, stats)
+                        except Exception as store_error:
+                            print(f"    ⚠️ UI map store write failed: {str(store_error)[:60]}")
                 else:
                     print(f"    ⚠️ No popup opened")
                 
@@ -444,6 +487,7 @@ def crawl_with_iframe_support():
                 if (i + 1) % 50 == 0:
                     xpath_wb.save(XPATH_OUTPUT_FILE)
                     stats_wb.save(STATS_OUTPUT_FILE)
+                    save_frame_cache(frame_cache)
                     print(f"    💾 Checkpoint: {xpath_count} XPaths, {i+1} pages")
                 
             except Exception as e:
@@ -457,9 +501,12 @@ def crawl_with_iframe_support():
         print(f"\n✨ Complete!")
         print(f"   XPaths extracted: {xpath_count}")
         print(f"   Pages processed: {total}")
+        print_phase_summary(driver, total)
         
         xpath_wb.save(XPATH_OUTPUT_FILE)
         stats_wb.save(STATS_OUTPUT_FILE)
+        if ui_store:
+            ui_store.finish_run(run_id, 'complete')
         
         print(f"\n📊 Output files:")
         print(f"   1. {XPATH_OUTPUT_FILE} - {xpath_count} XPath records")
@@ -469,6 +516,8 @@ def crawl_with_iframe_support():
         print("\n\n⏸️ Interrupted - Saving progress...")
         xpath_wb.save(XPATH_OUTPUT_FILE)
         stats_wb.save(STATS_OUTPUT_FILE)
+        if ui_store:
+            ui_store.finish_run(run_id, 'interrupted')
         print("✅ Progress saved")
         
     except Exception as e:
@@ -477,6 +526,9 @@ def crawl_with_iframe_support():
         traceback.print_exc()
         
     finally:
+        save_frame_cache(frame_cache)
+        if ui_store:
+            ui_store.close()
         try:
             driver.quit()
         except:
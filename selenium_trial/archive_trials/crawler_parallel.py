@@ -0,0 +1,269 @@
+"""
+Parallel Multi-Session Crawler
+Runs N independent Chrome sessions that pull pages from a shared work queue.
+
+- The bootstrap session signs on once; workers start from its cookies (session_fanout)
+  and only sign on themselves, staggered, if T24 rejects the shared session
+- Pages are keyed by their position in the menu, so merged output is in menu order
+- Global row dedup happens once at merge time -> identical rows for any worker count
+"""
+
+import time
+import os
+import queue
+import threading
+from typing import List, Dict, Tuple
+from dotenv import load_dotenv
+from selenium.webdriver.common.by import By
+
+from crawler import (
+    setup_driver, get_menu_frame, expand_all_menus_recursive,
+    extract_xpaths_from_page, export_to_excel, export_stats_to_excel
+)
+from page_readiness import wait_for_page_ready
+from session_fanout import sign_on, export_session
+
+load_dotenv()
+
+OUTPUT_FILE = 'uiMap_parallel.xlsx'
+STATS_FILE = 'page_stats_parallel.xlsx'
+NUM_WORKERS = int(os.getenv('CRAWL_WORKERS', '4'))
+
+
+def get_credentials() -> Tuple[str, str, str]:
+    """Read T24 connection settings from the environment."""
+    url = os.getenv('APP_URL', 'http://10.0.251.41:18080/BrowserWeb/servlet/BrowserServlet')
+    username = os.getenv('APP_USERNAME', 'MB.OFFICER')
+    password = os.getenv('APP_PASSWORD', '123456')
+    return url, username, password
+
+
+def start_session(worker_name: str = 'main', session: Dict = None, stagger_index: int = 0):
+    """
+    Start a driver, sign on and expand the menu. Returns the ready driver.
+    With session (bootstrap cookies) the sign-on is skipped when T24 accepts them.
+    """
+    url, username, password = get_credentials()
+    driver = setup_driver()
+    driver.sign_on_mode = sign_on(driver, url, username, password, session=session,
+                                  stagger_index=stagger_index, save=session is None)
+    if not get_menu_frame(driver, wait=True):
+        driver.quit()
+        raise RuntimeError(f"[{worker_name}] Failed to find menu frame")
+    expand_all_menus_recursive(driver)
+    return driver
+
+
+def collect_menu_items(driver) -> List[str]:
+    """Build the ordered list of visible leaf link texts (same rules as crawl_menu)."""
+    driver.switch_to.default_content()
+    get_menu_frame(driver)
+    container = driver.find_element(By.XPATH, "//div[starts-with(@id,'pane')]")
+    all_leaves = container.find_elements(By.XPATH, ".//li[.//a[starts-with(@href,'javascript:docommand(')]]")
+
+    items = []
+    for leaf in all_leaves:
+        if leaf.is_displayed():
+            try:
+                link = leaf.find_element(By.XPATH, ".//a")
+                if link.is_displayed():
+                    items.append(link.text.strip() or "Unknown")
+            except:
+                pass
+    return items
+
+
+def process_page(driver, text: str) -> Tuple[List[Dict], Dict]:
+    """Open one menu page in its popup, extract its fields and close it again."""
+    driver.switch_to.default_content()
+    get_menu_frame(driver)
+
+    try:
+        link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{text}']")
+    except:
+        try:
+            link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{text[:20]}')]")
+        except:
+            return [], {'page': text, 'count': 0, 'error': 'Link not found'}
+
+    try:
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", link)
+    except:
+        pass
+
+    main_window = driver.current_window_handle
+    known_handles = driver.window_handles
+    try:
+        try:
+            link.click()
+        except:
+            driver.execute_script("arguments[0].click();", link)
+
+        readiness = wait_for_page_ready(driver, known_handles)
+        if not readiness['popup_opened']:
+            return [], {'page': text, 'count': 0, 'error': 'No popup opened', **readiness}
+
+        # Page-local dedup only - global dedup happens at merge time
+        extracted = extract_xpaths_from_page(driver, text, set())
+        driver.close()
+        return extracted, {'page': text, 'count': len(extracted), 'error': '', **readiness}
+    finally:
+        try:
+            driver.switch_to.window(main_window)
+        except:
+            pass
+
+
+def session_alive(driver) -> bool:
+    """True if the browser still answers."""
+    try:
+        _ = driver.current_window_handle
+        return True
+    except:
+        return False
+
+
+def worker(worker_id: int, work_queue: queue.Queue, results: Dict, results_lock: threading.Lock, total: int,
+           session: Dict = None):
+    """Pull (index, page) items until the queue is empty."""
+    name = f"W{worker_id}"
+
+    try:
+        driver = start_session(name, session, stagger_index=worker_id)
+    except Exception as e:
+        print(f"❌ [{name}] Could not start session: {e}")
+        return
+
+    pages_done = 0
+    try:
+        while True:
+            try:
+                index, text = work_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            page_start = time.time()
+            try:
+                if not session_alive(driver):
+                    print(f"  🔄 [{name}] Browser crashed, restarting...")
+                    try:
+                        driver.quit()
+                    except:
+                        pass
+                    driver = start_session(name, session)
+
+                extracted, stats = process_page(driver, text)
+            except Exception as e:
+                extracted, stats = [], {'page': text, 'count': 0, 'error': str(e)[:200]}
+
+            stats['worker'] = name
+            stats['sign_on'] = driver.sign_on_mode
+            stats['time_ms'] = int((time.time() - page_start) * 1000)
+
+            with results_lock:
+                results[index] = (extracted, stats)
+                done = len(results)
+
+            pages_done += 1
+            status = f"✅ {stats['count']} elements" if not stats['error'] else f"⚠️ {stats['error'][:60]}"
+            print(f"[{done}/{total}] [{name}] {text} - {status}")
+            work_queue.task_done()
+    finally:
+        print(f"🔚 [{name}] Finished after {pages_done} pages")
+        try:
+            driver.quit()
+        except:
+            pass
+
+
+def merge_results(results: Dict, total: int) -> Tuple[List[Dict], List[Dict]]:
+    """Merge worker output in menu order with global row dedup (crawl_menu semantics)."""
+    all_data = []
+    stats_data = []
+    global_seen_rows = set()
+
+    for index in range(total):
+        if index not in results:
+            continue
+        extracted, stats = results[index]
+
+        kept = 0
+        for data in extracted:
+            row_key = (
+                data.get('page', ''),
+                data.get('relativeXpath', ''),
+                data.get('elementName', ''),
+                data.get('id', ''),
+                data.get('name', ''),
+                data.get('className', ''),
+                data.get('tagName', ''),
+                data.get('type', '')
+            )
+            if row_key not in global_seen_rows:
+                global_seen_rows.add(row_key)
+                all_data.append(data)
+                kept += 1
+
+        stats_data.append({**stats, 'count': kept})
+
+    return all_data, stats_data
+
+
+def crawl_parallel(num_workers: int = NUM_WORKERS):
+    """Crawl every leaf page with num_workers concurrent sessions."""
+    print("="*70)
+    print(f"PARALLEL CRAWLER - {num_workers} sessions")
+    print("="*70)
+
+    # One short bootstrap session signs on, builds the ordered page list and shares its cookies
+    driver = start_session('bootstrap')
+    try:
+        items = collect_menu_items(driver)
+        session = export_session(driver, get_credentials()[0])
+    finally:
+        driver.quit()
+
+    total = len(items)
+    print(f"🎯 Found {total} visible/clickable leaf nodes\n")
+
+    # Like crawl_menu, a page name that repeats in the menu is only processed once
+    work_queue = queue.Queue()
+    queued = set()
+    for index, text in enumerate(items):
+        if text not in queued:
+            queued.add(text)
+            work_queue.put((index, text))
+
+    results = {}
+    results_lock = threading.Lock()
+    start_time = time.time()
+
+    threads = []
+    for worker_id in range(num_workers):
+        t = threading.Thread(target=worker, args=(worker_id, work_queue, results, results_lock, len(queued), session), daemon=True)
+        t.start()
+        threads.append(t)
+
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        print(f"\n\n⚠️ Interrupted by user (Ctrl+C) - exporting {len(results)} completed pages")
+
+    all_data, stats_data = merge_results(dict(results), total)
+
+    if all_data:
+        export_to_excel(all_data, OUTPUT_FILE)
+        export_stats_to_excel(stats_data, STATS_FILE)
+
+    elapsed = time.time() - start_time
+    pages_per_min = len(results) / (elapsed / 60) if elapsed > 0 else 0
+    missing = len(queued) - len(results)
+    print(f"\n✨ Complete! {len(results)}/{len(queued)} pages, {len(all_data)} unique elements")
+    print(f"   Time: {int(elapsed)}s ({pages_per_min:.1f} pages/min with {num_workers} sessions)")
+    if missing:
+        print(f"   ⚠️ {missing} pages were not processed (worker sessions failed)")
+
+
+if __name__ == '__main__':
+    crawl_parallel()
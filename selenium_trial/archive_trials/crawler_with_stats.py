@@ -30,8 +30,9 @@ STATS_OUTPUT_FILE = 'page_statistics.xlsx'
 # Import functions from original crawler
 from crawler import (
     setup_driver, login, get_menu_frame, expand_all_menus_recursive,
-    extract_xpaths_from_page
+    extract_xpaths_from_page, DISPATCH_MODE, HIERARCHY_FILE
 )
+from docommand_dispatch import load_leaf_pages, open_page_by_docommand
 
 
 def initialize_xlsx_files():
@@ -236,28 +237,36 @@ def crawl_with_stats():
         login(driver, url, username, password)
         print("✅ Login successful")
         
-        # Expand menu
-        print("\n🔧 Expanding menu...")
-        expand_all_menus_recursive(driver)
-        time.sleep(2)
-        
-        # Get menu items
-        get_menu_frame(driver, wait=True)
-        
-        # Find all leaf nodes (clickable items) - use the correct XPath selector
-        all_leaves = driver.find_elements(By.XPATH, ".//li[.//a[starts-with(@href,'javascript:docommand(')]]")
-        
-        print(f"\n📋 Building menu item list...")
-        items_to_process = []
-        for leaf in all_leaves:
-            if leaf.is_displayed():
-                try:
-                    link = leaf.find_element(By.XPATH, ".//a")
-                    if link.is_displayed():
-                        text = link.text.strip() or "Unknown"
-                        items_to_process.append(text)
-                except:
-                    pass
+        if DISPATCH_MODE:
+            # Page list and docommand ids come from the hierarchy file - no expansion needed
+            get_menu_frame(driver, wait=True)
+            print(f"\n📋 Dispatch mode: loading menu items from {HIERARCHY_FILE}")
+            leaf_pages = load_leaf_pages(HIERARCHY_FILE)
+            items_to_process = [page['text'] for page in leaf_pages]
+            command_ids = [page['unique_id'] for page in leaf_pages]
+        else:
+            # Expand menu
+            print("\n🔧 Expanding menu...")
+            expand_all_menus_recursive(driver)
+            time.sleep(2)
+            
+            # Get menu items
+            get_menu_frame(driver, wait=True)
+            
+            # Find all leaf nodes (clickable items) - use the correct XPath selector
+            all_leaves = driver.find_elements(By.XPATH, ".//li[.//a[starts-with(@href,'javascript:docommand(')]]")
+            
+            print(f"\n📋 Building menu item list...")
+            items_to_process = []
+            for leaf in all_leaves:
+                if leaf.is_displayed():
+                    try:
+                        link = leaf.find_element(By.XPATH, ".//a")
+                        if link.is_displayed():
+                            text = link.text.strip() or "Unknown"
+                            items_to_process.append(text)
+                    except:
+                        pass
         
         total = len(items_to_process)
         print(f"🎯 Found {total} pages to process\n")
@@ -272,46 +281,53 @@ def crawl_with_stats():
             driver.switch_to.default_content()
             get_menu_frame(driver)
             
-            try:
-                link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
-            except:
+            link = None
+            if not DISPATCH_MODE:
                 try:
-                    link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                    link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and text()='{page_name}']")
                 except:
-                    print(f"    ⚠️ Could not find link")
+                    try:
+                        link = driver.find_element(By.XPATH, f".//a[starts-with(@href,'javascript:docommand(') and contains(text(),'{page_name[:20]}')]")
+                    except:
+                        print(f"    ⚠️ Could not find link")
                     
-                    # Record error in stats
-                    stats = {
-                        'PageName': page_name,
-                        'ElementCount': 0,
-                        'PopupOpened': False,
-                        'WindowCount': 1,
-                        'HasIframes': False,
-                        'IframeCount': 0,
-                        'ProcessingTime_ms': 0,
-                        'PageURL': '',
-                        'PageTitle': '',
-                        'ErrorOccurred': True,
-                        'ErrorMessage': 'Could not find menu link',
-                        'Timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                        'InputCount': 0,
-                        'SelectCount': 0,
-                        'TextareaCount': 0,
-                        'TotalInputElements': 0,
-                        'VisibleInputs': 0,
-                        'HiddenInputs': 0
-                    }
-                    save_stats_row(stats_ws, stats)
-                    continue
+                        # Record error in stats
+                        stats = {
+                            'PageName': page_name,
+                            'ElementCount': 0,
+                            'PopupOpened': False,
+                            'WindowCount': 1,
+                            'HasIframes': False,
+                            'IframeCount': 0,
+                            'ProcessingTime_ms': 0,
+                            'PageURL': '',
+                            'PageTitle': '',
+                            'ErrorOccurred': True,
+                            'ErrorMessage': 'Could not find menu link',
+                            'Timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                            'InputCount': 0,
+                            'SelectCount': 0,
+                            'TextareaCount': 0,
+                            'TotalInputElements': 0,
+                            'VisibleInputs': 0,
+                            'HiddenInputs': 0
+                        }
+                        save_stats_row(stats_ws, stats)
+                        continue
             
             main_window = driver.current_window_handle
             
             try:
-                # Click link
-                try:
-                    link.click()
-                except:
-                    driver.execute_script("arguments[0].click();", link)
+                if DISPATCH_MODE:
+                    # Invoke the menu's own docommand with the stored id
+                    if not open_page_by_docommand(driver, command_ids[i]):
+                        raise RuntimeError("docommand() not available in menu frame")
+                else:
+                    # Click link
+                    try:
+                        link.click()
+                    except:
+                        driver.execute_script("arguments[0].click();", link)
                 
                 time.sleep(0.5)  # Wait for popup
                 
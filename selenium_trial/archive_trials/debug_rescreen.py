@@ -8,9 +8,11 @@ from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from page_readiness import wait_for_new_window, wait_for_ready_state, wait_for_field_count_settle, DEFAULT_TIMEOUTS
+from frame_walker import walk_frame_tree, switch_to_frame_path
+
 load_dotenv()
 
 # TEST PAGES - Replace with your 3 pages that have fields
@@ -112,22 +114,19 @@ def debug_frame_info(driver):
         src = frame.get_attribute('src') or 'no-src'
         print(f"      [{idx}] Name: {name}, Src: {src[:60]}...")
 
-def wait_for_page_and_detect_fields(driver, page_name):
+def wait_for_page_and_detect_fields(driver, page_name, known_handles):
     """Wait for page to load and detect fields with detailed debugging"""
     print(f"\n   ⏳ Waiting for page to load...")
     
     try:
-        # Store main window
-        main_window = driver.current_window_handle
-        
         # Wait for popup window to open
-        time.sleep(1)
-        windows = driver.window_handles
-        print(f"   🪟 Window handles: {len(windows)} windows")
+        wait_start = time.time()
+        popup = wait_for_new_window(driver, known_handles, DEFAULT_TIMEOUTS['window'])
+        print(f"   🪟 Window handles: {len(driver.window_handles)} windows ({int((time.time() - wait_start) * 1000)}ms)")
         
-        if len(windows) > 1:
+        if popup:
             # Switch to popup window
-            driver.switch_to.window(windows[-1])
+            driver.switch_to.window(popup)
             print(f"   ✅ Switched to popup window")
         else:
             print(f"   ⚠️ No popup window opened, checking frames...")
@@ -142,46 +141,13 @@ def wait_for_page_and_detect_fields(driver, page_name):
                     print(f"   ✅ Switched to display frame: {frame_name}")
                     break
         
-        # Wait for page to complete
-        WebDriverWait(driver, 8).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
-        time.sleep(2)
-        print(f"   ✅ Page ready state: complete")
-        
-        # Take screenshot for debugging
-        try:
-            screenshot_path = f"debug_{page_name.replace('/', '_')[:30]}.png"
-            driver.save_screenshot(screenshot_path)
-            print(f"   📸 Screenshot saved: {screenshot_path}")
-        except:
-            pass
-        
-        # Check for iframes in the popup/frame
-        try:
-            iframes = driver.find_elements(By.TAG_NAME, 'iframe')
-            if iframes:
-                print(f"   🔍 Found {len(iframes)} nested iframes")
-                driver.switch_to.frame(iframes[0])
-                print(f"   ✅ Switched to nested iframe")
-                time.sleep(0.5)
-        except:
-            pass
-        
-        # CRITICAL: Check for FRAMES in the popup (not iframes)
-        try:
-            frames = driver.find_elements(By.TAG_NAME, 'frame')
-            if frames:
-                print(f"   🔍 Found {len(frames)} frames in popup")
-                # Try first frame (usually contains the form)
-                driver.switch_to.frame(frames[0])
-                print(f"   ✅ Switched to frame: {frames[0].get_attribute('name')}")
-                time.sleep(0.5)
-        except Exception as e:
-            print(f"   ⚠️ Could not switch to frame: {e}")
-        
-        # Now detect fields with detailed debugging
-        print(f"\n   🔍 Detecting fields...")
+        # Wait for page to complete, then for its field count to settle
+        wait_start = time.time()
+        ready = wait_for_ready_state(driver, DEFAULT_TIMEOUTS['ready_state'])
+        print(f"   {'✅' if ready else '⚠️'} Page ready state: {'complete' if ready else 'timed out'} ({int((time.time() - wait_start) * 1000)}ms)")
+        wait_start = time.time()
+        settled_count = wait_for_field_count_settle(driver, DEFAULT_TIMEOUTS['fields'])
+        print(f"   ✅ Field count settled at {settled_count} ({int((time.time() - wait_start) * 1000)}ms)")
         
         # Enhanced selector
         selector = '''
@@ -207,6 +173,35 @@ def wait_for_page_and_detect_fields(driver, page_name):
             select
         '''
         
+        # Take screenshot for debugging
+        try:
+            screenshot_path = f"debug_{page_name.replace('/', '_')[:30]}.png"
+            driver.save_screenshot(screenshot_path)
+            print(f"   📸 Screenshot saved: {screenshot_path}")
+        except:
+            pass
+        
+        # Walk every nested frame/iframe and report where the fields are
+        print(f"\n   🔍 Frame tree:")
+        frame_counts = walk_frame_tree(
+            driver, lambda path: driver.execute_script("return document.querySelectorAll(arguments[0]).length;", selector)
+        )
+        for path, count in frame_counts:
+            print(f"      {path}: {count if count is not None else 'unreadable'} matching elements")
+        
+        # Detect in the frame holding the most fields (usually the form)
+        best_path = max(frame_counts, key=lambda item: item[1] or 0)[0] if frame_counts else 'main'
+        try:
+            if switch_to_frame_path(driver, best_path):
+                print(f"   ✅ Switched to frame: {best_path}")
+            else:
+                print(f"   ⚠️ Frame {best_path} disappeared, staying in main document")
+        except Exception as e:
+            print(f"   ⚠️ Could not switch to frame: {e}")
+        
+        # Now detect fields with detailed debugging
+        print(f"\n   🔍 Detecting fields...")
+        
         all_fields = driver.find_elements(By.CSS_SELECTOR, selector)
         print(f"   📊 Found {len(all_fields)} total elements matching selector")
         
@@ -367,15 +362,15 @@ def test_page(driver, page_name):
         try:
             link = driver.find_element(By.XPATH, f".//a[contains(text(), '{page_name}')]")
             print(f"   ✅ Found menu link")
+            known_handles = driver.window_handles
             link.click()
             print(f"   ✅ Clicked: {page_name}")
-            time.sleep(1)
         except Exception as e:
             print(f"   ❌ Failed to find/click page: {e}")
             return
         
         # Detect fields
-        field_count = wait_for_page_and_detect_fields(driver, page_name)
+        field_count = wait_for_page_and_detect_fields(driver, page_name, known_handles)
         
         print(f"\n   {'✅' if field_count > 0 else '❌'} RESULT: {field_count} fields found")
         
@@ -0,0 +1,115 @@
+"""
+Direct docommand Dispatch
+Opens T24 pages by calling the menu frame's docommand() with the id stored in the
+menu hierarchy (extract_menu_hierarchy.py output) instead of locating, scrolling to
+and clicking the menu link.
+
+- No text XPath lookup, so page names containing quotes work
+- No menu expansion needed - docommand does not care whether the link is visible
+"""
+
+import os
+import json
+from typing import List, Dict
+from openpyxl import load_workbook
+
+# Default hierarchy produced by extract_menu_hierarchy.py (one folder up)
+DEFAULT_HIERARCHY_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'menu_hierarchy3.json'
+)
+
+# Ids extract_node_info generates when no docommand could be parsed - not dispatchable
+SYNTHETIC_ID_PREFIXES = ('PARENT:', 'NODE:', 'ERROR:')
+
+
+def is_dispatchable(unique_id) -> bool:
+    """True if unique_id is a real docommand argument."""
+    return bool(unique_id) and not str(unique_id).startswith(SYNTHETIC_ID_PREFIXES)
+
+
+def load_leaf_pages_from_json(filepath: str) -> List[Dict]:
+    """Read leaf pages (menu order) from the nested hierarchy JSON."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        tree = json.load(f)
+
+    pages = []
+
+    def walk(node):
+        if node.get('type') == 'leaf':
+            pages.append({
+                'text': node.get('text', ''),
+                'unique_id': node.get('unique_id'),
+                'full_path': node.get('full_path', '')
+            })
+        for child in node.get('children', []):
+            walk(child)
+
+    for section in tree:
+        walk(section)
+
+    return pages
+
+
+def load_leaf_pages_from_excel(filepath: str) -> List[Dict]:
+    """Read leaf pages (menu order) from the hierarchy workbook."""
+    wb = load_workbook(filepath, read_only=True)
+    ws = wb.active
+    pages = []
+
+    # Columns: Full Path, Node ID, Level, Node Text, Type, Unique ID, XPath (Unique), Parent Node
+    for row in ws.iter_rows(min_row=2, values_only=True):
+        if row[4] and str(row[4]).startswith('Leaf'):
+            pages.append({
+                'text': row[3] or '',
+                'unique_id': row[5],
+                'full_path': row[0] or ''
+            })
+
+    wb.close()
+    return pages
+
+
+def load_leaf_pages(filepath: str = DEFAULT_HIERARCHY_FILE) -> List[Dict]:
+    """
+    Load dispatchable leaf pages from a menu hierarchy .json or .xlsx file.
+    Pages without a real docommand id are reported and dropped.
+    """
+    if filepath.lower().endswith('.xlsx'):
+        pages = load_leaf_pages_from_excel(filepath)
+    else:
+        pages = load_leaf_pages_from_json(filepath)
+
+    dispatchable = [p for p in pages if is_dispatchable(p['unique_id'])]
+    skipped = len(pages) - len(dispatchable)
+
+    print(f"📂 Loaded {len(pages)} leaf pages from {os.path.basename(filepath)}")
+    if skipped:
+        print(f"   ⚠️ {skipped} leaves have no docommand id and will be skipped")
+
+    return dispatchable
+
+
+def docommand_id_from_href(href: str) -> str:
+    """"javascript:docommand('CUSTOMER,INPUT I F3')" -> 'CUSTOMER,INPUT I F3' ('' if none)."""
+    start = (href or '').find("docommand('")
+    if start == -1:
+        return ''
+    start += len("docommand('")
+    end = href.find("'", start)
+    return href[start:end] if end > start else ''
+
+
+def open_page_by_docommand(driver, command_id: str) -> bool:
+    """
+    Invoke docommand(command_id) - same effect as clicking its menu link.
+    The driver must already be switched to the menu frame.
+    Returns False if the frame has no docommand function.
+    """
+    return driver.execute_script(
+        """
+        if (typeof docommand !== 'function') return false;
+        docommand(arguments[0]);
+        return true;
+        """,
+        command_id
+    )
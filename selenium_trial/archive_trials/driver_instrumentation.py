@@ -0,0 +1,165 @@
+"""
+WebDriver Command Accounting
+Wraps a driver's execute() so every WebDriver command (round trip to chromedriver) is
+counted and timed, and attributed to the crawl phase that issued it:
+
+    menu_frame   switching back to the menu frame (get_menu_frame)
+    link_lookup  finding the menu link for the page
+    click        clicking the link / invoking docommand
+    popup_wait   waiting for the popup window and its fields
+    analyze      page statistics (crawler_iframe_aware)
+    extract      reading the fields
+    close        closing the popup and switching back
+    other        anything issued outside a named phase
+
+Per page: <phase>_cmds (commands) and <phase>_ms (wall time in the phase; for 'other',
+which has no enclosing block, the commands' round-trip time), plus webdriver_cmds /
+webdriver_ms (all commands and their round-trip time).
+Run totals survive browser restarts when the crawler passes the old driver to
+carry_run_totals() (RecyclePolicy.recycle does).
+Drivers that were not instrumented are accepted everywhere and simply report zeros.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+PHASES = ['menu_frame', 'link_lookup', 'click', 'popup_wait', 'analyze', 'extract', 'close']
+OTHER_PHASE = 'other'
+
+# Stats columns added per page, in order
+PHASE_COLUMNS = (
+    [f'{phase}_{metric}' for phase in PHASES + [OTHER_PHASE] for metric in ('cmds', 'ms')]
+    + ['webdriver_cmds', 'webdriver_ms']
+)
+
+
+def _empty_phases() -> Dict[str, Dict]:
+    return {phase: {'cmds': 0, 'cmd_ms': 0.0, 'wall_ms': 0.0} for phase in PHASES + [OTHER_PHASE]}
+
+
+class CommandRecorder:
+    """Command counts/times per phase for the current page and for the whole run."""
+
+    def __init__(self):
+        self.current_phase = OTHER_PHASE
+        self.page = _empty_phases()
+        self.run = _empty_phases()
+        self.commands = {}  # WebDriver command name -> count (whole run)
+
+    def record(self, command: str, elapsed_ms: float):
+        for totals in (self.page, self.run):
+            entry = totals.setdefault(self.current_phase, {'cmds': 0, 'cmd_ms': 0.0, 'wall_ms': 0.0})
+            entry['cmds'] += 1
+            entry['cmd_ms'] += elapsed_ms
+        self.commands[command] = self.commands.get(command, 0) + 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Attribute commands issued inside the block to phase name (phases do not nest)."""
+        previous = self.current_phase
+        self.current_phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.current_phase = previous
+            for totals in (self.page, self.run):
+                totals.setdefault(name, {'cmds': 0, 'cmd_ms': 0.0, 'wall_ms': 0.0})['wall_ms'] += elapsed
+
+    def start_page(self):
+        self.page = _empty_phases()
+
+    @staticmethod
+    def phase_ms(phase: str, entry: Dict) -> float:
+        """Wall time of a named phase; command time for 'other' (never timed as a block)."""
+        return entry.get('cmd_ms' if phase == OTHER_PHASE else 'wall_ms', 0)
+
+    @staticmethod
+    def columns(totals: Dict[str, Dict]) -> Dict:
+        row = {}
+        for phase in PHASES + [OTHER_PHASE]:
+            entry = totals.get(phase, {})
+            row[f'{phase}_cmds'] = entry.get('cmds', 0)
+            row[f'{phase}_ms'] = int(CommandRecorder.phase_ms(phase, entry))
+        row['webdriver_cmds'] = sum(entry['cmds'] for entry in totals.values())
+        row['webdriver_ms'] = int(sum(entry['cmd_ms'] for entry in totals.values()))
+        return row
+
+
+def instrument_driver(driver) -> CommandRecorder:
+    """Wrap driver.execute (WebElement calls go through it too). Idempotent."""
+    recorder = getattr(driver, 'recorder', None)
+    if recorder is not None:
+        return recorder
+
+    recorder = CommandRecorder()
+    raw_execute = driver.execute
+
+    def execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return raw_execute(driver_command, params)
+        finally:
+            recorder.record(driver_command, (time.perf_counter() - start) * 1000)
+
+    driver.execute = execute
+    driver.recorder = recorder
+    return recorder
+
+
+def carry_run_totals(old_driver, new_driver):
+    """After a browser restart: keep counting the run totals of old_driver on new_driver."""
+    old = getattr(old_driver, 'recorder', None)
+    new = getattr(new_driver, 'recorder', None)
+    if old is None or new is None or old is new:
+        return
+    for phase, entry in new.run.items():  # commands the new driver issued during setup
+        totals = old.run.setdefault(phase, {'cmds': 0, 'cmd_ms': 0.0, 'wall_ms': 0.0})
+        for metric, amount in entry.items():
+            totals[metric] += amount
+    for command, count in new.commands.items():
+        old.commands[command] = old.commands.get(command, 0) + count
+    new.run = old.run
+    new.commands = old.commands
+
+
+def crawl_phase(driver, name: str):
+    """with crawl_phase(driver, 'click'): ... - no-op for uninstrumented drivers."""
+    recorder = getattr(driver, 'recorder', None)
+    return recorder.phase(name) if recorder is not None else nullcontext()
+
+
+def start_page(driver):
+    """Reset the per-page counters (call before the first phase of a page)."""
+    recorder = getattr(driver, 'recorder', None)
+    if recorder is not None:
+        recorder.start_page()
+
+
+def page_phase_stats(driver) -> Dict:
+    """PHASE_COLUMNS for the current page."""
+    recorder = getattr(driver, 'recorder', None)
+    return CommandRecorder.columns(recorder.page if recorder is not None else {})
+
+
+def page_phase_values(driver) -> List:
+    """page_phase_stats() as a list in PHASE_COLUMNS order (for ws.append rows)."""
+    stats = page_phase_stats(driver)
+    return [stats[col] for col in PHASE_COLUMNS]
+
+
+def print_phase_summary(driver, pages: int):
+    """Run totals per phase and the most frequent commands."""
+    recorder = getattr(driver, 'recorder', None)
+    if recorder is None or not pages:
+        return
+    print(f"\n🔁 WebDriver commands per page (over {pages} pages):")
+    for phase in PHASES + [OTHER_PHASE]:
+        entry = recorder.run.get(phase, {})
+        ms = CommandRecorder.phase_ms(phase, entry)
+        if entry.get('cmds') or ms:
+            print(f"   {phase:<12} {entry['cmds'] / pages:6.1f} cmds  {ms / pages:8.0f} ms")
+    top = sorted(recorder.commands.items(), key=lambda x: -x[1])[:8]
+    print("   Top commands: " + ", ".join(f"{name} ×{count}" for name, count in top))
@@ -0,0 +1,164 @@
+"""
+Recursive Frame/Iframe Walker
+T24 popups nest <frame> and <iframe> several levels deep; the crawlers only looked
+one iframe level down (and the rescreen scripts tried frames[0] by hand), which is
+why pages with fields ended up in zero_elements_WITH_inputs.csv.
+
+- walk_frame_tree() visits the top document and every nested frame/iframe (depth-first)
+- Every frame gets a path name: 'main', 'frame_1', 'frame_1/iframe_0', ...
+  (index = position among the parent's 'frame, iframe' elements)
+- extract_across_frames() remembers which frame paths held fields, and how many, for
+  each application (keyed by the menu page that opens it) in frame_path_cache.json,
+  so later runs switch straight there - and walk the whole tree again when those
+  frames now give fewer fields (e.g. the form moved to a new frame)
+"""
+
+import os
+import sys
+import json
+from typing import Callable, Dict, List, Tuple, Any
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_io import atomic_write_json
+
+FRAME_CACHE_FILE = 'frame_path_cache.json'
+MAX_FRAME_DEPTH = 6
+
+# One call returns every child frame element with its tag name
+CHILD_FRAMES_SCRIPT = """
+    var frames = document.querySelectorAll('frame, iframe');
+    var result = [];
+    for (var i = 0; i < frames.length; i++) result.push([frames[i], frames[i].tagName.toLowerCase()]);
+    return result;
+"""
+
+
+def frame_path_name(path: List[Tuple[str, int]]) -> str:
+    """[('frame', 1), ('iframe', 0)] -> 'frame_1/iframe_0'; [] -> 'main'."""
+    if not path:
+        return 'main'
+    return '/'.join(f"{tag}_{idx}" for tag, idx in path)
+
+
+def parse_frame_path(name: str) -> List[int]:
+    """'frame_1/iframe_0' -> [1, 0]; 'main' -> []."""
+    if not name or name == 'main':
+        return []
+    return [int(segment.rsplit('_', 1)[1]) for segment in name.split('/')]
+
+
+def switch_to_frame_path(driver, name: str) -> bool:
+    """Switch from the top document down a frame path. Returns False if it no longer exists."""
+    driver.switch_to.default_content()
+    for idx in parse_frame_path(name):
+        frames = driver.find_elements(By.CSS_SELECTOR, 'frame, iframe')
+        if idx >= len(frames):
+            driver.switch_to.default_content()
+            return False
+        driver.switch_to.frame(frames[idx])
+    return True
+
+
+def walk_frame_tree(driver, visit: Callable[[str], Any], max_depth: int = MAX_FRAME_DEPTH) -> List[Tuple[str, Any]]:
+    """
+    Depth-first walk of the current window's frame tree.
+    visit(path_name) runs with the driver switched into each frame.
+    Returns [(path_name, visit_result)] in visiting order; leaves driver in default content.
+    """
+    results = []
+
+    def walk(path, depth):
+        name = frame_path_name(path)
+        try:
+            results.append((name, visit(name)))
+        except Exception:
+            results.append((name, None))
+
+        if depth >= max_depth:
+            return
+
+        try:
+            children = driver.execute_script(CHILD_FRAMES_SCRIPT) or []
+        except Exception:
+            return
+
+        for idx, (frame, tag) in enumerate(children):
+            try:
+                driver.switch_to.frame(frame)
+            except Exception:
+                continue
+            walk(path + [(tag, idx)], depth + 1)
+            try:
+                driver.switch_to.parent_frame()
+            except Exception:
+                # Lost our place (frame navigated away) - re-enter from the top
+                switch_to_frame_path(driver, name)
+
+    driver.switch_to.default_content()
+    walk([], 0)
+    driver.switch_to.default_content()
+    return results
+
+
+def load_frame_cache(filepath: str = FRAME_CACHE_FILE) -> Dict[str, Dict[str, int]]:
+    """Load {application: {frame path: fields found there}}."""
+    if os.path.exists(filepath):
+        try:
+            with open(filepath, 'r') as f:
+                cache = json.load(f)
+        except:
+            return {}
+        # Older caches kept only the paths - no counts to compare against
+        return {key: paths if isinstance(paths, dict) else {path: 0 for path in paths}
+                for key, paths in cache.items()}
+    return {}
+
+
+def save_frame_cache(cache: Dict[str, Dict[str, int]], filepath: str = FRAME_CACHE_FILE):
+    """Persist the frame path cache (atomic - a killed run never leaves it half written)."""
+    try:
+        atomic_write_json(filepath, cache, keep_backup=False, indent=2, sort_keys=True)
+    except Exception as e:
+        print(f"⚠️ Failed to save frame cache: {e}")
+
+
+def extract_across_frames(driver, extract_fn: Callable[[str], List], cache: Dict = None, key: str = None) -> List[Tuple[str, List]]:
+    """
+    Run extract_fn(frame_path) in the frames of the current popup and return
+    [(frame_path, rows)] - rows are tagged by the caller with frame_path.
+
+    With a cache hit for key, only the remembered frame paths are visited; if they
+    yield fewer rows than last time (or none) the full tree is walked again, reusing
+    the rows already read from the remembered frames (extract_fn may dedupe, so it is
+    not run twice in one frame). After a full walk the paths that produced rows are
+    stored in cache[key] with their row counts.
+    """
+    visited = {}
+    if cache is not None and key and cache.get(key):
+        remembered = cache[key]
+        for path_name in remembered:
+            try:
+                if switch_to_frame_path(driver, path_name):
+                    visited[path_name] = extract_fn(path_name) or []
+            except Exception:
+                pass
+        driver.switch_to.default_content()
+        found = sum(len(rows) for rows in visited.values())
+        if found and found >= sum(remembered.values()):
+            return list(visited.items())
+
+    def visit(path_name):
+        if path_name in visited:
+            return visited[path_name]
+        return extract_fn(path_name)
+
+    results = [(name, rows or []) for name, rows in walk_frame_tree(driver, visit)]
+
+    if cache is not None and key:
+        field_paths = {name: len(rows) for name, rows in results if rows}
+        if field_paths:
+            cache[key] = field_paths
+
+    return results
@@ -4,8 +4,8 @@ Creates Inspector-searchable selectors for each parent node without XPath
 Output: Excel file with alternative selectors for DevTools inspection
 """
 
-from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
+from workbook_table import load_table
 
 def generate_dom_paths_for_na_nodes():
     """
@@ -14,40 +14,15 @@ def generate_dom_paths_for_na_nodes():
     
     # Load the Excel file
     excel_file = 'menu_hierarchy3.xlsx'
-    wb = load_workbook(excel_file)
-    ws = wb.active
+    table = load_table(excel_file)
     
     print('=== GENERATING DOM PATHS FOR N/A XPATH NODES ===\n')
     
-    # Get header row
-    headers = {}
-    for col in range(1, ws.max_column + 1):
-        header_name = ws.cell(1, col).value
-        headers[header_name] = col
-    
-    # Extract columns we need
-    xpath_col = headers.get('XPath (Unique)')
-    full_path_col = headers.get('Full Path')
-    node_text_col = headers.get('Node Text')
-    parent_col = headers.get('Parent Node')
-    level_col = headers.get('Level')
-    node_id_col = headers.get('Node ID')
-    unique_id_col = headers.get('Unique ID')
-    
-    # Collect all rows and find N/A rows
+    # Collect all rows (just the columns we need) and find N/A rows
     all_rows = []
     na_rows = []
     
-    for row in range(2, ws.max_row + 1):
-        row_data = {
-            'Node ID': ws.cell(row, node_id_col).value,
-            'Full Path': ws.cell(row, full_path_col).value,
-            'Node Text': ws.cell(row, node_text_col).value,
-            'Parent Node': ws.cell(row, parent_col).value,
-            'Level': ws.cell(row, level_col).value,
-            'XPath (Unique)': ws.cell(row, xpath_col).value,
-            'Unique ID': ws.cell(row, unique_id_col).value,
-        }
+    for row_data in table.records(['Node ID', 'Full Path', 'Node Text', 'Parent Node', 'Level', 'XPath (Unique)', 'Unique ID']):
         all_rows.append(row_data)
         
         # Check if this row has N/A xpath
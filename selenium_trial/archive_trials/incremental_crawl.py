@@ -0,0 +1,166 @@
+"""
+Incremental Re-Crawl from Menu Hierarchy Diffs
+A T24 release usually touches a handful of menu entries, yet every run crawled all
+~4,336 leaves. With INCREMENTAL_FROM=<previous menu_hierarchy*.json> the crawler diffs
+the fresh hierarchy (MENU_HIERARCHY_FILE) against the previous one and only crawls
+what changed:
+
+- Leaves are matched by unique_id (the docommand id)
+- added:     id not in the previous hierarchy            -> crawled
+- changed:   same id, different page text or menu path   -> crawled
+- unchanged: same id, text and path                      -> rows carried over from the
+             previous UI map (no popup opened)
+- removed:   id gone                                     -> reported; its rows are pruned
+             unless the page name is still used by another leaf
+
+Page rows are keyed by page name (the menu text), so a name shared by an unchanged and a
+changed leaf is re-crawled. The diff and what was carried/pruned are written to
+INCREMENTAL_REPORT_FILE.
+
+Standalone diff:
+    python incremental_crawl.py <previous_hierarchy.json> [current_hierarchy.json]
+"""
+
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_io import atomic_write_json
+from docommand_dispatch import DEFAULT_HIERARCHY_FILE, load_leaf_pages_from_json, load_leaf_pages_from_excel
+
+INCREMENTAL_FROM = os.getenv('INCREMENTAL_FROM', '')   # previous hierarchy file; empty = full crawl
+INCREMENTAL_REPORT_FILE = 'incremental_report.json'
+
+
+def load_leaves_by_id(filepath: str) -> Dict[str, List[Dict]]:
+    """unique_id -> leaves with that id (a command can sit in several menus), in menu order."""
+    if filepath.lower().endswith('.xlsx'):
+        pages = load_leaf_pages_from_excel(filepath)
+    else:
+        pages = load_leaf_pages_from_json(filepath)
+
+    leaves = {}
+    for page in pages:
+        key = page['unique_id'] or f"PATH:{page['full_path']}"
+        leaves.setdefault(key, []).append(page)
+    return leaves
+
+
+def _signature(leaves: List[Dict]) -> List[Tuple[str, str]]:
+    return sorted((leaf['text'], leaf['full_path']) for leaf in leaves)
+
+
+def diff_hierarchies(previous_file: str, current_file: str) -> Dict:
+    """
+    Compare two hierarchy files leaf by leaf (unique_id).
+    Returns the leaf lists per category plus the page names to crawl, carry over and prune.
+    """
+    previous = load_leaves_by_id(previous_file)
+    current = load_leaves_by_id(current_file)
+
+    added, changed, unchanged, removed = [], [], [], []
+    for unique_id, leaves in current.items():
+        if unique_id not in previous:
+            added.extend(leaves)
+        elif _signature(leaves) != _signature(previous[unique_id]):
+            changed.extend(leaves)
+        else:
+            unchanged.extend(leaves)
+    for unique_id, leaves in previous.items():
+        if unique_id not in current:
+            removed.extend(leaves)
+
+    current_pages = {leaf['text'] for leaves in current.values() for leaf in leaves}
+    crawl_pages = {leaf['text'] for leaf in added + changed}
+    carry_pages = {leaf['text'] for leaf in unchanged} - crawl_pages
+    # Old names of changed leaves go too - their rows are re-extracted under the new name
+    old_changed = {leaf['text'] for uid in {l['unique_id'] for l in changed} for leaf in previous.get(uid, [])}
+    prune_pages = ({leaf['text'] for leaf in removed} | old_changed) - current_pages
+
+    return {
+        'previous_file': previous_file,
+        'current_file': current_file,
+        'added': added,
+        'changed': changed,
+        'unchanged': unchanged,
+        'removed': removed,
+        'crawl_pages': crawl_pages,
+        'carry_pages': carry_pages,
+        'prune_pages': prune_pages,
+    }
+
+
+def split_previous_rows(rows: Iterable[Dict], diff: Dict) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Rows of the previous UI map to keep (unchanged pages) and the number of rows dropped
+    per pruned page. Rows of pages being re-crawled are dropped silently.
+    """
+    carried = []
+    pruned = {}
+    for row in rows:
+        page = row.get('page')
+        if page in diff['carry_pages']:
+            carried.append(row)
+        elif page not in diff['crawl_pages']:
+            pruned[page] = pruned.get(page, 0) + 1
+    return carried, pruned
+
+
+def print_diff(diff: Dict):
+    print(f"\n🔀 Menu diff: {os.path.basename(diff['previous_file'])} → {os.path.basename(diff['current_file'])}")
+    print(f"   ➕ Added:     {len(diff['added'])}")
+    print(f"   ✏️ Changed:   {len(diff['changed'])}")
+    print(f"   ➖ Removed:   {len(diff['removed'])}")
+    print(f"   ✅ Unchanged: {len(diff['unchanged'])}")
+    for leaf in diff['removed'][:20]:
+        print(f"      - {leaf['full_path']} ({leaf['unique_id']})")
+    if len(diff['removed']) > 20:
+        print(f"      ... and {len(diff['removed']) - 20} more (see {INCREMENTAL_REPORT_FILE})")
+    print(f"   🎯 {len(diff['crawl_pages'])} pages to crawl, {len(diff['carry_pages'])} carried over")
+
+
+def save_incremental_report(diff: Dict, carried_rows: int = 0, pruned: Dict[str, int] = None):
+    """Write the diff (leaf lists) and the carry-over/prune outcome to INCREMENTAL_REPORT_FILE."""
+    pruned = pruned or {}
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'previous_file': diff['previous_file'],
+        'current_file': diff['current_file'],
+        'summary': {
+            'added': len(diff['added']),
+            'changed': len(diff['changed']),
+            'removed': len(diff['removed']),
+            'unchanged': len(diff['unchanged']),
+            'pages_to_crawl': len(diff['crawl_pages']),
+            'pages_carried_over': len(diff['carry_pages']),
+            'rows_carried_over': carried_rows,
+            'pages_pruned': len(pruned),
+            'rows_pruned': sum(pruned.values()),
+        },
+        'added': diff['added'],
+        'changed': diff['changed'],
+        'removed': diff['removed'],
+        'pruned_rows_per_page': pruned,
+    }
+    atomic_write_json(INCREMENTAL_REPORT_FILE, report, indent=2, ensure_ascii=False)
+    return report
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python incremental_crawl.py <previous_hierarchy.json> [current_hierarchy.json]")
+        sys.exit(1)
+    previous_file = sys.argv[1]
+    current_file = sys.argv[2] if len(sys.argv) > 2 else os.getenv('MENU_HIERARCHY_FILE', DEFAULT_HIERARCHY_FILE)
+
+    diff = diff_hierarchies(previous_file, current_file)
+    print_diff(diff)
+    save_incremental_report(diff)
+    print(f"\n📄 Report saved to {INCREMENTAL_REPORT_FILE}")
+
+
+if __name__ == '__main__':
+    main()
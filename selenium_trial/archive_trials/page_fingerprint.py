@@ -0,0 +1,169 @@
+"""
+Per-Page DOM Fingerprint Cache
+Most application screens are identical from one run to the next, so re-extracting
+them is wasted work. Once the popup is ready, one execute_script builds a normalized
+field list of the whole popup (top document and every same-origin frame):
+tag, id, name, class and type of each input/select/textarea, with its frame path.
+Its SHA-1 is the page fingerprint.
+
+The fingerprint only covers what build_field_data() reads - a crawler.py row is built
+from exactly those five attributes - so the cache is valid only for build_field_data-shaped
+rows. Extractors that also record position, fullXpath or labels (crawler_fast, the CDP
+fullXpath columns) must not use it: a moved field keeps the same fingerprint.
+
+- FingerprintCache maps docommand id -> (fingerprint, extracted rows) and lives in
+  FINGERPRINT_CACHE_FILE (JSON Lines, last entry per id wins, compacted on load)
+- Only the fingerprint and the byte offset of each id's line stay in memory; a hit
+  reads that one line back from the file
+- Fingerprint matches the cached one -> the cached rows are reused and the
+  extract_xpaths_* pipeline is skipped
+- Anything else (new id, different fingerprint, fingerprint script failed) is a miss:
+  the page is extracted normally and the cache entry replaced
+- hits / misses / hit rate are printed at the end of the run
+
+FINGERPRINT_CACHE=false disables the cache (every page is extracted).
+"""
+
+import os
+import sys
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming_output import JsonlSink
+from atomic_io import TEMP_SUFFIX, replace_atomically
+
+FINGERPRINT_CACHE_FILE = 'page_fingerprint_cache.jsonl'
+FINGERPRINT_CACHE = os.getenv('FINGERPRINT_CACHE', 'true').lower() in ('1', 'true', 'yes')
+
+# Everything build_field_data() reads from a field, for every field in every reachable frame
+FINGERPRINT_SCRIPT = """
+    var parts = [];
+    function walk(doc, path, depth) {
+        var fields = doc.querySelectorAll('input, select, textarea');
+        for (var i = 0; i < fields.length; i++) {
+            var el = fields[i];
+            parts.push([path, el.tagName.toLowerCase(), el.id || '', el.getAttribute('name') || '',
+                        el.getAttribute('class') || '', (el.type || '').toLowerCase()].join('\\u001f'));
+        }
+        if (depth >= 6) return;
+        var frames = doc.querySelectorAll('frame, iframe');
+        for (var j = 0; j < frames.length; j++) {
+            var child = null;
+            try { child = frames[j].contentDocument; } catch (e) {}
+            if (child) walk(child, path + '/' + frames[j].tagName.toLowerCase() + '_' + j, depth + 1);
+        }
+    }
+    walk(document, 'main', 0);
+    return parts.join('\\u001e');
+"""
+
+
+def page_fingerprint(driver) -> Optional[str]:
+    """SHA-1 of the popup's normalized field list, or None if the script failed."""
+    try:
+        normalized = driver.execute_script(FINGERPRINT_SCRIPT)
+    except Exception:
+        return None
+    if normalized is None:
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _iter_lines_with_offsets(filepath: str):
+    """Yield (byte offset, entry) for every readable line of a JSON Lines file."""
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'rb') as f:
+        offset = 0
+        for line in f:
+            start, offset = offset, offset + len(line)
+            try:
+                yield start, json.loads(line)
+            except ValueError:
+                continue
+
+
+class FingerprintCache:
+    """docommand id -> fingerprint + extracted rows, persisted as JSON Lines (rows stay on disk)."""
+
+    def __init__(self, filepath: str = FINGERPRINT_CACHE_FILE, enabled: bool = FINGERPRINT_CACHE):
+        self.filepath = filepath
+        self.enabled = enabled
+        self.entries = {}   # command id -> (fingerprint, byte offset of its line)
+        self.hits = 0
+        self.misses = 0
+        self.sink = None
+        if not enabled:
+            return
+
+        lines = 0
+        for offset, entry in _iter_lines_with_offsets(filepath):
+            lines += 1
+            if isinstance(entry, dict) and entry.get('command_id') and entry.get('fingerprint'):
+                self.entries[entry['command_id']] = (entry['fingerprint'], offset)
+        if lines > 2 * len(self.entries) + 100:
+            self.compact()
+        self.sink = JsonlSink(filepath)
+        if self.entries:
+            print(f"🧬 Fingerprint cache: {len(self.entries)} pages from {filepath}")
+
+    def _read_entry(self, offset: int) -> Optional[Dict]:
+        try:
+            with open(self.filepath, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def compact(self):
+        """Rewrite the file with one line per command id (copied line by line, not loaded)."""
+        tmp_path = self.filepath + TEMP_SUFFIX
+        compacted = {}
+        with open(self.filepath, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for command_id, (fingerprint, offset) in self.entries.items():
+                src.seek(offset)
+                compacted[command_id] = (fingerprint, dst.tell())
+                dst.write(src.readline())
+        replace_atomically(tmp_path, self.filepath, keep_backup=False)
+        self.entries = compacted
+
+    def lookup(self, command_id: str, fingerprint: Optional[str], page_name: str) -> Optional[List[Dict]]:
+        """Cached rows (relabelled with page_name) if the fingerprint matches, else None. Counts the hit/miss."""
+        if not self.enabled:
+            return None
+        cached = self.entries.get(command_id) if command_id else None
+        entry = None
+        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+            entry = self._read_entry(cached[1])
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [{**row, 'page': page_name} for row in entry['rows']]
+
+    def store(self, command_id: str, fingerprint: Optional[str], page_name: str, rows: List[Dict]):
+        """Remember the rows extracted for this fingerprint (appended to the cache file)."""
+        if not self.enabled or not command_id or fingerprint is None:
+            return
+        entry = {'command_id': command_id, 'fingerprint': fingerprint, 'page': page_name, 'rows': rows}
+        offset = os.path.getsize(self.filepath)  # every append is flushed - the line starts at EOF
+        self.sink.append([entry])
+        self.entries[command_id] = (fingerprint, offset)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        lookups = self.hits + self.misses
+        print(f"🧬 Fingerprint cache: {self.hits} hits, {self.misses} misses"
+              f" ({self.hit_rate() * 100:.1f}% hit rate over {lookups} pages)")
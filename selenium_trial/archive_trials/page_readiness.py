@@ -0,0 +1,169 @@
+"""
+Event-Driven Popup Readiness
+Replaces the fixed sleeps after clicking a menu item with a chain of waits:
+
+1. a new window handle appears (the docommand popup)
+2. document.readyState == 'complete'
+3. a nested <frame>/<iframe> is present (or fields are already in the top document)
+4. the form's field count stops changing
+
+Each step has its own timeout and the time spent in each is returned per page,
+so slow pages get the time they need and fast pages don't wait at all.
+"""
+
+import time
+from typing import Dict, Optional
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+# Seconds per step - override per call with wait_for_page_ready(..., timeouts={...})
+DEFAULT_TIMEOUTS = {
+    'window': 5,          # popup window to open
+    'ready_state': 8,     # popup document to finish loading
+    'frame': 1,           # nested frame/iframe to appear (frameless pages skip quickly)
+    'fields': 5,          # field count to settle
+}
+POLL_INTERVAL = 0.1
+SETTLE_SECONDS = 0.3      # field count must be unchanged this long
+EMPTY_GRACE_SECONDS = 1.5 # a zero count must hold this long before the page counts as empty
+
+# Counts fillable fields in the document and every same-origin frame below it
+FIELD_COUNT_SCRIPT = """
+    function countIn(doc) {
+        var total = doc.querySelectorAll('input:not([type="hidden"]), select, textarea').length;
+        var frames = doc.querySelectorAll('frame, iframe');
+        for (var i = 0; i < frames.length; i++) {
+            try {
+                if (frames[i].contentDocument) total += countIn(frames[i].contentDocument);
+            } catch (e) {}
+        }
+        return total;
+    }
+    return countIn(document);
+"""
+
+FRAME_OR_FIELDS_SCRIPT = """
+    return document.querySelectorAll('frame, iframe, input:not([type="hidden"]), select, textarea').length > 0;
+"""
+
+
+def _elapsed_ms(start: float) -> int:
+    return int((time.time() - start) * 1000)
+
+
+def wait_for_new_window(driver, known_handles, timeout: float) -> Optional[str]:
+    """Wait for a window handle not in known_handles. Returns it, or None on timeout."""
+    known = set(known_handles)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: len(set(d.window_handles) - known) > 0
+        )
+    except TimeoutException:
+        return None
+    new_handles = [h for h in driver.window_handles if h not in known]
+    return new_handles[-1] if new_handles else None
+
+
+def wait_for_ready_state(driver, timeout: float) -> bool:
+    """Wait for document.readyState == 'complete' in the current context."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_frame_or_fields(driver, timeout: float) -> bool:
+    """Wait until the document holds a frame/iframe or fields of its own."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            lambda d: d.execute_script(FRAME_OR_FIELDS_SCRIPT)
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_field_count_settle(driver, timeout: float,
+                                settle_seconds: float = SETTLE_SECONDS,
+                                empty_grace_seconds: float = EMPTY_GRACE_SECONDS) -> int:
+    """
+    Poll the field count (document + nested frames) until it is stable.
+    Returns the last count seen; gives up at timeout.
+    """
+    deadline = time.time() + timeout
+    last_count = -1
+    stable_since = time.time()
+
+    while True:
+        try:
+            count = driver.execute_script(FIELD_COUNT_SCRIPT)
+        except Exception:
+            count = 0
+
+        now = time.time()
+        if count != last_count:
+            last_count = count
+            stable_since = now
+
+        required = settle_seconds if count > 0 else empty_grace_seconds
+        if now - stable_since >= required or now >= deadline:
+            return last_count
+
+        time.sleep(POLL_INTERVAL)
+
+
+def wait_for_page_ready(driver, known_handles, timeouts: Dict = None) -> Dict:
+    """
+    Run the full readiness chain after a menu click/docommand.
+    On success the driver is switched to the popup window.
+
+    Returns per-page timings:
+      {'popup_opened', 'window_ms', 'ready_state_ms', 'frame_ms', 'fields_ms',
+       'field_count', 'total_wait_ms', 'timed_out' (name of first step that timed out or '')}
+    """
+    limits = dict(DEFAULT_TIMEOUTS)
+    if timeouts:
+        limits.update(timeouts)
+
+    timing = {
+        'popup_opened': False,
+        'window_ms': 0,
+        'ready_state_ms': 0,
+        'frame_ms': 0,
+        'fields_ms': 0,
+        'field_count': 0,
+        'total_wait_ms': 0,
+        'timed_out': ''
+    }
+    overall_start = time.time()
+
+    step_start = time.time()
+    handle = wait_for_new_window(driver, known_handles, limits['window'])
+    timing['window_ms'] = _elapsed_ms(step_start)
+    if handle is None:
+        timing['timed_out'] = 'window'
+        timing['total_wait_ms'] = _elapsed_ms(overall_start)
+        return timing
+
+    driver.switch_to.window(handle)
+    timing['popup_opened'] = True
+
+    step_start = time.time()
+    if not wait_for_ready_state(driver, limits['ready_state']):
+        timing['timed_out'] = 'ready_state'
+    timing['ready_state_ms'] = _elapsed_ms(step_start)
+
+    step_start = time.time()
+    if not wait_for_frame_or_fields(driver, limits['frame']) and not timing['timed_out']:
+        timing['timed_out'] = 'frame'
+    timing['frame_ms'] = _elapsed_ms(step_start)
+
+    step_start = time.time()
+    timing['field_count'] = wait_for_field_count_settle(driver, limits['fields'])
+    timing['fields_ms'] = _elapsed_ms(step_start)
+
+    timing['total_wait_ms'] = _elapsed_ms(overall_start)
+    return timing
@@ -5,9 +5,10 @@ Uses items_to_rescreen.json to target specific menu items by name.
 import json
 import sys
 from crawler import (
-    setup_driver, login, get_menu_frame, expand_all_menus_recursive,
+    setup_driver, get_menu_frame, expand_all_menus_recursive,
     extract_xpaths_from_page, export_to_excel, load_existing_data
 )
+from session_fanout import sign_on
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -155,10 +156,12 @@ if __name__ == "__main__":
     
     try:
         print("🔐 Logging in...")
-        if not login(driver):
-            print("❌ Login failed")
-            driver.quit()
-            sys.exit(1)
+        sign_on(
+            driver,
+            os.getenv('APP_URL', 'http://10.0.251.41:18080/BrowserWeb/servlet/BrowserServlet'),
+            os.getenv('APP_USERNAME', 'MB.OFFICER'),
+            os.getenv('APP_PASSWORD', '123456')
+        )
         
         print("✅ Login successful")
         
@@ -5,6 +5,11 @@ Compares checkpoint (processed items) vs Excel (items with data) to find misses.
 import json
 import openpyxl
 import os
+import sys
+
+# Shared helpers live in the parent selenium_trial/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from checkpoint_journal import CheckpointJournal
 
 # Configuration
 CHECKPOINT_FILE = "crawler_checkpoint.json"
@@ -17,11 +22,13 @@ def load_checkpoint():
         print(f"❌ Checkpoint file not found: {CHECKPOINT_FILE}")
         return None, None
     
-    with open(CHECKPOINT_FILE, 'r') as f:
-        data = json.load(f)
-    
-    processed_items = set(data.get('processed_items', []))
-    last_index = data.get('last_index', 0)
+    # Replay the journal: compacted snapshot + one record per processed page
+    state, records = CheckpointJournal(CHECKPOINT_FILE).load()
+    processed_items = set(state.get('processed_items', []))
+    last_index = state.get('last_index', 0)
+    for record in records:
+        processed_items.add(record.get('item'))
+        last_index = max(last_index, record.get('index', 0))
     
     print(f"📋 Checkpoint loaded:")
     print(f"   - Total processed: {len(processed_items)}")
@@ -4,16 +4,23 @@ Handles slow-loading pages and alternative field patterns like id="value:1:1:1"
 """
 
 import os
+import sys
 import time
 import pandas as pd
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from openpyxl import Workbook
 
+# Shared helpers live in the parent selenium_trial/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from menu_expansion import expand_menus_batched
+from page_readiness import wait_for_page_ready
+from frame_walker import extract_across_frames, load_frame_cache, save_frame_cache
+from session_fanout import sign_on
+
 load_dotenv()
 
 def setup_driver():
@@ -27,21 +34,11 @@ def setup_driver():
     return driver
 
 def login(driver):
-    """Login to T24"""
+    """Login to T24 (reusing a recent session from another script when T24 accepts it)"""
     url = os.getenv('APP_URL', 'http://10.0.251.41:18080/BrowserWeb/servlet/BrowserServlet')
     username = os.getenv('APP_USERNAME', 'MB.OFFICER')
     password = os.getenv('APP_PASSWORD', '123456')
-    
-    print(f"🌐 Navigating to {url}")
-    driver.get(url)
-    time.sleep(2)
-    
-    print(f"🔐 Logging in as {username}")
-    driver.find_element(By.NAME, 'signOnName').send_keys(username)
-    driver.find_element(By.NAME, 'password').send_keys(password)
-    driver.find_element(By.CSS_SELECTOR, 'input[type="submit"]').click()
-    time.sleep(3)
-    print("✅ Login successful")
+    sign_on(driver, url, username, password)
 
 def get_menu_frame(driver):
     """Switch to menu frame"""
@@ -57,6 +54,11 @@ def get_menu_frame(driver):
 def expand_all_menus(driver):
     """Expand all menu items so pages are visible"""
     print("\n🔧 Expanding all menu items...")
+    try:
+        return expand_menus_batched(driver)['total']
+    except Exception as e:
+        print(f"⚠️ Batched expansion failed ({str(e)[:60]}), falling back to clicking icons")
+    
     expanded_total = 0
     max_passes = 20
     
@@ -93,40 +95,19 @@ def expand_all_menus(driver):
     
     return expanded_total
 
-def wait_for_page_load(driver, timeout=8):
-    """Wait for page to fully load - handles slow pages"""
+def wait_for_page_load(driver, known_handles, timeout=8):
+    """
+    Wait for popup to fully load - handles slow pages without fixed sleeps.
+    Returns the readiness timings dict, or None if no popup opened.
+    """
     try:
-        # Store main window
-        main_window = driver.current_window_handle
-        
-        # Wait for popup window to open
-        time.sleep(1)
-        windows = driver.window_handles
-        
-        if len(windows) > 1:
-            # Switch to popup window
-            driver.switch_to.window(windows[-1])
-            
-            # Wait for page to complete
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            time.sleep(2)
-            
-            # Try switching to first frame if exists (best effort, may fail but fields still accessible)
-            try:
-                frames = driver.find_elements(By.TAG_NAME, 'frame')
-                if frames:
-                    driver.switch_to.frame(frames[0])
-                    time.sleep(0.5)
-            except:
-                pass  # Fields are accessible even without switching
-            
-            return True
-        
-        return False
+        # Popup window -> readyState -> nested frame -> settled field count
+        readiness = wait_for_page_ready(driver, known_handles, {'ready_state': timeout})
+        if not readiness['popup_opened']:
+            return None
+        return readiness
     except:
-        return False
+        return None
 
 def close_popup(driver):
     """Close popup window"""
@@ -236,14 +217,38 @@ def generate_xpath(driver, element):
     except:
         return "N/A"
 
-def rescreen_page(driver, page_name):
+def detect_fields_in_frame(driver, frame_path, samples, max_samples=10):
+    """
+    Run enhanced detection in the current frame.
+    Details for the first max_samples fields (across all frames) go into samples -
+    they must be read here, while the driver is still inside the field's frame.
+    """
+    fields = enhanced_field_detection(driver)
+    for field in fields:
+        if len(samples) >= max_samples:
+            break
+        details = extract_field_details(field)
+        if details:
+            samples.append({
+                'xpath': generate_xpath(driver, field),
+                'id': details['id'],
+                'name': details['name'],
+                'type': details['type'],
+                'tag': details['tagName'],
+                'frame': frame_path
+            })
+    return fields
+
+def rescreen_page(driver, page_name, frame_cache=None):
     """Rescreen a single page with enhanced detection"""
     result = {
         'page_name': page_name,
         'status': 'Unknown',
         'field_count': 0,
         'fields_found': [],
-        'notes': ''
+        'field_frames': '',
+        'notes': '',
+        'wait_ms': 0
     }
     
     try:
@@ -260,48 +265,41 @@ def rescreen_page(driver, page_name):
         try:
             # Try docommand link
             link = driver.find_element(By.XPATH, f".//a[contains(text(), '{page_name}')]")
+            known_handles = driver.window_handles
             link.click()
             print(f"   📄 Clicked: {page_name}")
             
-            # CRITICAL: Wait and switch to the display frame where form fields appear
-            time.sleep(1)
-            
         except:
             result['status'] = 'Page Not Found'
             result['notes'] = 'Could not find menu item'
             return result
         
         # Wait for page to load (extended timeout for slow pages)
-        if not wait_for_page_load(driver, timeout=8):
+        readiness = wait_for_page_load(driver, known_handles, timeout=8)
+        if not readiness:
             result['status'] = 'Load Timeout'
             result['notes'] = 'Page took too long to load'
             return result
+        result['wait_ms'] = readiness['total_wait_ms']
         
-        # Detect fields with enhanced logic
-        fields = enhanced_field_detection(driver)
+        # Detect fields with enhanced logic in the main document and every nested frame/iframe
+        samples = []
+        frame_results = extract_across_frames(
+            driver, lambda frame_path: detect_fields_in_frame(driver, frame_path, samples), frame_cache, page_name
+        )
+        field_count = sum(len(fields) for _, fields in frame_results)
         
-        if len(fields) == 0:
+        if field_count == 0:
             result['status'] = 'No Fields (Genuine)'
             result['notes'] = 'Page has no input fields'
         else:
             result['status'] = 'Fields Found'
-            result['field_count'] = len(fields)
-            
-            # Extract details for first 10 fields (avoid overwhelming output)
-            for field in fields[:10]:
-                details = extract_field_details(field)
-                if details:
-                    xpath = generate_xpath(driver, field)
-                    result['fields_found'].append({
-                        'xpath': xpath,
-                        'id': details['id'],
-                        'name': details['name'],
-                        'type': details['type'],
-                        'tag': details['tagName']
-                    })
+            result['field_count'] = field_count
+            result['fields_found'] = samples
+            result['field_frames'] = ', '.join(name for name, fields in frame_results if fields)
             
-            if len(fields) > 10:
-                result['notes'] = f'Showing 10 of {len(fields)} fields'
+            if field_count > len(samples):
+                result['notes'] = f'Showing {len(samples)} of {field_count} fields'
         
         # Close the popup before moving to next page
         close_popup(driver)
@@ -325,7 +323,7 @@ def export_results(results, filepath):
     ws.title = 'Rescreen Results'
     
     # Headers
-    ws.append(['Page Name', 'Status', 'Field Count', 'Sample Field 1', 'Sample Field 2', 'Notes'])
+    ws.append(['Page Name', 'Status', 'Field Count', 'Sample Field 1', 'Sample Field 2', 'Notes', 'Wait (ms)', 'Field Frames'])
     
     for result in results:
         fields = result['fields_found']
@@ -338,7 +336,9 @@ def export_results(results, filepath):
             result['field_count'],
             sample1,
             sample2,
-            result['notes']
+            result['notes'],
+            result['wait_ms'],
+            result['field_frames']
         ])
     
     # Auto-adjust columns
@@ -381,6 +381,7 @@ def main():
     
     driver = setup_driver()
     results = []
+    frame_cache = load_frame_cache()
     
     try:
         login(driver)
@@ -397,14 +398,11 @@ def main():
         for idx, page_name in enumerate(page_list, 1):
             print(f"[{idx}/{len(page_list)}] Processing: {page_name}")
             
-            result = rescreen_page(driver, page_name)
+            result = rescreen_page(driver, page_name, frame_cache)
             results.append(result)
             
             status_icon = "✅" if result['field_count'] > 0 else "⚪" if result['status'] == 'No Fields (Genuine)' else "❌"
-            print(f"   {status_icon} {result['status']} - {result['field_count']} fields")
-            
-            # Small delay between pages
-            time.sleep(0.5)
+            print(f"   {status_icon} {result['status']} - {result['field_count']} fields ({result['wait_ms']}ms wait)")
         
         # Export results
         export_results(results, 'rescreen_results.xlsx')
@@ -429,6 +427,7 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        save_frame_cache(frame_cache)
         print("\n🔚 Closing browser...")
         driver.quit()
 
@@ -0,0 +1,284 @@
+"""
+Compact Dedup Index for Extracted Rows
+The crawlers dedupe every extracted row against a global set of 6-8 string tuples
+(page, xpath, elementName, id, name, className, tagName, type). Each tuple keeps its
+strings alive, so memory and resume time grow with the whole crawl.
+
+SeenRowIndex is a drop-in replacement for that set (in / add / update / len):
+
+- each key is stored as a 16-byte BLAKE2b digest of its length-prefixed, type-tagged
+  parts - ('a', None) and ('a', '') stay different keys, as they were in the tuple set
+- digests loaded from disk stay in a sorted, memory-mapped block (binary search);
+  digests added during the run go to a small in-memory set
+- save() writes all digests sorted, together with a stamp of the row journal they
+  describe (size, mtime_ns and a hash of its last block); open_for_journal() maps that
+  file on resume if the journal's stamp is unchanged and rebuilds from the journal
+  otherwise, so a stale index is never trusted - even one whose journal was rewritten
+  to the same size
+
+intern_row() interns the repeated columns (page, className, tagName, type) of rows
+that are still held in memory, e.g. rows carried over from a previous UI map.
+
+Benchmark (set of tuples vs index, memory and time):
+    python seen_rows_index.py benchmark [rows]
+"""
+
+import os
+import sys
+import mmap
+import bisect
+import time
+import struct
+import hashlib
+import tracemalloc
+from typing import Callable, Dict, Iterable, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_io import replace_atomically, TEMP_SUFFIX
+
+DIGEST_SIZE = 16
+INDEX_MAGIC = b'SEENIDX2'
+STAMP = struct.Struct('<Qq16s')    # journal size, mtime_ns, digest of its last block
+HEADER = struct.Struct('<8sQ' + STAMP.format[1:])  # magic, digest count, journal stamp
+STAMP_TAIL_BYTES = 64 * 1024
+EMPTY_STAMP = STAMP.pack(0, 0, bytes(DIGEST_SIZE))
+INTERNED_FIELDS = ('page', 'className', 'tagName', 'type')
+
+
+def _encode_part(value) -> bytes:
+    if value is None:
+        return b'n'
+    if isinstance(value, str):
+        return b's' + value.encode('utf-8', 'surrogatepass')
+    if isinstance(value, (bool, int, float)):
+        # 1 == 1.0 == True in a tuple set - keep them equal here too
+        if value == value and value not in (float('inf'), float('-inf')) and value == int(value):
+            return b'#' + str(int(value)).encode()
+        return b'#' + repr(float(value)).encode()
+    return b'r' + repr(value).encode('utf-8', 'surrogatepass')
+
+
+def row_digest(key: Tuple) -> bytes:
+    """Fixed-size digest of a dedup key tuple."""
+    if all(part is None or type(part) is str for part in key):
+        # Usual case: repr() of a tuple of str/None is already unambiguous
+        return hashlib.blake2b(b'R' + repr(key).encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+    h = hashlib.blake2b(b'L', digest_size=DIGEST_SIZE)
+    for part in key:
+        encoded = _encode_part(part)
+        h.update(len(encoded).to_bytes(4, 'little'))
+        h.update(encoded)
+    return h.digest()
+
+
+def journal_stamp(journal_file: str) -> bytes:
+    """Size + mtime_ns + hash of the last STAMP_TAIL_BYTES of a journal (EMPTY_STAMP if missing)."""
+    try:
+        st = os.stat(journal_file)
+        with open(journal_file, 'rb') as f:
+            f.seek(max(st.st_size - STAMP_TAIL_BYTES, 0))
+            tail = hashlib.blake2b(f.read(), digest_size=DIGEST_SIZE).digest()
+    except OSError:
+        return EMPTY_STAMP
+    return STAMP.pack(st.st_size, st.st_mtime_ns, tail)
+
+
+class _SortedDigests:
+    """Read-only sequence view over a block of sorted digests (for bisect)."""
+
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = self.offset + i * DIGEST_SIZE
+        return bytes(self.buffer[start:start + DIGEST_SIZE])
+
+    def __contains__(self, digest: bytes) -> bool:
+        i = bisect.bisect_left(self, digest)
+        return i < self.count and self[i] == digest
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+
+class SeenRowIndex:
+    """Set of row keys stored as digests. Supports in / add / update / len like the old set."""
+
+    def __init__(self):
+        self.base = _SortedDigests(b'', 0, 0)
+        self.added = set()
+        self._file = None
+        self._mmap = None
+
+    def __contains__(self, key: Tuple) -> bool:
+        digest = row_digest(key)
+        return digest in self.added or digest in self.base
+
+    def add(self, key: Tuple):
+        digest = row_digest(key)
+        if digest not in self.base:
+            self.added.add(digest)
+
+    def update(self, keys: Iterable[Tuple]):
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.added)
+
+    # ----- persistence -----
+
+    @classmethod
+    def load(cls, filepath: str) -> Tuple['SeenRowIndex', bytes]:
+        """Map a saved index. Returns (index, journal stamp recorded at save time)."""
+        index = cls()
+        index._file = open(filepath, 'rb')
+        if os.fstat(index._file.fileno()).st_size < HEADER.size:
+            index._file.close()
+            raise ValueError(f"{filepath} is not a valid seen-rows index")
+        index._mmap = mmap.mmap(index._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, *stamp = HEADER.unpack_from(index._mmap, 0)
+        if magic != INDEX_MAGIC or len(index._mmap) != HEADER.size + count * DIGEST_SIZE:
+            index._mmap.close()
+            index._file.close()
+            raise ValueError(f"{filepath} is not a valid seen-rows index")
+        index.base = _SortedDigests(index._mmap, HEADER.size, count)
+        return index, STAMP.pack(*stamp)
+
+    def save(self, filepath: str, stamp: bytes = EMPTY_STAMP):
+        """Write every digest, sorted, atomically (the mapped block is merged in)."""
+        digests = sorted(set(self.base) | self.added)
+        tmp_path = filepath + TEMP_SUFFIX
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(INDEX_MAGIC, len(digests), *STAMP.unpack(stamp)))
+            f.write(b''.join(digests))
+        self.close()
+        replace_atomically(tmp_path, filepath, keep_backup=False)
+
+    def close(self):
+        """Release the mapping (the index keeps working from what was added in memory)."""
+        if self._mmap is not None:
+            self.added |= set(self.base)
+            self.base = _SortedDigests(b'', 0, 0)
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+
+def open_for_journal(index_file: str, journal_file: str, rows: Callable[[], Iterable[Dict]],
+                     key: Callable[[Dict], Tuple]) -> SeenRowIndex:
+    """
+    Index for a row journal: the saved index if it was written for the journal as it is
+    now (same journal_stamp), otherwise rebuilt from rows() with key().
+    """
+    journal_size = os.path.getsize(journal_file) if os.path.exists(journal_file) else 0
+    if journal_size and os.path.exists(index_file):
+        try:
+            index, saved_stamp = SeenRowIndex.load(index_file)
+            if saved_stamp == journal_stamp(journal_file):
+                print(f"🔍 Mapped {len(index)} row digests from {index_file}")
+                return index
+            index.close()
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️ Ignoring seen-rows index {index_file}: {e}")
+
+    index = SeenRowIndex()
+    if journal_size:
+        index.update(key(row) for row in rows())
+    return index
+
+
+def save_for_journal(index: SeenRowIndex, index_file: str, journal_file: str):
+    """Persist the index next to its (closed) journal; a missing journal removes the index."""
+    if not os.path.exists(journal_file):
+        if os.path.exists(index_file):
+            os.remove(index_file)
+        return
+    try:
+        index.save(index_file, journal_stamp(journal_file))
+    except OSError as e:
+        print(f"⚠️ Could not save seen-rows index: {e}")
+
+
+def intern_row(row: Dict, fields: Tuple[str, ...] = INTERNED_FIELDS) -> Dict:
+    """Share one string object per distinct page / class / tag / type value."""
+    for field in fields:
+        value = row.get(field)
+        if type(value) is str:
+            row[field] = sys.intern(value)
+    return row
+
+
+# ----- benchmark -----
+
+def _synthetic_keys(n: int):
+    """Keys shaped like crawler.py's: ~20 fields per page, page/class/tag/type repeated."""
+    classes = ['dealbox', 'textbox', 'dropdown', 'checkbox-field', 'radio-field']
+    tags = [('input', 'text'), ('select', 'select-one'), ('input', 'radio'), ('textarea', 'textarea')]
+    for i in range(n):
+        page = f"Menu Page {i // 20:05d} - Input Records"
+        field = f"fieldName:FIELD.{i % 20}:{i}"
+        tag, input_type = tags[i % len(tags)]
+        yield (page, f"//{tag}[@id='{field}']", f"FIELD {i}", field, field, classes[i % len(classes)], tag, input_type)
+
+
+def _measure(label: str, build: Callable[[], object], probe) -> Dict:
+    start = time.perf_counter()
+    container = build()
+    build_s = time.perf_counter() - start
+    del container
+
+    # Second build under tracemalloc (it slows allocation down, so it is not timed)
+    tracemalloc.start()
+    container = build()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    hits = sum(1 for key in probe if key in container)
+    lookup_s = time.perf_counter() - start
+    print(f"   {label:<28} build {build_s:6.2f}s | {held / 1e6:7.1f} MB held | peak {peak / 1e6:7.1f} MB"
+          f" | {len(probe)} lookups {lookup_s * 1e6 / len(probe):5.2f} µs each ({hits} hits)")
+    return {'container': container, 'build_s': build_s, 'bytes': held}
+
+
+def benchmark(n: int = 1_000_000):
+    """Compare the tuple set with SeenRowIndex (in memory and mapped from disk) at n rows."""
+    print(f"🏁 Dedup index benchmark: {n} rows")
+    probe = list(_synthetic_keys(20_000))
+
+    # Keys are generated inside build() so the tuples (and their strings) count as held memory
+    tuples = _measure('set of tuples', lambda: set(_synthetic_keys(n)), probe)
+    del tuples['container']
+
+    def build_index():
+        index = SeenRowIndex()
+        index.update(_synthetic_keys(n))
+        return index
+    built = _measure('SeenRowIndex (in memory)', build_index, probe)
+
+    index_file = 'seen_rows_benchmark.idx'
+    start = time.perf_counter()
+    built['container'].save(index_file)
+    print(f"   saved {os.path.getsize(index_file) / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+    del built['container']
+
+    mapped = _measure('SeenRowIndex (mmap)', lambda: SeenRowIndex.load(index_file)[0], probe)
+    mapped['container'].close()
+    os.remove(index_file)
+    print(f"   memory held: {tuples['bytes'] / max(built['bytes'], 1):.1f}x less in memory, "
+          f"{tuples['bytes'] / max(mapped['bytes'], 1):.0f}x less when mapped")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'benchmark':
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    else:
+        print("Usage: python seen_rows_index.py benchmark [rows]")
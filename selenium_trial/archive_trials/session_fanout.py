@@ -0,0 +1,149 @@
+"""
+Authenticated Session Fan-Out
+Sign on once, then hand the session cookies to every other driver instead of typing
+credentials (and sleeping 2s + 3s) in each one.
+
+- export_session(driver): cookies of a signed-on driver
+- clone_session(driver, session): inject them into a fresh driver and check the frameset
+  comes up without the sign-on form
+- sign_on(driver, url, username, password): cloned session if one is available (kept in
+  memory by this process, or from SESSION_FILE within SESSION_MAX_AGE when SESSION_PERSIST
+  is on), full login() otherwise
+- If T24 insists on a separate sign-on per session, the clone check fails and callers fall
+  back to a normal login, staggered by LOGIN_STAGGER_SECONDS per worker
+
+SESSION_REUSE=false disables cookie reuse entirely. The cookies are a live authenticated
+session, so they only go to disk with SESSION_PERSIST=true (SESSION_FILE sets the path) -
+that lets single-driver scripts (spot checks, rescreens) share one sign-on.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+from selenium.webdriver.support.ui import WebDriverWait
+
+from crawler import login
+from atomic_io import atomic_write_json, load_json_validated
+
+SESSION_FILE = os.getenv('SESSION_FILE', 'session_cookies.json')
+SESSION_PERSIST = os.getenv('SESSION_PERSIST', 'false').lower() in ('1', 'true', 'yes')
+SESSION_MAX_AGE = int(os.getenv('SESSION_MAX_AGE', '900'))   # seconds; T24 sessions time out after idling
+SESSION_REUSE = os.getenv('SESSION_REUSE', 'true').lower() in ('1', 'true', 'yes')
+LOGIN_STAGGER_SECONDS = 2   # spread fallback sign-ons so the servlet isn't hit by N logins at once
+CLONE_TIMEOUT = 10
+
+_memory_session = None   # last session signed on in this process
+
+# Signed on = the frameset with a menu frame is there and no sign-on form
+SESSION_STATE_SCRIPT = """
+    if (document.querySelector('[name="signOnName"]')) return 'signon';
+    var frames = document.querySelectorAll('frame, iframe');
+    for (var i = 0; i < frames.length; i++) {
+        if ((frames[i].name || '').toLowerCase().indexOf('menu') !== -1) return 'ready';
+    }
+    return 'loading';
+"""
+
+
+def export_session(driver, url: str) -> Dict:
+    """Cookies of a signed-on driver, tagged with the servlet URL they belong to."""
+    return {'url': url, 'cookies': driver.get_cookies(), 'created': time.time()}
+
+
+def save_session(session: Dict):
+    """Keep the session for later sign-ons in this process (and on disk with SESSION_PERSIST)."""
+    global _memory_session
+    _memory_session = session
+    if not SESSION_PERSIST:
+        return
+    atomic_write_json(SESSION_FILE, session, keep_backup=False)
+    try:
+        os.chmod(SESSION_FILE, 0o600)
+    except OSError:
+        pass
+
+
+def load_session(url: str) -> Optional[Dict]:
+    """Session for the same URL still within SESSION_MAX_AGE - from memory, else from SESSION_FILE."""
+    if not SESSION_REUSE:
+        return None
+    session = _memory_session
+    if session is None and SESSION_PERSIST and os.path.exists(SESSION_FILE):
+        session = load_json_validated(SESSION_FILE, lambda d: isinstance(d, dict) and isinstance(d.get('cookies'), list))
+    if not session or session.get('url') != url:
+        return None
+    if time.time() - session.get('created', 0) > SESSION_MAX_AGE:
+        return None
+    return session
+
+
+def wait_for_session_state(driver, timeout: float = CLONE_TIMEOUT) -> str:
+    """'ready' (signed on), 'signon' (sign-on form shown) or 'loading' on timeout."""
+    state = {'value': 'loading'}
+
+    def settled(d):
+        try:
+            state['value'] = d.execute_script(SESSION_STATE_SCRIPT)
+        except Exception:
+            state['value'] = 'loading'
+        return state['value'] != 'loading'
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(settled)
+    except Exception:
+        pass
+    return state['value']
+
+
+def clone_session(driver, session: Dict) -> bool:
+    """
+    Inject session cookies into driver and open the servlet.
+    True if T24 accepted them (frameset loaded without the sign-on form).
+    """
+    if not SESSION_REUSE or not session or not session.get('cookies'):
+        return False
+
+    url = session['url']
+    try:
+        # Cookies can only be set for the current origin - land on the (cheap) sign-on page first
+        driver.get(url)
+        driver.delete_all_cookies()
+        for cookie in session['cookies']:
+            cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')}
+            try:
+                driver.add_cookie(cookie)
+            except Exception:
+                # Domain attribute doesn't match the host as typed in the URL - set it host-only
+                cookie.pop('domain', None)
+                driver.add_cookie(cookie)
+        driver.get(url)
+    except Exception as e:
+        print(f"⚠️ Session clone failed: {str(e)[:80]}")
+        return False
+
+    return wait_for_session_state(driver) == 'ready'
+
+
+def sign_on(driver, url: str, username: str, password: str, session: Dict = None,
+            stagger_index: int = 0, save: bool = True) -> str:
+    """
+    Get driver signed on: reuse session (or the saved one) if T24 accepts it, otherwise
+    log in normally (after stagger_index * LOGIN_STAGGER_SECONDS) and, with save=True,
+    keep the new session for later sign-ons (see save_session). Returns 'cloned' or 'login'.
+    """
+    session = session or load_session(url)
+    if session and clone_session(driver, session):
+        print("✅ Signed on with shared session cookies")
+        return 'cloned'
+    if session:
+        print("↪️ Shared session not accepted - signing on separately")
+
+    if stagger_index:
+        time.sleep(stagger_index * LOGIN_STAGGER_SECONDS)
+    login(driver, url, username, password)
+    if save and SESSION_REUSE:
+        try:
+            save_session(export_session(driver, url))
+        except Exception as e:
+            print(f"⚠️ Could not save session: {str(e)[:60]}")
+    return 'login'
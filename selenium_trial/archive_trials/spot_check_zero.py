@@ -4,7 +4,8 @@ Simpler than debug_zero_elements.py - just opens pages and waits.
 """
 import json
 import random
-from crawler import setup_driver, login, get_menu_frame, expand_all_menus_recursive
+from crawler import setup_driver, get_menu_frame, expand_all_menus_recursive
+from session_fanout import sign_on
 from selenium.webdriver.common.by import By
 import time
 import os
@@ -37,7 +38,7 @@ def manual_spot_check():
     
     try:
         # Login
-        login(driver, T24_URL, T24_USERNAME, T24_PASSWORD)
+        sign_on(driver, T24_URL, T24_USERNAME, T24_PASSWORD)  # reuses a recent session when T24 accepts it
         print("✅ Logged in")
         
         # Expand menu
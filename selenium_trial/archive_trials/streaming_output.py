@@ -0,0 +1,89 @@
+"""
+Streaming Crawl Output
+Rows are appended to a JSON Lines file as each page completes instead of rebuilding
+the whole workbook every 50 pages. The .xlsx is written once at the end, streamed
+from the JSONL with openpyxl's write-only mode.
+
+- Each append writes only the new rows, so checkpoint cost stays flat as the crawl grows
+- A line cut off by a kill mid-write is dropped when the file is reopened
+- The JSONL doubles as the resume source (replaces reloading the .xlsx)
+"""
+
+import os
+import json
+from typing import Dict, Iterable, Iterator
+
+
+def _drop_partial_line(filepath: str):
+    """Truncate a trailing line without newline (process killed mid-write)."""
+    with open(filepath, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        if end == 0:
+            return
+        f.seek(end - 1)
+        if f.read(1) == b'\n':
+            return
+
+        # Walk back to the last complete line
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
+
+
+def iter_jsonl(filepath: str) -> Iterator[Dict]:
+    """Yield rows from a JSON Lines file, skipping unreadable lines."""
+    if not os.path.exists(filepath):
+        return
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+class JsonlSink:
+    """Append-only JSON Lines writer - one line per row, flushed after every append()."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        if os.path.exists(filepath):
+            _drop_partial_line(filepath)
+        self.file = open(filepath, 'a', encoding='utf-8')
+        self.rows_written = 0
+
+    def append(self, rows: Iterable[Dict]):
+        """Append rows and flush them to the OS."""
+        lines = [json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows]
+        if lines:
+            self.file.write(''.join(lines))
+            self.file.flush()
+            self.rows_written += len(lines)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def remove(self):
+        """Close and delete the file (after the final export succeeded)."""
+        self.close()
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -3,6 +3,11 @@ Quick test to verify checkpoint file is being created and saved correctly.
 """
 import json
 import os
+import sys
+
+# Shared helpers live in the parent selenium_trial/ folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from checkpoint_journal import CheckpointJournal
 
 CHECKPOINT_FILE = 'crawler_checkpoint.json'
 
@@ -13,20 +18,26 @@ def check_checkpoint():
         return False
     
     try:
-        with open(CHECKPOINT_FILE, 'r') as f:
-            data = json.load(f)
+        # Replay the journal: compacted snapshot + one record per processed page
+        journal = CheckpointJournal(CHECKPOINT_FILE)
+        data, records = journal.load()
+        data = dict(data)
+        if records:
+            data['processed_items'] = list(data.get('processed_items', [])) + [r.get('item') for r in records]
+            data['last_index'] = max([data.get('last_index', 0)] + [r.get('index', 0) for r in records])
         
         print(f"✅ Checkpoint file is VALID")
         print(f"   - Last index: {data.get('last_index', 'MISSING')}")
         print(f"   - Processed items: {len(data.get('processed_items', []))}")
         print(f"   - Timestamp: {data.get('timestamp', 'MISSING')}")
+        print(f"   - Journal: {journal.snapshot_records} compacted + {len(records)} appended records")
         
         # Verify structure
         if 'last_index' not in data:
             print("   ⚠️ WARNING: 'last_index' field is missing!")
         if 'processed_items' not in data:
             print("   ⚠️ WARNING: 'processed_items' field is missing!")
-        if 'timestamp' not in data:
+        if 'timestamp' not in data and not records:
             print("   ⚠️ WARNING: 'timestamp' field is missing!")
         
         return True
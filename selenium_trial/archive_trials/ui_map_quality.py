@@ -0,0 +1,560 @@
+"""
+UI Map Quality Analyzer
+One engine for the post-crawl checks that used to live in seven scripts
+(validate_advanced, validate_output, validate_cleaned, verify_output,
+check_invalid_xpaths, check_dupes, analyze_crawler_output), each reloading the
+same files and recounting the same things.
+
+analyze() reads the UI map and (optionally) the page stats workbook once through
+workbook_table and computes every metric in a single pass over each:
+
+- rows, pages, complete-row duplicates, missing / invalid XPaths (not starting with //)
+- duplicate XPaths: shared across pages vs repeated within one page
+- elementName == xpath, minimal-identifier rows, empty names, hidden/disabled hints,
+  null/undefined XPaths
+- tag and input type distributions, fields per page (min/max/avg, top and bottom pages)
+- from the stats: zero-element pages, zero pages that still had inputs / iframes /
+  errors, extraction rate, pages missing from the UI map
+
+Column layouts are recognized by header, so crawler.py, crawler_fast,
+crawler_iframe_aware and the older hierarchy-prefixed workbooks all work.
+
+Outputs (written by main() - the thin views only print, except analyze_crawler_output,
+which still writes the CSVs it always wrote):
+- QUALITY_REPORT_FILE (JSON, every metric + issues + verdict)
+- zero_elements_ALL.csv, zero_elements_WITH_inputs.csv, element_count_summary.csv
+  (when a stats workbook is given - same files analyze_crawler_output wrote)
+
+Usage:
+    python ui_map_quality.py [ui_map.xlsx] [page_stats.xlsx]
+"""
+
+import os
+import csv
+import sys
+import time
+import statistics
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from atomic_io import atomic_write_json
+from workbook_table import load_table
+
+DEFAULT_UI_MAP = 'uiMap_selenium_fullrun_final_stats.xlsx'
+DEFAULT_STATS = 'page_stats_final.xlsx'
+QUALITY_REPORT_FILE = 'ui_map_quality_report.json'
+EXAMPLE_LIMIT = 20
+
+# Header (lower-case) -> role, for every UI map layout the crawlers have written
+UI_MAP_COLUMNS = {
+    'hierarchy': 'hierarchy',
+    'pagename': 'page', 'page': 'page',
+    'elementname': 'element',
+    'relativexpath': 'xpath', 'xpath': 'xpath',
+    'elementid': 'id', 'id': 'id',
+    'elementnameattr': 'name', 'name': 'name',
+    'classname': 'class',
+    'tagname': 'tag', 'tag': 'tag',
+    'inputtype': 'type', 'type': 'type',
+}
+
+# Header (lower-case) -> role, for the page stats layouts
+STATS_COLUMNS = {
+    'pagename': 'page', 'page': 'page',
+    'elementcount': 'count', 'xpath_count': 'count', 'elements': 'count',
+    'hasiframes': 'has_iframes', 'iframecount': 'iframe_count', 'iframes_found': 'iframe_count',
+    'totalinputelements': 'total_inputs',
+    'inputcount': 'input_count', 'selectcount': 'select_count', 'textareacount': 'textarea_count',
+    'erroroccurred': 'error', 'errormessage': 'error_message',
+}
+
+NOISE_MARKERS = ('hidden', 'display:none', 'disabled')
+
+
+def _resolve(headers: List, aliases: Dict[str, str]) -> Dict[str, int]:
+    """role -> column position (first matching header wins)."""
+    positions = {}
+    for i, header in enumerate(headers):
+        role = aliases.get(str(header or '').strip().lower())
+        if role and role not in positions:
+            positions[role] = i
+    return positions
+
+
+def _text(value) -> str:
+    return '' if value is None else str(value)
+
+
+def _examples(items, limit: int = EXAMPLE_LIMIT) -> List:
+    return list(items)[:limit]
+
+
+def analyze_ui_map(filepath: str) -> Dict:
+    """Every UI map metric in one pass over the rows."""
+    table = load_table(filepath)
+    col = _resolve(table.headers, UI_MAP_COLUMNS)
+    missing_roles = [role for role in ('page', 'xpath') if role not in col]
+    if missing_roles:
+        raise ValueError(f"{filepath}: no {'/'.join(missing_roles)} column in headers {table.headers}")
+
+    def getter(role):
+        index = col.get(role)
+        return (lambda values: values[index]) if index is not None else (lambda values: None)
+
+    get_page, get_xpath, get_element = getter('page'), getter('xpath'), getter('element')
+    get_id, get_name, get_class = getter('id'), getter('name'), getter('class')
+    get_tag, get_type, get_hierarchy = getter('tag'), getter('type'), getter('hierarchy')
+
+    data_rows = 0
+    empty_rows = 0
+    complete_rows = set()
+    duplicate_rows = 0
+    missing_xpath = []
+    missing_page = 0
+    missing_hierarchy = 0
+    invalid_xpaths = []
+    name_equals_xpath = []
+    minimal_identifiers = 0
+    empty_names = 0
+    noise_xpaths = 0
+    null_xpaths = []
+    xpath_counts = Counter()
+    xpath_pages = defaultdict(set)
+    xpath_first = {}
+    page_xpath_counts = Counter()
+    page_counts = Counter()
+    tags = Counter()
+    input_types = Counter()
+
+    for row_num, values in enumerate(table.rows(), start=2):
+        if not any(v not in (None, '') for v in values):
+            empty_rows += 1
+            continue
+        data_rows += 1
+
+        key = tuple(_text(v) for v in values)
+        if key in complete_rows:
+            duplicate_rows += 1
+        else:
+            complete_rows.add(key)
+
+        page = _text(get_page(values))
+        xpath = _text(get_xpath(values))
+        element = _text(get_element(values))
+        page_counts[page] += 1
+        if not page:
+            missing_page += 1
+        if 'hierarchy' in col:
+            hierarchy = _text(get_hierarchy(values))
+            if not hierarchy or hierarchy == 'Unknown':
+                missing_hierarchy += 1
+
+        if xpath:
+            xpath_counts[xpath] += 1
+            xpath_pages[xpath].add(page)
+            xpath_first.setdefault(xpath, (row_num, page, element))
+            page_xpath_counts[(page, xpath)] += 1
+            if not xpath.startswith('//'):
+                invalid_xpaths.append({'row': row_num, 'page': page, 'xpath': xpath})
+            lowered = xpath.lower()
+            if 'null' in lowered or 'undefined' in lowered:
+                null_xpaths.append({'row': row_num, 'page': page, 'xpath': xpath})
+            if any(marker in lowered for marker in NOISE_MARKERS):
+                noise_xpaths += 1
+        else:
+            missing_xpath.append({'row': row_num, 'page': page})
+
+        if element and element == xpath:
+            name_equals_xpath.append({'row': row_num, 'page': page, 'element': element})
+        if not element:
+            empty_names += 1
+        if not get_id(values) and not get_name(values) and not get_class(values):
+            minimal_identifiers += 1
+
+        tag = _text(get_tag(values))
+        if tag:
+            tags[tag] += 1
+        input_type = _text(get_type(values))
+        if input_type:
+            input_types[input_type] += 1
+
+    duplicate_xpaths = {x: n for x, n in xpath_counts.items() if n > 1}
+    shared_xpaths = {x for x in duplicate_xpaths if len(xpath_pages[x]) > 1}
+    same_page_duplicates = defaultdict(dict)
+    for (page, xpath), n in page_xpath_counts.items():
+        if n > 1:
+            same_page_duplicates[page][xpath] = n
+
+    fields_per_page = list(page_counts.values())
+    by_count = sorted(page_counts.items(), key=lambda x: x[1])
+
+    return {
+        'file': filepath,
+        'headers': table.headers,
+        'columns': table.n_cols,
+        'has_hierarchy_column': 'hierarchy' in col,
+        'total_rows': data_rows,
+        'empty_rows': empty_rows,
+        'unique_pages': len(page_counts),
+        'unique_complete_rows': len(complete_rows),
+        'duplicate_complete_rows': duplicate_rows,
+        'missing_page': missing_page,
+        'missing_hierarchy': missing_hierarchy,
+        'missing_xpath': len(missing_xpath),
+        'missing_xpath_examples': _examples(missing_xpath),
+        'invalid_xpaths': len(invalid_xpaths),
+        'invalid_xpath_examples': _examples(invalid_xpaths),
+        'null_or_undefined_xpaths': len(null_xpaths),
+        'null_or_undefined_examples': _examples(null_xpaths),
+        'element_name_equals_xpath': len(name_equals_xpath),
+        'element_name_equals_xpath_examples': _examples(name_equals_xpath),
+        'minimal_identifier_rows': minimal_identifiers,
+        'empty_element_names': empty_names,
+        'hidden_or_disabled_xpaths': noise_xpaths,
+        'unique_xpaths': len(xpath_counts),
+        'duplicate_xpaths': len(duplicate_xpaths),
+        'shared_xpaths': len(shared_xpaths),
+        'top_duplicate_xpaths': [
+            {'xpath': x, 'count': n, 'pages': len(xpath_pages[x]), 'example_pages': sorted(xpath_pages[x])[:3],
+             'first_row': xpath_first[x][0]}
+            for x, n in sorted(duplicate_xpaths.items(), key=lambda item: -item[1])[:EXAMPLE_LIMIT]
+        ],
+        'pages_with_duplicate_xpaths': len(same_page_duplicates),
+        'same_page_duplicates': {
+            page: {'rows': page_counts[page],'duplicate_xpaths': dupes}
+            for page, dupes in _examples(sorted(same_page_duplicates.items(), key=lambda x: len(x[1]) - sum(x[1].values())))
+        },
+        'tag_distribution': dict(tags.most_common()),
+        'input_type_distribution': dict(input_types.most_common()),
+        'fields_per_page': {
+            'min': min(fields_per_page) if fields_per_page else 0,
+            'max': max(fields_per_page) if fields_per_page else 0,
+            'avg': round(sum(fields_per_page) / len(fields_per_page), 1) if fields_per_page else 0,
+        },
+        'top_pages': [{'page': p, 'fields': n} for p, n in page_counts.most_common(10)],
+        'fewest_pages': [{'page': p, 'fields': n} for p, n in by_count[:10]],
+        'page_field_counts': dict(page_counts),
+    }
+
+
+def analyze_stats(filepath: str, ui_map_pages: Dict[str, int] = None) -> Dict:
+    """Page stats metrics in one pass; also returns the zero-element rows for the CSVs."""
+    table = load_table(filepath)
+    col = _resolve(table.headers, STATS_COLUMNS)
+    if 'page' not in col or 'count' not in col:
+        raise ValueError(f"{filepath}: no page/element count column in headers {table.headers}")
+
+    def value(values, role, default=None):
+        index = col.get(role)
+        return values[index] if index is not None else default
+
+    def number(v) -> float:
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return 0.0
+
+    total = 0
+    zero_rows, zero_with_inputs = [], []
+    non_zero_counts = []
+    zero_with_iframes = zero_with_errors = 0
+    zero_inputs_with_iframes = 0
+    non_zero_with_iframes = 0
+    extraction_rates = []
+    error_messages = Counter()
+    summary = defaultdict(lambda: {'pages': 0, 'iframes': 0, 'inputs': []})
+    stats_pages = set()
+
+    for values in table.rows():
+        page = value(values, 'page')
+        if page in (None, ''):
+            continue
+        total += 1
+        count = number(value(values, 'count'))
+        if count:
+            stats_pages.add(str(page))
+        has_iframes = value(values, 'has_iframes') == 'Yes'
+        total_inputs = value(values, 'total_inputs')
+
+        group = summary[value(values, 'count')]
+        group['pages'] += 1
+        group['iframes'] += int(has_iframes)
+        if total_inputs is not None:
+            group['inputs'].append(number(total_inputs))
+
+        if count == 0:
+            zero_rows.append(values)
+            zero_with_iframes += int(has_iframes)
+            if number(total_inputs) > 0:
+                zero_with_inputs.append(values)
+                zero_inputs_with_iframes += int(has_iframes)
+            if value(values, 'error') == 'Yes':
+                zero_with_errors += 1
+                error_messages[_text(value(values, 'error_message'))] += 1
+        else:
+            non_zero_counts.append(count)
+            non_zero_with_iframes += int(has_iframes)
+            if number(total_inputs) > 0:
+                extraction_rates.append(round(count / number(total_inputs) * 100, 1))
+
+    # Most inputs first; ties by page name, then stats-file order (sort is stable)
+    zero_with_inputs.sort(key=lambda values: (-number(value(values, 'total_inputs')), _text(value(values, 'page'))))
+    missing_from_ui_map = sorted(p for p in stats_pages if ui_map_pages is not None and p not in ui_map_pages)
+
+    return {
+        'file': filepath,
+        'headers': table.headers,
+        'has_input_counts': 'total_inputs' in col,
+        'has_iframe_info': 'has_iframes' in col,
+        'total_pages': total,
+        'zero_element_pages': len(zero_rows),
+        'non_zero_pages': len(non_zero_counts),
+        'non_zero_element_counts': {
+            'min': min(non_zero_counts) if non_zero_counts else 0,
+            'max': max(non_zero_counts) if non_zero_counts else 0,
+            'avg': round(statistics.mean(non_zero_counts), 1) if non_zero_counts else 0,
+            'median': statistics.median(non_zero_counts) if non_zero_counts else 0,
+        },
+        'zero_with_iframes': zero_with_iframes,
+        'zero_with_inputs': len(zero_with_inputs),
+        'zero_with_inputs_and_iframes': zero_inputs_with_iframes,
+        'zero_with_errors': zero_with_errors,
+        'zero_error_messages': dict(error_messages.most_common(EXAMPLE_LIMIT)),
+        'non_zero_with_iframes': non_zero_with_iframes,
+        'avg_extraction_rate': round(statistics.mean(extraction_rates), 1) if extraction_rates else None,
+        'low_extraction_pages': sum(1 for rate in extraction_rates if rate < 50),
+        'zero_with_inputs_examples': [_text(value(v, 'page')) for v in zero_with_inputs[:EXAMPLE_LIMIT]],
+        'extracted_pages_missing_from_ui_map': len(missing_from_ui_map),
+        'extracted_pages_missing_from_ui_map_examples': missing_from_ui_map[:EXAMPLE_LIMIT],
+        # For the CSV writers (not part of the JSON report)
+        '_table': table,
+        '_zero_rows': zero_rows,
+        '_zero_with_inputs': zero_with_inputs,
+        '_summary': summary,
+    }
+
+
+def write_stats_csvs(stats: Dict) -> List[str]:
+    """zero_elements_ALL.csv, zero_elements_WITH_inputs.csv and element_count_summary.csv."""
+    headers = stats['_table'].headers
+    written = []
+
+    def write(filepath, header, rows):
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(header)
+            writer.writerows([['' if v is None else v for v in row] for row in rows])
+        written.append(filepath)
+
+    if stats['_zero_with_inputs']:
+        write('zero_elements_WITH_inputs.csv', headers, stats['_zero_with_inputs'])
+    write('zero_elements_ALL.csv', headers, stats['_zero_rows'])
+
+    summary_rows = []
+    # Numeric counts ascending, then any text counts, then blanks - a total order, so re-runs match
+    numeric = lambda c: isinstance(c, (int, float)) and not isinstance(c, bool)
+    for count in sorted(stats['_summary'], key=lambda c: (c is None, not numeric(c), c if numeric(c) else 0, _text(c))):
+        group = stats['_summary'][count]
+        avg_inputs = round(statistics.mean(group['inputs']), 1) if group['inputs'] else ''
+        summary_rows.append([count, group['pages'], group['iframes'], avg_inputs])
+    write('element_count_summary.csv', ['ElementCount', 'PageCount', 'PagesWithIframes', 'AvgTotalInputs'], summary_rows)
+    return written
+
+
+def collect_issues(ui_map: Dict, stats: Optional[Dict]) -> List[str]:
+    issues = []
+    if ui_map['duplicate_complete_rows']:
+        issues.append(f"{ui_map['duplicate_complete_rows']} duplicate complete rows")
+    if ui_map['missing_xpath']:
+        issues.append(f"{ui_map['missing_xpath']} rows without XPath")
+    if ui_map['invalid_xpaths']:
+        issues.append(f"{ui_map['invalid_xpaths']} invalid XPaths (not starting with //)")
+    if ui_map['element_name_equals_xpath']:
+        issues.append(f"{ui_map['element_name_equals_xpath']} rows with elementName = XPath")
+    if ui_map['pages_with_duplicate_xpaths']:
+        issues.append(f"{ui_map['pages_with_duplicate_xpaths']} pages repeat the same XPath (double crawling)")
+    if ui_map['minimal_identifier_rows']:
+        issues.append(f"{ui_map['minimal_identifier_rows']} rows with minimal identifiers")
+    if stats and stats['zero_with_inputs']:
+        issues.append(f"{stats['zero_with_inputs']} zero-element pages that have inputs")
+    return issues
+
+
+def analyze(ui_map_file: str, stats_file: str = None, report_file: str = QUALITY_REPORT_FILE,
+            write_csvs: bool = True) -> Dict:
+    """Run every check, write the JSON report (and the stats CSVs). Returns the report."""
+    start = time.perf_counter()
+    ui_map = analyze_ui_map(ui_map_file)
+    stats = analyze_stats(stats_file, ui_map['page_field_counts']) if stats_file else None
+
+    csv_files = write_stats_csvs(stats) if stats and write_csvs else []
+    issues = collect_issues(ui_map, stats)
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ui_map': {k: v for k, v in ui_map.items() if k != 'page_field_counts'},
+        'stats': {k: v for k, v in stats.items() if not k.startswith('_')} if stats else None,
+        'issues': issues,
+        'verdict': 'issues' if issues else 'clean',
+        'report_file': report_file,
+        'csv_files': csv_files,
+        'elapsed_s': round(time.perf_counter() - start, 2),
+    }
+    if report_file:
+        atomic_write_json(report_file, report, keep_backup=False, indent=2, ensure_ascii=False, default=str)
+    return report
+
+
+# ----- console views (the old scripts print subsets of these) -----
+
+def print_overview(report: Dict):
+    m = report['ui_map']
+    print(f"\n📊 UI map: {m['file']}")
+    print(f"   Columns: {m['headers']}")
+    print(f"   Total rows: {m['total_rows']}  |  Unique pages: {m['unique_pages']}  |  Unique complete rows: {m['unique_complete_rows']}")
+    print(f"   Duplicate complete rows: {m['duplicate_complete_rows']}")
+    print(f"   Missing XPaths: {m['missing_xpath']}  |  Missing page names: {m['missing_page']}"
+          + (f"  |  Missing hierarchy: {m['missing_hierarchy']}" if m['has_hierarchy_column'] else ''))
+    print(f"   Valid XPath format (starts with //): {m['total_rows'] - m['missing_xpath'] - m['invalid_xpaths']}/{m['total_rows']}")
+
+
+def print_quality(report: Dict):
+    m = report['ui_map']
+    print(f"\n🔍 Quality Checks:")
+    print(f"   ⚠️ ElementName = XPath: {m['element_name_equals_xpath']}")
+    for ex in m['element_name_equals_xpath_examples'][:1]:
+        print(f"      Example: {ex['page']} -> {ex['element']}")
+    print(f"   ⚠️ Invalid XPath format: {m['invalid_xpaths']}")
+    print(f"   ⚠️ Rows with minimal identifiers: {m['minimal_identifier_rows']}")
+    print(f"   ⚠️ Empty elementName: {m['empty_element_names']}")
+    print(f"   ⚠️ Potentially hidden/disabled elements: {m['hidden_or_disabled_xpaths']}")
+    print(f"   ⚠️ XPaths containing null/undefined: {m['null_or_undefined_xpaths']}")
+
+
+def print_invalid_xpaths(report: Dict, limit: int = 15):
+    m = report['ui_map']
+    print(f"\nFound {m['invalid_xpaths']} invalid XPaths (not starting with //):")
+    for ex in m['invalid_xpath_examples'][:limit]:
+        print(f"   Row {ex['row']}: Page={ex['page']}")
+        print(f"     XPath: {ex['xpath']}")
+
+
+def print_duplicates(report: Dict):
+    m = report['ui_map']
+    print(f"\n📋 XPaths: {m['unique_xpaths']} unique, {m['duplicate_xpaths']} appear more than once "
+          f"({m['shared_xpaths']} shared across pages)")
+    for dup in m['top_duplicate_xpaths'][:10]:
+        print(f"   - {dup['count']}x on {dup['pages']} page(s): {dup['xpath'][:80]}")
+    if m['pages_with_duplicate_xpaths']:
+        print(f"\n   ❌ {m['pages_with_duplicate_xpaths']} pages repeat the same XPath:")
+        for page, info in list(m['same_page_duplicates'].items())[:10]:
+            extra = sum(info['duplicate_xpaths'].values()) - len(info['duplicate_xpaths'])
+            print(f"      - {page}: {extra} duplicate rows")
+    else:
+        print(f"   ✅ No page repeats an XPath")
+
+
+def print_distributions(report: Dict):
+    m = report['ui_map']
+    print(f"\n📊 Tag Distribution:")
+    for tag, count in list(m['tag_distribution'].items())[:10]:
+        print(f"   {tag}: {count}")
+    print(f"\n📊 Input Type Distribution:")
+    for itype, count in list(m['input_type_distribution'].items())[:10]:
+        print(f"   {itype}: {count}")
+    fp = m['fields_per_page']
+    print(f"\n📈 Fields per page: min {fp['min']}, max {fp['max']}, avg {fp['avg']}")
+    print(f"\n📊 Top 10 Pages by Element Count:")
+    for entry in m['top_pages']:
+        print(f"   {entry['fields']:4d} elements: {entry['page']}")
+    print(f"\n📊 Pages with Fewest Elements:")
+    for entry in m['fewest_pages']:
+        print(f"   {entry['fields']:4d} elements: {entry['page']}")
+
+
+def print_stats(report: Dict):
+    s = report['stats']
+    if not s:
+        return
+    total = s['total_pages'] or 1
+    print(f"\n📈 Page stats: {s['file']}")
+    print(f"   Total pages processed: {s['total_pages']}")
+    print(f"   Pages with 0 elements: {s['zero_element_pages']} ({s['zero_element_pages'] / total * 100:.1f}%)")
+    print(f"   Pages with >0 elements: {s['non_zero_pages']} ({s['non_zero_pages'] / total * 100:.1f}%)")
+    nz = s['non_zero_element_counts']
+    print(f"   Non-zero pages: min {nz['min']:g}, max {nz['max']:g}, avg {nz['avg']}, median {nz['median']:g}")
+    if s['has_iframe_info']:
+        print(f"   Zero pages with iframes: {s['zero_with_iframes']}")
+    if s['has_input_counts']:
+        print(f"   🔥 Zero pages that have inputs: {s['zero_with_inputs']} ({s['zero_with_inputs_and_iframes']} with iframes)")
+        if s['avg_extraction_rate'] is not None:
+            print(f"   Average extraction rate (non-zero pages): {s['avg_extraction_rate']}%  |  <50%: {s['low_extraction_pages']} pages")
+    if s['zero_with_errors']:
+        print(f"   ⚠️ Zero pages with errors: {s['zero_with_errors']}")
+        for message, count in list(s['zero_error_messages'].items())[:5]:
+            print(f"     - {message[:60]}: {count}")
+    if s['extracted_pages_missing_from_ui_map']:
+        print(f"   Pages with elements in stats but not in the UI map: {s['extracted_pages_missing_from_ui_map']}")
+
+
+def print_verdict(report: Dict):
+    print(f"\n{'=' * 70}")
+    if report['issues']:
+        print(f"⚠️ FILE HAS {len(report['issues'])} POTENTIAL ISSUES")
+        for issue in report['issues']:
+            print(f"   - {issue}")
+    else:
+        print(f"✅ FILE APPEARS CLEAN")
+    print(f"{'=' * 70}")
+    outputs = ([f"📄 Report: {report['report_file']}"] if report['report_file'] else []) + \
+              ([f"CSVs: {', '.join(report['csv_files'])}"] if report['csv_files'] else [])
+    if outputs:
+        print('  |  '.join(outputs))
+    print(f"⏱️ {report['elapsed_s']}s")
+
+
+SECTIONS = {
+    'overview': print_overview,
+    'quality': print_quality,
+    'invalid': print_invalid_xpaths,
+    'duplicates': print_duplicates,
+    'distributions': print_distributions,
+    'stats': print_stats,
+    'verdict': print_verdict,
+}
+
+
+def print_report(report: Dict, sections: List[str] = None):
+    for name in sections or list(SECTIONS):
+        SECTIONS[name](report)
+
+
+def run(ui_map_file: str, stats_file: str = None, sections: List[str] = None,
+        report_file: str = None, write_csvs: bool = False) -> Optional[Dict]:
+    """
+    analyze() + print the chosen sections; None if an input file is missing.
+    Writes nothing unless report_file / write_csvs are given (main() passes both).
+    """
+    for filepath in (ui_map_file, stats_file):
+        if filepath and not os.path.exists(filepath):
+            print(f"❌ File not found: {filepath}")
+            return None
+    print(f"📁 Analyzing: {ui_map_file}" + (f" + {stats_file}" if stats_file else ''))
+    print("=" * 70)
+    report = analyze(ui_map_file, stats_file, report_file=report_file, write_csvs=write_csvs)
+    print_report(report, sections)
+    return report
+
+
+def main():
+    ui_map_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_UI_MAP
+    stats_file = sys.argv[2] if len(sys.argv) > 2 else (DEFAULT_STATS if os.path.exists(DEFAULT_STATS) else None)
+    report = run(ui_map_file, stats_file, report_file=QUALITY_REPORT_FILE, write_csvs=True)
+    if report is None:
+        sys.exit(1)
+    sys.exit(1 if report['issues'] else 0)
+
+
+if __name__ == '__main__':
+    main()
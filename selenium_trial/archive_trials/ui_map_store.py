@@ -0,0 +1,358 @@
+"""
+SQLite UI Map Store
+The UI map used to live only in .xlsx files, so every question ("which pages use
+field X?", "what changed since the last run?") meant loading whole workbooks. The
+crawlers now also write each page to a local SQLite database (UI_MAP_DB):
+
+- crawl_runs  one row per crawl (crawler, start/end, status, browser profile, hierarchy file)
+- pages       one row per page and run (page name, docommand id, element count)
+- fields      one row per extracted field (xpath, element id/name, class, tag, type, frame)
+- page_stats  the crawler's per-page stats row (key numbers + full row as JSON)
+
+Indexes cover page name, relative xpath, element id, element name attribute and
+docommand id. Each page is written in one transaction (a re-crawled page replaces its
+earlier rows in the same run), so a killed crawl never leaves half a page behind.
+The workbooks become an export view: iter_rows() yields rows in the crawler.py
+shape for export_to_excel.
+
+Command line:
+    python ui_map_store.py runs
+    python ui_map_store.py find <xpath | element id | element name>
+    python ui_map_store.py page <page name> [run_id]
+    python ui_map_store.py compare <old_run_id> <new_run_id>
+    python ui_map_store.py export <run_id> <output.xlsx>
+    python ui_map_store.py import <uiMap.xlsx> [crawler]
+
+UI_MAP_STORE=false stops the crawlers from writing to the store.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+UI_MAP_DB = os.getenv('UI_MAP_DB', 'ui_map.sqlite3')
+UI_MAP_STORE = os.getenv('UI_MAP_STORE', 'true').lower() in ('1', 'true', 'yes')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    run_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    crawler         TEXT NOT NULL,
+    started_at      TEXT NOT NULL,
+    finished_at     TEXT,
+    status          TEXT NOT NULL DEFAULT 'running',
+    browser_profile TEXT,
+    hierarchy_file  TEXT,
+    source_file     TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pages (
+    page_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id        INTEGER NOT NULL REFERENCES crawl_runs(run_id),
+    page_name     TEXT NOT NULL,
+    command_id    TEXT,
+    element_count INTEGER NOT NULL DEFAULT 0,
+    crawled_at    TEXT NOT NULL,
+    UNIQUE (run_id, page_name)
+);
+
+CREATE TABLE IF NOT EXISTS fields (
+    field_id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id            INTEGER NOT NULL REFERENCES crawl_runs(run_id),
+    page_id           INTEGER NOT NULL REFERENCES pages(page_id) ON DELETE CASCADE,
+    page_name         TEXT NOT NULL,
+    element_name      TEXT,
+    relative_xpath    TEXT,
+    full_xpath        TEXT,
+    element_id        TEXT,
+    element_name_attr TEXT,
+    class_name        TEXT,
+    tag_name          TEXT,
+    input_type        TEXT,
+    context           TEXT
+);
+
+CREATE TABLE IF NOT EXISTS page_stats (
+    page_id       INTEGER PRIMARY KEY REFERENCES pages(page_id) ON DELETE CASCADE,
+    run_id        INTEGER NOT NULL REFERENCES crawl_runs(run_id),
+    page_name     TEXT NOT NULL,
+    element_count INTEGER,
+    popup_opened  INTEGER,
+    total_wait_ms INTEGER,
+    error         TEXT,
+    stats_json    TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_pages_name ON pages(page_name);
+CREATE INDEX IF NOT EXISTS idx_pages_command ON pages(command_id);
+CREATE INDEX IF NOT EXISTS idx_fields_run_page ON fields(run_id, page_name);
+CREATE INDEX IF NOT EXISTS idx_fields_xpath ON fields(relative_xpath);
+CREATE INDEX IF NOT EXISTS idx_fields_element_id ON fields(element_id);
+CREATE INDEX IF NOT EXISTS idx_fields_element_name ON fields(element_name_attr);
+"""
+
+FIELD_COLUMNS = [
+    'element_name', 'relative_xpath', 'full_xpath', 'element_id', 'element_name_attr',
+    'class_name', 'tag_name', 'input_type', 'context',
+]
+
+# Workbook header -> row key, for the layouts the crawlers have written over time
+HEADER_ALIASES = {
+    'pagename': 'page', 'page': 'page',
+    'elementname': 'elementName',
+    'relativexpath': 'relativeXpath', 'xpath': 'relativeXpath',
+    'fullxpath': 'fullXpath',
+    'elementid': 'id', 'id': 'id',
+    'elementnameattr': 'name', 'name': 'name',
+    'classname': 'className',
+    'tagname': 'tagName', 'tag': 'tagName',
+    'inputtype': 'type', 'type': 'type',
+    'context': 'context',
+}
+
+
+def normalize_row(row: Dict) -> Dict:
+    """Field columns from a row of any crawler (crawler.py, crawler_fast, crawler_iframe_aware)."""
+    return {
+        'element_name': row.get('elementName') or '',
+        'relative_xpath': row.get('relativeXpath') or row.get('xpath') or '',
+        'full_xpath': row.get('fullXpath') or '',
+        'element_id': row.get('id') or '',
+        'element_name_attr': row.get('name') or '',
+        'class_name': row.get('className') or '',
+        'tag_name': row.get('tagName') or row.get('tag') or '',
+        'input_type': row.get('type') or '',
+        'context': row.get('context') or 'main',
+    }
+
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+
+class UiMapStore:
+    """Connection to the UI map database (created on first use)."""
+
+    def __init__(self, path: str = UI_MAP_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ----- writing -----
+
+    def start_run(self, crawler: str, resume: bool = False, browser_profile: str = '',
+                  hierarchy_file: str = '', source_file: str = '') -> int:
+        """New crawl run, or with resume=True the crawler's last unfinished run."""
+        if resume:
+            row = self.conn.execute(
+                "SELECT run_id FROM crawl_runs WHERE crawler = ? AND status = 'running' ORDER BY run_id DESC LIMIT 1",
+                (crawler,)
+            ).fetchone()
+            if row:
+                return row['run_id']
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO crawl_runs (crawler, started_at, browser_profile, hierarchy_file, source_file) VALUES (?, ?, ?, ?, ?)",
+                (crawler, _now(), browser_profile, hierarchy_file, source_file)
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, status: str = 'complete'):
+        with self.conn:
+            self.conn.execute("UPDATE crawl_runs SET finished_at = ?, status = ? WHERE run_id = ?", (_now(), status, run_id))
+
+    def _write_page(self, run_id: int, page_name: str, rows: List[Dict], stats: Dict = None, command_id: str = None):
+        self.conn.execute("DELETE FROM pages WHERE run_id = ? AND page_name = ?", (run_id, page_name))
+        page_id = self.conn.execute(
+            "INSERT INTO pages (run_id, page_name, command_id, element_count, crawled_at) VALUES (?, ?, ?, ?, ?)",
+            (run_id, page_name, command_id, len(rows), _now())
+        ).lastrowid
+        self.conn.executemany(
+            f"INSERT INTO fields (run_id, page_id, page_name, {', '.join(FIELD_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in FIELD_COLUMNS)})",
+            [(run_id, page_id, page_name, *normalize_row(row).values()) for row in rows]
+        )
+        if stats is not None:
+            self.conn.execute(
+                "INSERT INTO page_stats (page_id, run_id, page_name, element_count, popup_opened, total_wait_ms, error, stats_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (page_id, run_id, page_name, len(rows),
+                 int(bool(stats.get('popup_opened', stats.get('PopupOpened', True)))),
+                 stats.get('total_wait_ms'), stats.get('error') or stats.get('ErrorMessage') or '',
+                 json.dumps(stats, ensure_ascii=False, default=str))
+            )
+
+    def record_page(self, run_id: int, page_name: str, rows: List[Dict], stats: Dict = None, command_id: str = None):
+        """Write one crawled page (rows + stats) in a single transaction, replacing earlier rows of it in this run."""
+        with self.conn:
+            self._write_page(run_id, page_name, rows, stats, command_id)
+
+    def record_rows(self, run_id: int, rows: Iterable[Dict]):
+        """Bulk write rows of many pages (carried-over or imported) in one transaction."""
+        by_page = {}
+        for row in rows:
+            by_page.setdefault(row.get('page') or '', []).append(row)
+        with self.conn:
+            for page_name, page_rows in by_page.items():
+                self._write_page(run_id, page_name, page_rows)
+        return len(by_page)
+
+    # ----- reading -----
+
+    def runs(self) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT r.*, COUNT(p.page_id) AS pages, COALESCE(SUM(p.element_count), 0) AS fields "
+            "FROM crawl_runs r LEFT JOIN pages p ON p.run_id = r.run_id GROUP BY r.run_id ORDER BY r.run_id"
+        ).fetchall()
+
+    def latest_run(self, crawler: str = None) -> Optional[int]:
+        query = "SELECT run_id FROM crawl_runs"
+        params = ()
+        if crawler:
+            query += " WHERE crawler = ?"
+            params = (crawler,)
+        row = self.conn.execute(query + " ORDER BY run_id DESC LIMIT 1", params).fetchone()
+        return row['run_id'] if row else None
+
+    def iter_rows(self, run_id: int) -> Iterator[Dict]:
+        """Fields of a run in crawl order, shaped like crawler.py rows (input of export_to_excel)."""
+        cursor = self.conn.execute(
+            "SELECT * FROM fields WHERE run_id = ? ORDER BY page_id, field_id", (run_id,)
+        )
+        for row in cursor:
+            yield {
+                'page': row['page_name'],
+                'elementName': row['element_name'],
+                'relativeXpath': row['relative_xpath'],
+                'fullXpath': row['full_xpath'],
+                'id': row['element_id'],
+                'name': row['element_name_attr'],
+                'className': row['class_name'],
+                'tagName': row['tag_name'],
+                'type': row['input_type'],
+                'context': row['context'],
+            }
+
+    def page_fields(self, page_name: str, run_id: int = None) -> List[sqlite3.Row]:
+        run_id = run_id or self.latest_run()
+        return self.conn.execute(
+            "SELECT * FROM fields WHERE run_id = ? AND page_name = ? ORDER BY field_id", (run_id, page_name)
+        ).fetchall()
+
+    def find(self, value: str, run_id: int = None) -> List[sqlite3.Row]:
+        """Fields whose relative xpath, element id or element name equals value."""
+        run_id = run_id or self.latest_run()
+        return self.conn.execute(
+            "SELECT * FROM fields WHERE run_id = ? AND relative_xpath = ? "
+            "UNION SELECT * FROM fields WHERE run_id = ? AND element_id = ? "
+            "UNION SELECT * FROM fields WHERE run_id = ? AND element_name_attr = ? "
+            "ORDER BY page_name",
+            (run_id, value, run_id, value, run_id, value)
+        ).fetchall()
+
+    def pages_for_command(self, command_id: str) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT * FROM pages WHERE command_id = ? ORDER BY run_id DESC", (command_id,)
+        ).fetchall()
+
+    def compare_runs(self, old_run: int, new_run: int) -> Dict:
+        """Pages and (page, xpath) fields added/removed between two runs."""
+        def diff(table_sql, a, b):
+            return [tuple(r) for r in self.conn.execute(f"{table_sql} EXCEPT {table_sql}", (a, b)).fetchall()]
+
+        page_sql = "SELECT page_name FROM pages WHERE run_id = ?"
+        field_sql = "SELECT page_name, relative_xpath FROM fields WHERE run_id = ?"
+        return {
+            'pages_added': [r[0] for r in diff(page_sql, new_run, old_run)],
+            'pages_removed': [r[0] for r in diff(page_sql, old_run, new_run)],
+            'fields_added': diff(field_sql, new_run, old_run),
+            'fields_removed': diff(field_sql, old_run, new_run),
+        }
+
+    def import_workbook(self, filepath: str, crawler: str = 'import') -> int:
+        """Load an existing uiMap workbook as a completed run (any of the crawler layouts)."""
+        from openpyxl import load_workbook
+
+        wb = load_workbook(filepath, read_only=True)
+        ws = wb.active
+        rows = ws.iter_rows(values_only=True)
+        headers = [HEADER_ALIASES.get(str(h or '').strip().lower()) for h in next(rows, [])]
+
+        def records():
+            for values in rows:
+                record = {key: ('' if value is None else str(value)) for key, value in zip(headers, values) if key}
+                if record.get('page'):
+                    yield record
+
+        run_id = self.start_run(crawler, source_file=os.path.abspath(filepath))
+        self.record_rows(run_id, records())
+        wb.close()
+        self.finish_run(run_id, 'imported')
+        return run_id
+
+
+def open_store(enabled: bool = UI_MAP_STORE) -> Optional[UiMapStore]:
+    """Store for a crawler, or None if disabled / the database cannot be opened (the crawl goes on without it)."""
+    if not enabled:
+        return None
+    try:
+        return UiMapStore()
+    except sqlite3.Error as e:
+        print(f"⚠️ UI map store unavailable ({e}) - writing workbooks only")
+        return None
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    store = UiMapStore()
+    start = time.perf_counter()
+
+    if command == 'runs':
+        for run in store.runs():
+            print(f"#{run['run_id']:<4} {run['crawler']:<26} {run['status']:<9} {run['started_at']}  "
+                  f"{run['pages']:>5} pages {run['fields']:>7} fields")
+    elif command == 'find' and len(sys.argv) > 2:
+        for field in store.find(sys.argv[2]):
+            print(f"{field['page_name']:<50} {field['relative_xpath']}")
+    elif command == 'page' and len(sys.argv) > 2:
+        run_id = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        for field in store.page_fields(sys.argv[2], run_id):
+            print(f"{field['element_name']:<40} {field['relative_xpath']}  [{field['context']}]")
+    elif command == 'compare' and len(sys.argv) > 3:
+        diff = store.compare_runs(int(sys.argv[2]), int(sys.argv[3]))
+        for key, values in diff.items():
+            print(f"{key}: {len(values)}")
+            for value in values[:20]:
+                print(f"   {value}")
+    elif command == 'export' and len(sys.argv) > 3:
+        from crawler import export_to_excel
+        export_to_excel(store.iter_rows(int(sys.argv[2])), sys.argv[3])
+        print(f"✅ Exported run {sys.argv[2]} to {sys.argv[3]}")
+    elif command == 'import' and len(sys.argv) > 2:
+        run_id = store.import_workbook(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else 'import')
+        print(f"✅ Imported {sys.argv[2]} as run #{run_id}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+    print(f"\n⏱️ {(time.perf_counter() - start) * 1000:.1f} ms")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Shared Read-Only Workbook Loader
+The analysis and validation scripts used to open the hierarchy / UI map workbooks
+with a full load_workbook and then index ws.cell(row, col) in nested loops - once
+per column and once per analysis. load_table() reads a sheet ONCE, in read-only
+streaming mode, into a columnar table:
+
+- table.headers               header row (None for blank header cells)
+- table.column('Node Text')   one column as a list (by header or 1-based index)
+- table.rows()                data rows as tuples (header row excluded)
+- table.dtypes                per column: 'int', 'float', 'str', 'bool', 'datetime', 'mixed' or 'empty'
+
+Values are kept as openpyxl returns them (None = empty cell), so NA checks work as
+before. Tables are cached under WORKBOOK_CACHE_DIR (pickle, keyed by the file's path,
+mtime and size), so re-running an analysis on an unchanged workbook skips the parse.
+"""
+
+import os
+import sys
+import time
+import pickle
+import hashlib
+import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+from atomic_io import replace_atomically, TEMP_SUFFIX
+
+WORKBOOK_CACHE_DIR = os.getenv('WORKBOOK_CACHE_DIR', '.workbook_cache')
+CACHE_FORMAT = 1
+
+
+def _value_type(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return 'datetime'
+    return 'str'
+
+
+def _column_dtype(values: Sequence) -> str:
+    kinds = {_value_type(v) for v in values}
+    kinds.discard(None)
+    if not kinds:
+        return 'empty'
+    if kinds == {'int', 'float'}:
+        return 'float'
+    return kinds.pop() if len(kinds) == 1 else 'mixed'
+
+
+class SheetTable:
+    """One worksheet as columns (lists of cell values), header row kept separately."""
+
+    def __init__(self, title: str, headers: List, columns: List[List], source: str = ''):
+        self.title = title
+        self.headers = headers
+        self.columns = columns
+        self.source = source
+        self.n_rows = len(columns[0]) if columns else 0
+        self.dtypes = {self._name(i): _column_dtype(col) for i, col in enumerate(columns)}
+
+    def _name(self, index: int):
+        header = self.headers[index]
+        return header if header is not None else index + 1
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    def col_index(self, key: Union[str, int]) -> int:
+        """0-based position of a column given its header or its 1-based Excel index."""
+        if isinstance(key, int):
+            return key - 1
+        return self.headers.index(key)
+
+    def has_column(self, key: str) -> bool:
+        return key in self.headers
+
+    def column(self, key: Union[str, int]) -> List:
+        return self.columns[self.col_index(key)]
+
+    def rows(self) -> Iterator[tuple]:
+        return zip(*self.columns) if self.columns else iter(())
+
+    def records(self, keys: Sequence[str] = None) -> Iterator[Dict]:
+        """Rows as {header: value} dicts (only keys if given)."""
+        keys = list(keys) if keys else [h for h in self.headers if h is not None]
+        columns = [self.column(k) for k in keys]
+        for values in zip(*columns):
+            yield dict(zip(keys, values))
+
+    def cell(self, row: int, col: int):
+        """Excel coordinates (row 1 = header) - for the odd lookup, not for loops."""
+        if row == 1:
+            return self.headers[col - 1]
+        return self.columns[col - 1][row - 2]
+
+
+def _cache_path(filepath: str, sheet: Optional[str]) -> str:
+    key = f"{os.path.abspath(filepath)}|{sheet or ''}"
+    return os.path.join(WORKBOOK_CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
+
+
+def _file_signature(filepath: str) -> tuple:
+    stat = os.stat(filepath)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_table(filepath: str, sheet: str = None) -> SheetTable:
+    """Parse one sheet (active sheet by default) in read-only streaming mode."""
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        rows = ws.iter_rows(values_only=True)
+        headers = list(next(rows, ()))
+        width = len(headers)
+        columns = [[] for _ in range(width)]
+        for values in rows:
+            if len(values) > width:
+                # Data wider than the header row - widen the table
+                for _ in range(len(values) - width):
+                    headers.append(None)
+                    columns.append([None] * len(columns[0]) if columns else [])
+                width = len(values)
+            for i in range(width):
+                columns[i].append(values[i] if i < len(values) else None)
+        return SheetTable(ws.title, headers, columns, source=filepath)
+    finally:
+        wb.close()
+
+
+def load_table(filepath: str, sheet: str = None, use_cache: bool = True) -> SheetTable:
+    """Columnar table of a worksheet, from the on-disk cache when the workbook is unchanged."""
+    signature = _file_signature(filepath)
+    cache_file = _cache_path(filepath, sheet)
+
+    if use_cache and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('format') == CACHE_FORMAT and cached.get('signature') == signature:
+                return cached['table']
+        except Exception:
+            pass  # stale or damaged cache - parse again
+
+    start = time.perf_counter()
+    table = read_table(filepath, sheet)
+    elapsed = time.perf_counter() - start
+    print(f"📖 Read {os.path.basename(filepath)}: {table.n_rows} rows × {table.n_cols} columns in {elapsed:.1f}s")
+
+    if use_cache:
+        try:
+            os.makedirs(WORKBOOK_CACHE_DIR, exist_ok=True)
+            tmp_path = cache_file + TEMP_SUFFIX
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'format': CACHE_FORMAT, 'signature': signature, 'table': table}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            replace_atomically(tmp_path, cache_file, keep_backup=False)
+        except OSError as e:
+            print(f"⚠️ Could not cache {filepath}: {e}")
+    return table
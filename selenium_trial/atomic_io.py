@@ -0,0 +1,123 @@
+"""
+Atomic File Persistence
+Checkpoints and workbooks are never written over the live file:
+
+1. write to <file>.tmp and fsync it
+2. keep the current file as <name>.bak<ext> (one rolling backup generation)
+3. os.replace(<file>.tmp, <file>) - readers see the old or the new file, never half of one
+
+Loaders validate what they read and fall back to the backup generation, so a crash
+mid-save costs at most one save interval instead of the whole crawl.
+"""
+
+import os
+import json
+import shutil
+from typing import Any, Callable, Optional
+from openpyxl import load_workbook
+
+BACKUP_SUFFIX = '.bak'
+TEMP_SUFFIX = '.tmp'
+
+
+def backup_path(filepath: str) -> str:
+    """uiMap.xlsx -> uiMap.bak.xlsx (openpyxl only opens known extensions)."""
+    root, ext = os.path.splitext(filepath)
+    return f"{root}{BACKUP_SUFFIX}{ext}"
+
+
+def _fsync_file(filepath: str):
+    with open(filepath, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(filepath: str):
+    """Persist the rename itself (not supported on Windows - ignored there)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(filepath)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_backup(filepath: str):
+    """Keep the current file as the backup generation (hard link when possible, else copy)."""
+    if not os.path.exists(filepath):
+        return
+    bak = backup_path(filepath)
+    if os.path.exists(bak):
+        os.remove(bak)
+    try:
+        os.link(filepath, bak)
+    except (OSError, AttributeError):
+        shutil.copy2(filepath, bak)
+
+
+def replace_atomically(tmp_path: str, filepath: str, keep_backup: bool = True):
+    """Move an fsynced temp file over filepath, keeping the previous file as its backup."""
+    _fsync_file(tmp_path)
+    if keep_backup:
+        _rotate_backup(filepath)
+    os.replace(tmp_path, filepath)
+    _fsync_dir(filepath)
+
+
+def atomic_write_text(filepath: str, text: str, keep_backup: bool = True, encoding: str = 'utf-8'):
+    """Write text to filepath atomically."""
+    tmp_path = filepath + TEMP_SUFFIX
+    with open(tmp_path, 'w', encoding=encoding) as f:
+        f.write(text)
+    replace_atomically(tmp_path, filepath, keep_backup)
+
+
+def atomic_write_json(filepath: str, data: Any, keep_backup: bool = True, **dump_kwargs):
+    """json.dump data to filepath atomically."""
+    atomic_write_text(filepath, json.dumps(data, **dump_kwargs), keep_backup)
+
+
+def save_workbook_atomic(wb, filepath: str, keep_backup: bool = True):
+    """wb.save() to a temp file, then swap it in."""
+    root, ext = os.path.splitext(filepath)
+    tmp_path = f"{root}{TEMP_SUFFIX}{ext}"  # keep the .xlsx extension for openpyxl
+    wb.save(tmp_path)
+    replace_atomically(tmp_path, filepath, keep_backup)
+
+
+def load_json_validated(filepath: str, validate: Callable[[Any], bool] = None) -> Optional[Any]:
+    """
+    Load JSON from filepath, falling back to its backup generation when the file is
+    missing, unreadable or fails validate(data). Returns None if neither is usable.
+    """
+    for candidate in (filepath, backup_path(filepath)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (ValueError, OSError) as e:
+            print(f"⚠️ {candidate} is unreadable ({str(e)[:60]})")
+            continue
+        if validate is not None and not validate(data):
+            print(f"⚠️ {candidate} failed validation")
+            continue
+        if candidate != filepath:
+            print(f"♻️ Recovered from backup: {candidate}")
+        return data
+    return None
+
+
+def load_workbook_with_fallback(filepath: str, **kwargs):
+    """load_workbook(filepath), or its backup generation if the file is damaged."""
+    try:
+        return load_workbook(filepath, **kwargs)
+    except Exception as e:
+        bak = backup_path(filepath)
+        if not os.path.exists(bak):
+            raise
+        print(f"⚠️ {filepath} is unreadable ({str(e)[:60]}) - using {bak}")
+        return load_workbook(bak, **kwargs)
@@ -0,0 +1,88 @@
+"""
+Browser Profiles for setup_driver
+Selects how Chrome is launched for a run:
+
+- default:     headed, maximized, everything enabled (watch the crawl)
+- performance: headless, images and remote fonts blocked, no extensions, 1280x800 window,
+               eager page-load strategy (DOM ready is enough - fields don't need images/fonts)
+
+Pick one per run with BROWSER_PROFILE=performance (or setup_driver(profile='performance')).
+The profile name is kept on the driver (driver.browser_profile) so crawlers can record
+it in their run stats.
+"""
+
+import os
+from typing import Dict
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_PROFILE = 'default'
+
+BROWSER_PROFILES = {
+    'default': {
+        'headless': False,
+        'window_size': None,           # None = --start-maximized
+        'block_images': False,
+        'block_remote_fonts': False,
+        'disable_extensions': False,
+        'reduce_motion': False,
+        'page_load_strategy': 'normal',
+    },
+    'performance': {
+        'headless': True,
+        'window_size': '1280,800',
+        'block_images': True,
+        'block_remote_fonts': True,
+        'disable_extensions': True,
+        'reduce_motion': True,
+        'page_load_strategy': 'eager',
+    },
+}
+
+
+def get_profile_name(profile: str = None) -> str:
+    """Profile for this run: explicit argument, else BROWSER_PROFILE, else 'default'."""
+    name = (profile or os.getenv('BROWSER_PROFILE') or DEFAULT_PROFILE).strip().lower()
+    if name not in BROWSER_PROFILES:
+        print(f"⚠️ Unknown browser profile '{name}' - using '{DEFAULT_PROFILE}' (choose from {', '.join(BROWSER_PROFILES)})")
+        name = DEFAULT_PROFILE
+    return name
+
+
+def build_chrome_options(profile: str = None) -> Options:
+    """Chrome options for the profile (the flags every setup_driver already used, plus the profile's)."""
+    settings = BROWSER_PROFILES[get_profile_name(profile)]
+    chrome_options = Options()
+
+    if settings['headless']:
+        chrome_options.add_argument('--headless=new')
+    if settings['window_size']:
+        chrome_options.add_argument(f"--window-size={settings['window_size']}")
+    else:
+        chrome_options.add_argument('--start-maximized')
+
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    prefs = {}
+    if settings['block_images']:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        prefs['profile.managed_default_content_settings.images'] = 2
+    if settings['block_remote_fonts']:
+        chrome_options.add_argument('--disable-remote-fonts')
+    if settings['disable_extensions']:
+        chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--disable-component-extensions-with-background-pages')
+    if settings['reduce_motion']:
+        chrome_options.add_argument('--force-prefers-reduced-motion')
+        chrome_options.add_argument('--disable-smooth-scrolling')
+    if prefs:
+        chrome_options.add_experimental_option('prefs', prefs)
+
+    chrome_options.page_load_strategy = settings['page_load_strategy']
+    return chrome_options
+
+
+def describe_profile(profile: str = None) -> Dict:
+    """Profile name + settings, for run stats."""
+    name = get_profile_name(profile)
+    return {'browser_profile': name, **BROWSER_PROFILES[name]}
@@ -0,0 +1,176 @@
+"""
+Append-Only Checkpoint Journal
+One JSON line per completed page/node instead of rewriting the whole checkpoint,
+so a checkpoint write costs the same at page 10 and page 4000.
+
+File layout (JSON Lines):
+    {"op": "snapshot", "state": {...}, "records": N}   <- compacted state (first line, optional)
+    {"op": "append", "data": {...}}                    <- one per completed item
+
+- load() replays: returns the snapshot state plus every record appended after it
+- compact(state) folds the records into a fresh snapshot (atomic write, previous journal kept as backup)
+- needs_compaction() grows the interval with the snapshot size, so compaction stays amortized O(1)
+- A torn last line (process killed mid-write) is ignored; an unreadable journal falls back to the
+  backup, which is copied over it so new records extend the recovered generation (a missing
+  journal does not fall back - deleting it starts fresh)
+- Old whole-document checkpoints (plain json.dump output) load as the snapshot state and are
+  rewritten as a snapshot line right away - records appended to an indented document would
+  make it unreadable
+"""
+
+import os
+import json
+from typing import Dict, List, Optional, Tuple
+from atomic_io import atomic_write_text, backup_path
+
+DEFAULT_COMPACT_EVERY = 500
+
+
+class CheckpointJournal:
+    """Append-only checkpoint file with replay and periodic compaction."""
+
+    def __init__(self, filepath: str, compact_every: int = DEFAULT_COMPACT_EVERY):
+        self.filepath = filepath
+        self.compact_every = compact_every
+        self.snapshot_records = 0   # records folded into the current snapshot
+        self.pending_records = 0    # records appended since the snapshot
+        self.file = None
+
+    def load(self) -> Tuple[Dict, List[Dict]]:
+        """
+        Replay the journal. Returns (snapshot_state, records appended after it).
+        Falls back to the backup generation only if the journal exists but has no readable
+        entries - a deleted journal means a fresh start.
+        """
+        self.snapshot_records = 0
+        self.pending_records = 0
+        if not os.path.exists(self.filepath):
+            return {}, []
+
+        for candidate in (self.filepath, backup_path(self.filepath)):
+            replayed = self._replay(candidate)
+            if replayed is None:
+                continue
+            if candidate != self.filepath:
+                print(f"♻️ Recovered checkpoint from backup: {candidate}")
+                with open(candidate, 'r', encoding='utf-8') as f:
+                    atomic_write_text(self.filepath, f.read(), keep_backup=False)
+            state, records, snapshot_records, legacy = replayed
+            self.snapshot_records = snapshot_records
+            self.pending_records = len(records)
+            if legacy and not records:
+                self.compact(state)  # old document kept as the backup
+                print(f"📦 Converted old checkpoint {candidate} to the journal format")
+            return state, records
+
+        return {}, []
+
+    @staticmethod
+    def _replay(filepath: str) -> Optional[Tuple[Dict, List[Dict], int, bool]]:
+        """
+        Parse one journal file: (state, records, snapshot_records, is_old_document).
+        None if it is missing or has nothing readable.
+        """
+        if not os.path.exists(filepath):
+            return None
+
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            return None
+
+        state, records, snapshot_records = {}, [], 0
+        valid_entries = 0
+        legacy = False
+
+        lines = content.splitlines()
+        for line_no, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                if line_no == 0:
+                    # Not a journal - an old single-document checkpoint (possibly indented)
+                    try:
+                        document = json.loads(content)
+                        if isinstance(document, dict):
+                            return document, [], 0, True
+                    except ValueError:
+                        pass
+                continue  # torn line from a killed write
+
+            if not isinstance(entry, dict):
+                continue
+            op = entry.get('op')
+            if op == 'snapshot':
+                state = entry.get('state', {})
+                records = []
+                snapshot_records = entry.get('records', 0)
+                valid_entries += 1
+            elif op == 'append':
+                records.append(entry.get('data', {}))
+                valid_entries += 1
+            elif line_no == 0 and 'op' not in entry:
+                # Old single-line checkpoint written with json.dump(..., f)
+                state = entry
+                valid_entries += 1
+                legacy = True
+
+        if valid_entries == 0 and content.strip():
+            print(f"⚠️ Checkpoint journal {filepath} is unreadable")
+            return None
+        return state, records, snapshot_records, legacy
+
+    def _open(self):
+        if self.file is None or self.file.closed:
+            # Drop a torn tail so the next record starts on its own line
+            if os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0:
+                with open(self.filepath, 'rb+') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+            self.file = open(self.filepath, 'a', encoding='utf-8')
+        return self.file
+
+    def append(self, data: Dict):
+        """Append one record and flush it."""
+        self.append_many([data])
+
+    def append_many(self, records: List[Dict]):
+        """Append several records with a single write + flush."""
+        if not records:
+            return
+        f = self._open()
+        f.write(''.join(json.dumps({'op': 'append', 'data': r}, ensure_ascii=False) + '\n' for r in records))
+        f.flush()
+        self.pending_records += len(records)
+
+    def needs_compaction(self) -> bool:
+        """True once the appended records outnumber max(compact_every, records in the snapshot)."""
+        return self.pending_records >= max(self.compact_every, self.snapshot_records)
+
+    def compact(self, state: Dict):
+        """Replace the journal with a single snapshot of state (atomic write, old journal kept as backup)."""
+        self.close()
+        total = self.snapshot_records + self.pending_records
+        atomic_write_text(
+            self.filepath,
+            json.dumps({'op': 'snapshot', 'state': state, 'records': total}, ensure_ascii=False) + '\n'
+        )
+        self.snapshot_records = total
+        self.pending_records = 0
+
+    def close(self):
+        if self.file is not None and not self.file.closed:
+            self.file.close()
+
+    def clear(self):
+        """Delete the journal and its backup (crawl finished)."""
+        self.close()
+        for path in (self.filepath, backup_path(self.filepath)):
+            if os.path.exists(path):
+                os.remove(path)
+        self.snapshot_records = 0
+        self.pending_records = 0
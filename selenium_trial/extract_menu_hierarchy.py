@@ -6,44 +6,85 @@ Output: Excel, JSON tree, and indented text file
 
 import os
 import time
-import json
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from openpyxl import Workbook
 from openpyxl import load_workbook
+from menu_expansion import expand_menus_batched
+from browser_profiles import get_profile_name, build_chrome_options
+from checkpoint_journal import CheckpointJournal
+from atomic_io import save_workbook_atomic, replace_atomically, atomic_write_json, TEMP_SUFFIX
 
 load_dotenv()
 
-# Checkpoint file
+# Checkpoint journal: one line per collected node + one per finished section (see checkpoint_journal.py)
 CHECKPOINT_FILE = 'menu_hierarchy_checkpoint.json'
+checkpoint_journal = CheckpointJournal(CHECKPOINT_FILE)
+
+# Snapshot mode: walk the whole menu tree in one injected script instead of per-<li> WebDriver calls.
+# A snapshot takes seconds, so it is not checkpointed - an existing checkpoint is left for the per-<li> walk.
+SNAPSHOT_MODE = os.getenv('MENU_SNAPSHOT_MODE', 'false').lower() in ('1', 'true', 'yes')
 
 
 def load_checkpoint():
-    """Load checkpoint data from file."""
-    if os.path.exists(CHECKPOINT_FILE):
+    """
+    Replay the checkpoint journal.
+    Nodes count once their section is finished - a section cut off mid-way is redone on resume.
+    """
+    empty = {'nodes_collected': [], 'current_section': 1, 'node_counter': 0}
+    try:
+        state, records = checkpoint_journal.load()
+    except Exception:
+        return empty
+    if not state and not records:
+        return empty
+    
+    nodes_collected = list(state.get('nodes_collected', []))
+    current_section = state.get('current_section', 1)
+    node_counter = state.get('node_counter', 0)
+    
+    section_nodes = []
+    for record in records:
+        if 'node' in record:
+            section_nodes.append(record['node'])
+        else:
+            nodes_collected.extend(section_nodes)
+            section_nodes = []
+            current_section = record.get('section', current_section)
+            node_counter = record.get('node_counter', node_counter)
+    
+    print(f"📂 Loaded checkpoint: {len(nodes_collected)} nodes, Section {current_section}")
+    state = {'nodes_collected': nodes_collected, 'current_section': current_section, 'node_counter': node_counter}
+    if section_nodes:
+        print(f"   ({len(section_nodes)} nodes from the unfinished section will be collected again)")
+        # Drop the stale node records before the section is journaled again
         try:
-            with open(CHECKPOINT_FILE, 'r') as f:
-                data = json.load(f)
-                print(f"📂 Loaded checkpoint: {len(data.get('nodes_collected', []))} nodes, Section {data.get('current_section', 1)}")
-                return data
-        except:
-            return {'nodes_collected': [], 'current_section': 1, 'node_counter': 0}
-    return {'nodes_collected': [], 'current_section': 1, 'node_counter': 0}
+            checkpoint_journal.compact({**state, 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')})
+        except Exception as e:
+            print(f"⚠️ Failed to compact checkpoint: {e}")
+    return state
+
+
+def journal_node(node_info):
+    """Append one collected node to the checkpoint journal."""
+    try:
+        checkpoint_journal.append({'node': node_info})
+    except Exception as e:
+        print(f"⚠️ Failed to save checkpoint: {e}")
 
 
 def save_checkpoint(nodes_collected, current_section, node_counter):
-    """Save checkpoint data to file with immediate flush."""
+    """Mark a section as finished in the journal; compact into a snapshot when due."""
     try:
-        with open(CHECKPOINT_FILE, 'w') as f:
-            json.dump({
+        checkpoint_journal.append({'section': current_section, 'node_counter': node_counter})
+        if checkpoint_journal.needs_compaction():
+            checkpoint_journal.compact({
                 'nodes_collected': nodes_collected,
                 'current_section': current_section,
                 'node_counter': node_counter,
                 'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-            }, f, indent=2)
-            f.flush()
+            })
     except Exception as e:
         print(f"⚠️ Failed to save checkpoint: {e}")
 
@@ -52,20 +93,19 @@ def clear_checkpoint():
     """Clear checkpoint file after successful completion."""
     try:
         if os.path.exists(CHECKPOINT_FILE):
-            os.remove(CHECKPOINT_FILE)
+            checkpoint_journal.clear()
             print("✅ Checkpoint cleared")
     except Exception as e:
         print(f"⚠️ Failed to clear checkpoint: {e}")
 
 
-def setup_driver():
-    """Setup Chrome driver"""
-    chrome_options = Options()
-    chrome_options.add_argument('--start-maximized')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-    driver = webdriver.Chrome(options=chrome_options)
+def setup_driver(profile=None):
+    """Setup Chrome driver (BROWSER_PROFILE=default|performance)"""
+    profile = get_profile_name(profile)
+    print(f"🧭 Browser profile: {profile}")
+    driver = webdriver.Chrome(options=build_chrome_options(profile))
     driver.implicitly_wait(3)
+    driver.browser_profile = profile
     return driver
 
 def login(driver):
@@ -99,6 +139,11 @@ def get_menu_frame(driver):
 def expand_all_menus(driver):
     """Expand all collapsible menu nodes"""
     print("\n🔧 Expanding all menu items...")
+    try:
+        return expand_menus_batched(driver)['total']
+    except Exception as e:
+        print(f"⚠️ Batched expansion failed ({str(e)[:60]}), falling back to clicking icons")
+    
     expanded_total = 0
     max_passes = 20
     
@@ -349,9 +394,9 @@ def traverse_menu_tree(driver, ul_element, level=0, parent_text="ROOT", results=
                 if current_node_id % 50 == 0:
                     print(f"         Level {level}: {current_text[:40]}")
                 
-                # Save checkpoint every 100 nodes
-                if current_node_id % 100 == 0 and checkpoint_callback:
-                    checkpoint_callback(results, current_section, node_counter[0])
+                # Journal every node as it is collected
+                if checkpoint_callback:
+                    checkpoint_callback(node_info)
                 
                 # Look for child ULs
                 try:
@@ -366,29 +411,246 @@ def traverse_menu_tree(driver, ul_element, level=0, parent_text="ROOT", results=
     
     return results
 
-def build_full_paths(data):
-    """Build full hierarchy path for each node"""
-    # Create a map of node_id to node for quick lookup
+# Mirrors extract_node_info/traverse_menu_tree in-browser: same node order, text fallbacks and XPaths
+MENU_SNAPSHOT_SCRIPT = """
+    function getXPath(element) {
+        if (element.id !== '')
+            return '//*[@id="' + element.id + '"]';
+        if (element === document.body)
+            return '/html/body';
+
+        var ix = 0;
+        var siblings = element.parentNode.childNodes;
+        for (var i = 0; i < siblings.length; i++) {
+            var sibling = siblings[i];
+            if (sibling === element)
+                return getXPath(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
+            if (sibling.nodeType === 1 && sibling.tagName === element.tagName)
+                ix++;
+        }
+    }
+
+    function ownText(el) {
+        return el.childNodes[0] ? el.childNodes[0].textContent.trim() : el.textContent.trim();
+    }
+
+    function visibleText(el) {
+        return (el.innerText || '').trim();
+    }
+
+    function firstLine(el) {
+        return visibleText(el).split('\\n')[0];
+    }
+
+    function childrenByTag(el, tag) {
+        var found = [];
+        for (var i = 0; i < el.children.length; i++) {
+            if (el.children[i].tagName === tag) found.push(el.children[i]);
+        }
+        return found;
+    }
+
+    function extractNode(li, level, parentText, parentId) {
+        var node = {
+            node_id: counter++, parent_id: parentId, level: level, parent: parentText,
+            text: null, is_leaf: false, docommand_id: null, click_id: null, img_alt: null, xpath: null
+        };
+        var found = null;
+
+        // PRIORITY 1: any nested <a> with docommand
+        var anchors = li.getElementsByTagName('a');
+        for (var i = 0; i < anchors.length; i++) {
+            var a = anchors[i];
+            var href = a.getAttribute('href') || '';
+            if (href.indexOf('docommand') === -1) continue;
+
+            var text = visibleText(a);
+            if (!text) {
+                var parentSpan = a.parentElement ? a.parentElement.closest('span') : null;
+                if (parentSpan) text = visibleText(parentSpan);
+            }
+            if (!text) {
+                var prev = a.previousElementSibling;
+                while (prev) {
+                    if (prev.tagName === 'SPAN') { text = prev.textContent.trim(); break; }
+                    prev = prev.previousElementSibling;
+                }
+            }
+            if (!text) text = firstLine(li);
+
+            node.text = text;
+            node.is_leaf = true;
+            found = a;
+            var start = href.indexOf("docommand('");
+            if (start !== -1) {
+                start += "docommand('".length;
+                var end = href.indexOf("'", start);
+                if (end > start) node.docommand_id = href.substring(start, end);
+            }
+            break;
+        }
+
+        // PRIORITY 2: direct child <span> with ProcessMouseClick
+        if (found === null) {
+            var spans = childrenByTag(li, 'SPAN');
+            for (var j = 0; j < spans.length; j++) {
+                var onclick = spans[j].getAttribute('onclick') || '';
+                if (onclick.indexOf('ProcessMouseClick') === -1) continue;
+
+                node.text = ownText(spans[j]) || visibleText(spans[j]);
+                found = spans[j];
+                var img = spans[j].getElementsByTagName('img')[0];
+                if (img && img.getAttribute('alt')) node.img_alt = img.getAttribute('alt');
+                var marker = "ProcessMouseClick('";
+                var cstart = onclick.indexOf(marker);
+                if (cstart !== -1) {
+                    cstart += marker.length;
+                    var cend = onclick.indexOf("'", cstart);
+                    if (cend > cstart) node.click_id = onclick.substring(cstart, cend);
+                }
+                break;
+            }
+        }
+
+        if (found !== null) node.xpath = getXPath(found) || null;
+        if (node.text === null) node.text = firstLine(li);
+        return node;
+    }
+
+    function traverse(ul, level, parentText, parentId) {
+        var lis = childrenByTag(ul, 'LI');
+        for (var i = 0; i < lis.length; i++) {
+            var node = extractNode(lis[i], level, parentText, parentId);
+            nodes.push(node);
+            var childUls = childrenByTag(lis[i], 'UL');
+            for (var k = 0; k < childUls.length; k++) {
+                traverse(childUls[k], level + 1, node.text || 'Unknown', node.node_id);
+            }
+        }
+    }
+
+    var nodes = [];
+    var counter = 0;
+    var container = document.querySelector("div[id^='pane']");
+    if (!container) return nodes;
+    var mainUls = childrenByTag(container, 'UL');
+
+    if (mainUls.length === 1) {
+        // Single UL: each top-level LI is a section
+        var sections = childrenByTag(mainUls[0], 'LI');
+        for (var s = 0; s < sections.length; s++) {
+            var li = sections[s];
+            var sectionName = 'Section ' + (s + 1);
+            var headSpan = childrenByTag(li, 'SPAN')[0];
+            var headLink = childrenByTag(li, 'A')[0];
+            if (headSpan) sectionName = ownText(headSpan);
+            else if (headLink) sectionName = visibleText(headLink);
+
+            var header = extractNode(li, 1, 'ROOT', -1);
+            nodes.push(header);
+            var sectionUls = childrenByTag(li, 'UL');
+            for (var u = 0; u < sectionUls.length; u++) {
+                traverse(sectionUls[u], 2, sectionName, header.node_id);
+            }
+        }
+    } else {
+        // Multiple ULs: each UL is a separate section
+        for (var m = 0; m < mainUls.length; m++) {
+            traverse(mainUls[m], 1, 'Main Menu ' + (m + 1), -1);
+        }
+    }
+    return nodes;
+"""
+
+
+def snapshot_node_to_info(raw):
+    """Convert one raw snapshot node into the same dict extract_node_info returns"""
+    node_id = raw['node_id']
+    text = raw.get('text') or ''
+
+    if raw.get('is_leaf'):
+        unique_id = raw.get('docommand_id')
+    elif raw.get('img_alt'):
+        unique_id = f"PARENT:{raw['img_alt']}"
+    elif raw.get('click_id'):
+        unique_id = f"PARENT:{raw['click_id']}"
+    elif raw.get('xpath'):
+        # ProcessMouseClick span found but its onclick carried no quoted id
+        unique_id = f"PARENT:TEXT:{text}"
+    else:
+        unique_id = None
+
+    if not unique_id:
+        unique_id = f"NODE:{node_id}:{text[:20]}"
+
+    return {
+        'node_id': node_id,
+        'parent_id': raw['parent_id'],
+        'level': raw['level'],
+        'xpath_position': 'N/A',
+        'xpath_unique': raw.get('xpath') or 'N/A',
+        'unique_id': unique_id,
+        'text': text if text else "Unknown",
+        'parent': raw['parent'],
+        'is_leaf': bool(raw.get('is_leaf'))
+    }
+
+
+def snapshot_menu_tree(driver):
+    """Walk the whole div[id^=pane] tree in one injected script and return flat node dicts"""
+    raw_nodes = driver.execute_script(MENU_SNAPSHOT_SCRIPT) or []
+    return [snapshot_node_to_info(raw) for raw in raw_nodes]
+
+def build_path_links(data):
+    """
+    node_id -> path link (parent_link, text), built once per node from its parent's link.
+    Links share their prefixes, so the whole tree costs one tuple per node. Nodes whose
+    parent is not in data (partial data) start their path at themselves.
+    """
     node_map = {node['node_id']: node for node in data}
+    links = {}
+    section_links = {}
     
     for node in data:
-        path_parts = []
+        # Climb to the nearest ancestor that already has a link, then resolve downwards
+        pending = []
+        pending_ids = set()
         current = node
+        while current is not None and current['node_id'] not in links:
+            pending.append(current)
+            pending_ids.add(current['node_id'])
+            if current['parent_id'] == -1 or current['parent_id'] in pending_ids:
+                break  # root level, or a parent cycle - cut it here
+            current = node_map.get(current['parent_id'])
         
-        # Walk up the tree to build the full path
-        while current:
-            path_parts.insert(0, current['text'])
-            
-            # Find parent node
-            if current['parent_id'] == -1:
-                # Root level - add the parent name (Main Menu 1/2/3)
-                path_parts.insert(0, current['parent'])
-                break
+        for item in reversed(pending):
+            if item['parent_id'] == -1:
+                # Root level - prefixed by the parent name (Main Menu 1/2/3)
+                section = item['parent']
+                if section not in section_links:
+                    section_links[section] = (None, section)
+                parent_link = section_links[section]
             else:
-                current = node_map.get(current['parent_id'])
-        
-        node['full_path'] = ' > '.join(path_parts)
+                parent_link = links.get(item['parent_id'])
+            links[item['node_id']] = (parent_link, item['text'])
     
+    return links
+
+
+def join_path(link):
+    """Materialize a path link as 'Root > ... > Name' (one join, no prefix copies)"""
+    parts = []
+    while link is not None:
+        link, text = link
+        parts.append(text)
+    return ' > '.join(reversed(parts))
+
+
+def build_full_paths(data):
+    """Build full hierarchy path for each node from the shared path links"""
+    links = build_path_links(data)
+    for node in data:
+        node['full_path'] = join_path(links[node['node_id']])
     return data
 
 def export_to_excel(data, filepath):
@@ -427,13 +689,14 @@ def export_to_excel(data, filepath):
         adjusted_width = min(max_length + 2, 100)
         ws.column_dimensions[column_letter].width = adjusted_width
     
-    wb.save(filepath)
+    save_workbook_atomic(wb, filepath)
     print(f"   ✅ Excel: {filepath}")
 
 
 def export_to_text(data, filepath):
     """Export hierarchy to indented text file"""
-    with open(filepath, 'w', encoding='utf-8') as f:
+    tmp_path = filepath + TEMP_SUFFIX
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         f.write("T24 MENU HIERARCHY\n")
         f.write("=" * 80 + "\n\n")
         
@@ -449,6 +712,7 @@ def export_to_text(data, filepath):
                 f.write(f"{indent}   XPath: {node['xpath_unique']}\n")
             
             f.write("\n")
+    replace_atomically(tmp_path, filepath)
     
     print(f"   ✅ Text: {filepath}")
 
@@ -512,16 +776,97 @@ def export_to_json(data, filepath):
     """Export hierarchy to JSON tree structure"""
     tree = build_tree_structure(data)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(tree, f, indent=2, ensure_ascii=False)
+    atomic_write_json(filepath, tree, indent=2, ensure_ascii=False)
     
     print(f"   ✅ JSON: {filepath}")
 
+def export_hierarchy(all_nodes):
+    """Build full paths, write the Excel/text/JSON outputs and print the summary"""
+    # Build full paths for easy interpretation
+    print("\n🔗 Building full hierarchy paths...")
+    all_nodes = build_full_paths(all_nodes)
+    
+    # Export to all 3 formats
+    print("\n📤 Exporting to multiple formats...")
+    export_to_excel(all_nodes, 'menu_hierarchy4.xlsx')
+    export_to_text(all_nodes, 'menu_hierarchy4.txt')
+    export_to_json(all_nodes, 'menu_hierarchy4.json')
+    
+    # Print summary
+    print("\n" + "="*70)
+    print("SUMMARY")
+    print("="*70)
+    levels = {}
+    leaf_count = 0
+    parent_count = 0
+    
+    for node in all_nodes:
+        levels[node['level']] = levels.get(node['level'], 0) + 1
+        if node['is_leaf']:
+            leaf_count += 1
+        else:
+            parent_count += 1
+    
+    print(f"Total Nodes: {len(all_nodes)}")
+    print(f"Leaf Nodes (Clickable): {leaf_count}")
+    print(f"Parent Nodes (Expandable): {parent_count}")
+    print(f"\nNodes by Level:")
+    for level in sorted(levels.keys()):
+        print(f"   Level {level}: {levels[level]} nodes")
+    
+    print(f"\n📄 Output Files:")
+    print(f"   1. menu_hierarchy4.xlsx - Excel with all details")
+    print(f"   2. menu_hierarchy4.txt - Indented tree view")
+    print(f"   3. menu_hierarchy4.json - Nested JSON structure")
+    print("="*70)
+
+
+def main_snapshot():
+    """Snapshot mode: one injected script collects the whole tree (no checkpoint read or written)"""
+    if os.path.exists(CHECKPOINT_FILE):
+        print(f"ℹ️ Snapshot mode does not use {CHECKPOINT_FILE} - left in place for MENU_SNAPSHOT_MODE=false")
+    
+    driver = setup_driver()
+    
+    try:
+        login(driver)
+        
+        if not get_menu_frame(driver):
+            print("❌ Failed to find menu frame")
+            return
+        
+        expanded = expand_all_menus(driver)
+        print(f"\n📊 Expanded {expanded} nodes")
+        
+        driver.switch_to.default_content()
+        get_menu_frame(driver)
+        
+        print("\n📸 Capturing menu snapshot in a single script...")
+        snapshot_start = time.time()
+        all_nodes = snapshot_menu_tree(driver)
+        print(f"   Captured {len(all_nodes)} nodes in {time.time() - snapshot_start:.1f}s")
+        
+        print(f"\n✅ Total nodes collected: {len(all_nodes)}")
+        export_hierarchy(all_nodes)
+        
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        print("\n🔚 Closing browser...")
+        driver.quit()
+
+
 def main():
     print("="*70)
     print("T24 MENU HIERARCHY EXTRACTOR")
     print("="*70)
     
+    if SNAPSHOT_MODE:
+        main_snapshot()
+        return
+    
     # Load checkpoint
     checkpoint = load_checkpoint()
     start_section = checkpoint.get('current_section', 1)
@@ -591,10 +936,6 @@ def main():
                 
                 print(f"\n   📂 Processing section {idx}: {section_name}")
                 
-                # Create checkpoint callback
-                def checkpoint_callback(nodes, section, counter):
-                    save_checkpoint(nodes, section, counter)
-                
                 # Process this LI and its children
                 # First add this node itself
                 current_node_id = node_counter[0]
@@ -603,6 +944,7 @@ def main():
                 node_info = extract_node_info(driver, li, level=1, parent_text="ROOT", node_id=current_node_id, parent_id=-1)
                 if node_info:
                     all_nodes.append(node_info)
+                    journal_node(node_info)
                     
                     # Show the section header info
                     print(f"      Section Header: {node_info['text']}")
@@ -621,7 +963,7 @@ def main():
                             node_counter=node_counter,
                             parent_id=current_node_id,
                             current_section=idx,
-                            checkpoint_callback=checkpoint_callback
+                            checkpoint_callback=journal_node
                         )
                 
                 print(f"      Total nodes so far: {len(all_nodes)}")
@@ -667,10 +1009,6 @@ def main():
                 ul = main_uls[idx - 1]
                 print(f"\n   📂 Processing UL {idx}...")
                 
-                # Create checkpoint callback
-                def checkpoint_callback(nodes, section, counter):
-                    save_checkpoint(nodes, section, counter)
-                
                 nodes = traverse_menu_tree(
                     driver,
                     ul,
@@ -680,7 +1018,7 @@ def main():
                     node_counter=node_counter,
                     parent_id=-1,
                     current_section=idx,
-                    checkpoint_callback=checkpoint_callback
+                    checkpoint_callback=journal_node
                 )
                 
                 # If this is not a resume, add nodes to all_nodes
@@ -694,43 +1032,7 @@ def main():
         
         print(f"\n✅ Total nodes collected: {len(all_nodes)}")
         
-        # Build full paths for easy interpretation
-        print("\n🔗 Building full hierarchy paths...")
-        all_nodes = build_full_paths(all_nodes)
-        
-        # Export to all 3 formats
-        print("\n📤 Exporting to multiple formats...")
-        export_to_excel(all_nodes, 'menu_hierarchy4.xlsx')
-        export_to_text(all_nodes, 'menu_hierarchy4.txt')
-        export_to_json(all_nodes, 'menu_hierarchy4.json')
-        
-        # Print summary
-        print("\n" + "="*70)
-        print("SUMMARY")
-        print("="*70)
-        levels = {}
-        leaf_count = 0
-        parent_count = 0
-        
-        for node in all_nodes:
-            levels[node['level']] = levels.get(node['level'], 0) + 1
-            if node['is_leaf']:
-                leaf_count += 1
-            else:
-                parent_count += 1
-        
-        print(f"Total Nodes: {len(all_nodes)}")
-        print(f"Leaf Nodes (Clickable): {leaf_count}")
-        print(f"Parent Nodes (Expandable): {parent_count}")
-        print(f"\nNodes by Level:")
-        for level in sorted(levels.keys()):
-            print(f"   Level {level}: {levels[level]} nodes")
-        
-        print(f"\n📄 Output Files:")
-        print(f"   1. menu_hierarchy4.xlsx - Excel with all details")
-        print(f"   2. menu_hierarchy4.txt - Indented tree view")
-        print(f"   3. menu_hierarchy4.json - Nested JSON structure")
-        print("="*70)
+        export_hierarchy(all_nodes)
         
         # Clear checkpoint after successful completion
         clear_checkpoint()
@@ -741,6 +1043,7 @@ def main():
         traceback.print_exc()
         print(f"\n💾 Progress saved in checkpoint. Run script again to resume.")
     finally:
+        checkpoint_journal.close()
         print("\n🔚 Closing browser...")
         driver.quit()
 
@@ -0,0 +1,152 @@
+"""
+Batched T24 Menu Expansion
+Expands every collapsed ProcessMouseClick node with one injected script per pass
+(or one script for the whole tree) instead of per-icon WebDriver clicks.
+
+ProcessMouseClick handlers may attach child ULs asynchronously, so after every pass
+that clicked something the next pass waits until the menu pane has had no DOM
+mutations for MENU_SETTLE_QUIET_MS (at most MENU_SETTLE_MAX_MS) - the settle check
+that replaces the old click loop's sleep between passes.
+
+Used by extract_menu_hierarchy.py and the archive_trials crawlers.
+"""
+
+import os
+import time
+from typing import Dict
+
+MENU_SETTLE_QUIET_MS = int(os.getenv('MENU_SETTLE_QUIET_MS', '100'))
+MENU_SETTLE_MAX_MS = int(os.getenv('MENU_SETTLE_MAX_MS', '1000'))
+
+# One pass: click every ProcessMouseClick span whose LI has child ULs that are all hidden.
+# Uses each UL's own computed display (not rendered visibility) so nodes nested under a
+# still-collapsed ancestor are not mistaken for collapsed and toggled shut.
+EXPAND_PASS_SCRIPT = """
+    function isCollapsed(icon) {
+        var li = icon.closest('li');
+        if (!li) return false;
+        var childUls = [];
+        for (var i = 0; i < li.children.length; i++) {
+            if (li.children[i].tagName === 'UL') childUls.push(li.children[i]);
+        }
+        if (childUls.length === 0) return false;
+        for (var j = 0; j < childUls.length; j++) {
+            var style = window.getComputedStyle(childUls[j]);
+            if (style.display !== 'none' && style.visibility !== 'hidden') return false;
+        }
+        return true;
+    }
+
+    function expandPass() {
+        var container = document.querySelector("div[id^='pane']");
+        if (!container) return -1;
+        var icons = container.querySelectorAll("span[onclick*='ProcessMouseClick']");
+        var collapsed = [];
+        for (var i = 0; i < icons.length; i++) {
+            if (isCollapsed(icons[i])) collapsed.push(icons[i]);
+        }
+        for (var k = 0; k < collapsed.length; k++) {
+            try { collapsed[k].click(); } catch (e) {}
+        }
+        return collapsed.length;
+    }
+"""
+
+SINGLE_PASS_SCRIPT = EXPAND_PASS_SCRIPT + """
+    return expandPass();
+"""
+
+# Calls done(ms waited) once the pane has been free of DOM mutations for quietMs (or after maxMs)
+WAIT_FOR_QUIET_SCRIPT = """
+    function waitForQuiet(quietMs, maxMs, done) {
+        var target = document.querySelector("div[id^='pane']") || document.body;
+        var started = performance.now();
+        var finished = false;
+        var quietTimer = null;
+        var observer = new MutationObserver(function() {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(finish, quietMs);
+        });
+        var capTimer = setTimeout(finish, maxMs);
+        function finish() {
+            if (finished) return;
+            finished = true;
+            observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(capTimer);
+            done(Math.round(performance.now() - started));
+        }
+        observer.observe(target, {childList: true, subtree: true, attributes: true});
+        quietTimer = setTimeout(finish, quietMs);
+    }
+"""
+
+# Async: wait for the DOM to settle after the previous pass (execute_async_script)
+SETTLE_SCRIPT = WAIT_FOR_QUIET_SCRIPT + """
+    waitForQuiet(arguments[0], arguments[1], arguments[arguments.length - 1]);
+"""
+
+# Whole tree (async): passes until nothing is collapsed, settling in-browser between them,
+# reporting per-pass counts/timings
+WHOLE_TREE_SCRIPT = EXPAND_PASS_SCRIPT + WAIT_FOR_QUIET_SCRIPT + """
+    var maxPasses = arguments[0], quietMs = arguments[1], maxMs = arguments[2];
+    var callback = arguments[arguments.length - 1];
+    var passes = [];
+    function runPass(p) {
+        if (p >= maxPasses) return callback(passes);
+        var started = performance.now();
+        var expanded = expandPass();
+        var entry = {expanded: expanded, ms: Math.round(performance.now() - started), settle_ms: 0};
+        passes.push(entry);
+        if (expanded <= 0) return callback(passes);
+        waitForQuiet(quietMs, maxMs, function(waited) {
+            entry.settle_ms = waited;
+            runPass(p + 1);
+        });
+    }
+    runPass(0);
+"""
+
+
+def expand_menus_batched(driver, max_passes: int = 20, whole_tree: bool = False,
+                         settle_quiet_ms: int = MENU_SETTLE_QUIET_MS, settle_max_ms: int = MENU_SETTLE_MAX_MS) -> Dict:
+    """
+    Expand all collapsed menu nodes in the current (menu) frame using injected scripts,
+    letting the DOM settle after every pass that expanded something.
+    Returns: {'total': int, 'passes': [{'pass', 'expanded', 'ms', 'settle_ms'}], 'elapsed_ms': int}
+    Raises RuntimeError if the pane container is not present.
+    """
+    start_time = time.time()
+    passes = []
+
+    if whole_tree:
+        # The whole run happens in one async script - make sure the script timeout covers it
+        budget_s = max_passes * (settle_max_ms + 1000) / 1000
+        if budget_s > 30:
+            driver.set_script_timeout(budget_s)
+        results = driver.execute_async_script(WHOLE_TREE_SCRIPT, max_passes, settle_quiet_ms, settle_max_ms) or []
+        for pass_num, result in enumerate(results):
+            passes.append({'pass': pass_num + 1, 'expanded': result['expanded'], 'ms': result['ms'],
+                           'settle_ms': result.get('settle_ms', 0)})
+    else:
+        for pass_num in range(max_passes):
+            pass_start = time.time()
+            expanded = driver.execute_script(SINGLE_PASS_SCRIPT)
+            entry = {'pass': pass_num + 1, 'expanded': expanded, 'ms': int((time.time() - pass_start) * 1000), 'settle_ms': 0}
+            passes.append(entry)
+            if expanded <= 0:
+                break
+            entry['settle_ms'] = driver.execute_async_script(SETTLE_SCRIPT, settle_quiet_ms, settle_max_ms)
+
+    if passes and passes[0]['expanded'] < 0:
+        raise RuntimeError("Menu pane container not found")
+
+    total = 0
+    for p in passes:
+        total += p['expanded']
+        print(f"   Pass {p['pass']}: Expanded {p['expanded']} nodes in {p['ms']}ms, settled in {p['settle_ms']}ms (Total: {total})")
+
+    elapsed_ms = int((time.time() - start_time) * 1000)
+    print(f"✅ All menus expanded: {total} nodes in {len(passes)} passes ({elapsed_ms}ms)")
+
+    return {'total': total, 'passes': passes, 'elapsed_ms': elapsed_ms}
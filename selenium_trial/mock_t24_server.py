@@ -0,0 +1,484 @@
+"""
+Local Mock T24 BrowserServlet
+Serves a stand-in of the T24 UI generated from menu_hierarchy3.json so the crawlers
+can be run (and benchmarked) without the bank environment:
+
+- Sign-on form (signOnName / password / submit) -> session cookie
+- Frameset with a 'menu' frame holding div#pane_1 with one UL per menu section,
+  ProcessMouseClick spans (img alt = node text) and javascript:docommand('<id>') links
+- docommand() opens a popup; each page gets a deterministic layout and field set:
+    flat      fields in the popup document            (frame path 'main')
+    iframe    toolbar + <iframe> with the form        ('iframe_0')
+    frameset  <frame> toolbar + <frame> form          ('frame_1')
+    nested    <frame> toolbar + <frame> with <iframe> ('frame_1/iframe_0')
+- Per-page latency, field counts, empty-page ratio and late-loading fields are configurable
+
+Run standalone:
+    python mock_t24_server.py
+    set APP_URL / T24_URL to the printed URL, any non-empty credentials sign on
+
+Configuration (env vars, or a dict passed to start_mock_server):
+    MOCK_T24_PORT, MOCK_LATENCY_MS, MOCK_JITTER_MS, MOCK_FIELDS_MIN, MOCK_FIELDS_MAX,
+    MOCK_EMPTY_RATIO, MOCK_LATE_FIELDS_MS, MOCK_LAYOUTS, MOCK_SEED, MOCK_HIERARCHY_FILE
+"""
+
+import os
+import json
+import html
+import time
+import uuid
+import random
+import hashlib
+import threading
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SERVLET_PATH = '/BrowserWeb/servlet/BrowserServlet'
+DEFAULT_HIERARCHY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'menu_hierarchy3.json')
+
+DEFAULT_MOCK_CONFIG = {
+    'port': int(os.getenv('MOCK_T24_PORT', '18080')),
+    'hierarchy_file': os.getenv('MOCK_HIERARCHY_FILE', DEFAULT_HIERARCHY_FILE),
+    'latency_ms': int(os.getenv('MOCK_LATENCY_MS', '150')),         # delay before the form document is served
+    'jitter_ms': int(os.getenv('MOCK_JITTER_MS', '100')),           # +/- random spread on latency
+    'fields_min': int(os.getenv('MOCK_FIELDS_MIN', '5')),
+    'fields_max': int(os.getenv('MOCK_FIELDS_MAX', '40')),
+    'empty_ratio': float(os.getenv('MOCK_EMPTY_RATIO', '0.1')),     # share of pages with no fields at all
+    'late_fields_ms': int(os.getenv('MOCK_LATE_FIELDS_MS', '0')),   # >0: last fields are added by script after this delay
+    'layouts': os.getenv('MOCK_LAYOUTS', 'flat,iframe,frameset,nested').split(','),
+    'seed': os.getenv('MOCK_SEED', 't24-mock'),
+    'username': os.getenv('MOCK_USERNAME') or None,                 # None: any non-empty credentials sign on
+    'password': os.getenv('MOCK_PASSWORD') or None,
+}
+
+# Frame path (frame_walker naming) of the form document per layout
+LAYOUT_FORM_FRAME = {
+    'flat': 'main',
+    'iframe': 'iframe_0',
+    'frameset': 'frame_1',
+    'nested': 'frame_1/iframe_0',
+}
+
+# Field kinds cycled through on generated forms: (tag, type)
+FIELD_KINDS = [
+    ('input', 'text'), ('input', 'text'), ('select', 'select-one'), ('input', 'text'),
+    ('input', 'checkbox'), ('textarea', 'textarea'), ('input', 'text'), ('input', 'radio'),
+    ('input', 'date'), ('input', 'text'),
+]
+
+PIXEL_GIF = (b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+             b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+
+
+# ==================== HIERARCHY + PAGE GENERATION ====================
+
+def load_hierarchy(filepath: str) -> List[Dict]:
+    """Load the nested hierarchy JSON ([{section, children}])."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def iter_leaves(tree: List[Dict]):
+    """Yield leaf nodes in menu order."""
+    def walk(node):
+        if node.get('type') == 'leaf':
+            yield node
+        for child in node.get('children', []):
+            yield from walk(child)
+
+    for section in tree:
+        for node in section.get('children', []):
+            yield from walk(node)
+
+
+def _page_random(command_id: str, config: Dict) -> random.Random:
+    """Deterministic RNG per page (same fields for a page on every run with the same seed)."""
+    digest = hashlib.md5(f"{config['seed']}|{command_id}".encode('utf-8')).hexdigest()
+    return random.Random(int(digest, 16))
+
+
+def page_spec(command_id: str, config: Dict) -> Dict:
+    """
+    Layout and fields of the popup opened by docommand(command_id).
+    Field dicts: {tag, type, id, name, className, fillable, late}
+    Non-fillable fields (hidden inputs, buttons) are rendered but are not ground truth.
+    """
+    rng = _page_random(command_id, config)
+    layout = rng.choice(config['layouts'])
+
+    if rng.random() < config['empty_ratio']:
+        count = 0
+    else:
+        count = rng.randint(config['fields_min'], max(config['fields_min'], config['fields_max']))
+
+    app = command_id.split(',')[0].split(' ')[-1].strip('"') or 'APP'
+    fields = []
+    for i in range(count):
+        tag, field_type = FIELD_KINDS[(i + rng.randint(0, 3)) % len(FIELD_KINDS)]
+        field_name = f"fieldName:{app}.F{i + 1}"
+        # Every 7th field only has a name (T24 value:x:y:z style)
+        elem_id = '' if i % 7 == 6 else field_name
+        if not elem_id:
+            field_name = f"value:{i + 1}:1:1"
+        fields.append({
+            'tag': tag,
+            'type': field_type,
+            'id': elem_id,
+            'name': field_name,
+            'className': 'dealbox' if tag == 'input' and field_type == 'text' else '',
+            'fillable': True,
+            'late': False,
+        })
+
+    # Mark the last quarter as late-loading when configured
+    if config['late_fields_ms'] > 0 and fields:
+        for field in fields[-max(1, len(fields) // 4):]:
+            field['late'] = True
+
+    # Non-fillable noise every T24 form carries
+    fields.append({'tag': 'input', 'type': 'hidden', 'id': '', 'name': 'routineArgs', 'className': '', 'fillable': False, 'late': False})
+    if count:
+        fields.append({'tag': 'input', 'type': 'button', 'id': 'commit', 'name': 'commit', 'className': 'button', 'fillable': False, 'late': False})
+
+    latency = config['latency_ms'] + rng.randint(-config['jitter_ms'], config['jitter_ms']) if config['jitter_ms'] else config['latency_ms']
+    return {
+        'command_id': command_id,
+        'layout': layout,
+        'form_frame': LAYOUT_FORM_FRAME[layout],
+        'fields': fields,
+        'latency_ms': max(0, latency),
+    }
+
+
+def build_ground_truth(config: Dict = None) -> Dict[str, Dict]:
+    """
+    Expected extraction per menu page text (first occurrence, like the crawlers' dedup):
+    {page_text: {'command_id', 'layout', 'form_frame', 'fields': [{tag, type, id, name}]}}
+    """
+    config = {**DEFAULT_MOCK_CONFIG, **(config or {})}
+    truth = {}
+    for leaf in iter_leaves(load_hierarchy(config['hierarchy_file'])):
+        text = leaf.get('text', '')
+        if text in truth:
+            continue
+        spec = page_spec(leaf.get('unique_id') or '', config)
+        truth[text] = {
+            'command_id': spec['command_id'],
+            'layout': spec['layout'],
+            'form_frame': spec['form_frame'],
+            'fields': [
+                {k: f[k] for k in ('tag', 'type', 'id', 'name')}
+                for f in spec['fields'] if f['fillable']
+            ],
+        }
+    return truth
+
+
+# ==================== HTML RENDERING ====================
+
+def _esc(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def render_signon(error: str = '') -> str:
+    message = f'<div class="error">{_esc(error)}</div>' if error else ''
+    return f"""<html><head><title>T24 Sign in</title></head>
+<body>
+<form method="post" action="{SERVLET_PATH}" name="login">
+{message}
+<table>
+<tr><td>User Name</td><td><input type="text" name="signOnName" id="signOnName" /></td></tr>
+<tr><td>Password</td><td><input type="password" name="password" id="password" /></td></tr>
+<tr><td></td><td><input type="submit" value="Sign in" id="sign-in" /></td></tr>
+</table>
+</form>
+</body></html>"""
+
+
+def render_frameset() -> str:
+    return f"""<html><head><title>T24 - Model Bank</title></head>
+<frameset rows="48,*" border="0">
+  <frame name="banner" src="{SERVLET_PATH}?page=banner" scrolling="no" />
+  <frameset cols="300,*">
+    <frame name="menu" src="{SERVLET_PATH}?page=menu" />
+    <frame name="main" src="{SERVLET_PATH}?page=blank" />
+  </frameset>
+</frameset>
+</html>"""
+
+
+MENU_SCRIPT = """
+function ProcessMouseClick(id, evt) {
+    var span = evt ? evt.currentTarget : null;
+    if (!span) return;
+    var li = span.closest('li');
+    for (var i = 0; i < li.children.length; i++) {
+        var child = li.children[i];
+        if (child.tagName === 'UL') child.style.display = child.style.display === 'none' ? '' : 'none';
+    }
+}
+function docommand(cmd) {
+    window.open('BrowserServlet?page=popup&cmd=' + encodeURIComponent(cmd), '_blank', 'width=900,height=700,resizable=yes');
+}
+"""
+
+
+def _render_menu_node(node: Dict, parts: List[str]):
+    text = _esc(node.get('text', ''))
+    if node.get('type') == 'leaf':
+        command = (node.get('unique_id') or '').replace('\\', '\\\\').replace("'", "\\'")
+        parts.append(f'<li><img src="../plaf/images/menu/leaf.gif" alt="" /><a href="{_esc(f"javascript:docommand({chr(39)}{command}{chr(39)})")}">{text}</a></li>')
+        return
+
+    unique_id = node.get('unique_id') or ''
+    alt = unique_id[len('PARENT:'):] if unique_id.startswith('PARENT:') and not unique_id.startswith('PARENT:TEXT:') else ''
+    parts.append(
+        f'<li><span onclick="ProcessMouseClick(\'m{node.get("node_id")}\', event)">'
+        f'<img src="../plaf/images/menu/folder.gif" alt="{_esc(alt)}" />{text}</span>'
+    )
+    children = node.get('children', [])
+    if children:
+        parts.append('<ul style="display:none">')
+        for child in children:
+            _render_menu_node(child, parts)
+        parts.append('</ul>')
+    parts.append('</li>')
+
+
+def render_menu(tree: List[Dict]) -> str:
+    """Menu frame: one UL per section inside div#pane_1, all sub-menus collapsed."""
+    parts = [f'<html><head><title>Menu</title><script>{MENU_SCRIPT}</script>'
+             '<link rel="stylesheet" href="../plaf/style/menu.css" /></head><body><div id="pane_1">']
+    for section in tree:
+        parts.append('<ul>')
+        for node in section.get('children', []):
+            _render_menu_node(node, parts)
+        parts.append('</ul>')
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def _render_field(field: Dict) -> str:
+    id_attr = f' id="{_esc(field["id"])}"' if field['id'] else ''
+    attrs = f'{id_attr} name="{_esc(field["name"])}"'
+    if field['className']:
+        attrs += f' class="{_esc(field["className"])}"'
+    if field['tag'] == 'select':
+        return f'<select{attrs}><option value=""></option><option value="1">Option 1</option></select>'
+    if field['tag'] == 'textarea':
+        return f'<textarea{attrs} rows="2"></textarea>'
+    value = ' value="Commit"' if field['type'] == 'button' else ''
+    return f'<input type="{_esc(field["type"])}"{attrs}{value} />'
+
+
+def render_form(spec: Dict, late_fields_ms: int) -> str:
+    """The document that actually holds the fields."""
+    rows = []
+    late = []
+    for field in spec['fields']:
+        label = _esc(field['name'].split(':')[-1])
+        row = f'<tr><td class="label">{label}</td><td>{_render_field(field)}</td></tr>'
+        (late if field['late'] else rows).append(row)
+
+    late_script = ''
+    if late:
+        late_script = (
+            '<script>setTimeout(function () {'
+            f'document.getElementById("fieldTable").insertAdjacentHTML("beforeend", {json.dumps("".join(late))});'
+            f'}}, {late_fields_ms});</script>'
+        )
+    return (f'<html><head><title>{_esc(spec["command_id"])}</title></head><body>'
+            f'<form id="appreq" name="appreq"><table id="fieldTable">{"".join(rows)}</table></form>'
+            f'{late_script}</body></html>')
+
+
+def render_toolbar() -> str:
+    return ('<html><body><div class="toolbar">'
+            '<img src="../plaf/images/toolbar/commit.gif" alt="Commit" />'
+            '<img src="../plaf/images/toolbar/validate.gif" alt="Validate" />'
+            '<input type="hidden" name="toolbarState" value="1" /></div></body></html>')
+
+
+def render_popup(spec: Dict) -> Tuple[str, bool]:
+    """Popup top document. Returns (html, is_form) - is_form means the latency applies here."""
+    cmd = quote(spec['command_id'], safe='')
+    part = lambda name: f"{SERVLET_PATH}?page=part&amp;part={name}&amp;cmd={cmd}"
+    layout = spec['layout']
+    if layout == 'flat':
+        return None, True
+    if layout == 'iframe':
+        return (f'<html><head><title>{_esc(spec["command_id"])}</title></head><body>'
+                f'<div class="toolbar"><img src="../plaf/images/toolbar/commit.gif" alt="Commit" /></div>'
+                f'<iframe name="contract" src="{part("form")}" width="100%" height="600"></iframe></body></html>'), False
+    if layout == 'frameset':
+        return (f'<html><head><title>{_esc(spec["command_id"])}</title></head>'
+                f'<frameset rows="40,*"><frame name="toolbar" src="{part("toolbar")}" />'
+                f'<frame name="contract" src="{part("form")}" /></frameset></html>'), False
+    # nested
+    return (f'<html><head><title>{_esc(spec["command_id"])}</title></head>'
+            f'<frameset rows="40,*"><frame name="toolbar" src="{part("toolbar")}" />'
+            f'<frame name="contract" src="{part("wrapper")}" /></frameset></html>'), False
+
+
+def render_wrapper(spec: Dict) -> str:
+    cmd = quote(spec['command_id'], safe='')
+    return (f'<html><body><div class="header">Contract</div>'
+            f'<iframe name="fields" src="{SERVLET_PATH}?page=part&amp;part=form&amp;cmd={cmd}" width="100%" height="560"></iframe>'
+            f'</body></html>')
+
+
+# ==================== HTTP SERVER ====================
+
+class MockT24Handler(BaseHTTPRequestHandler):
+    server_version = 'MockT24/1.0'
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _count(self, key: str):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send(self, body, content_type='text/html; charset=utf-8', status=200, headers=None):
+        data = body if isinstance(body, bytes) else body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _session(self) -> str:
+        for cookie in self.headers.get('Cookie', '').split(';'):
+            name, _, value = cookie.strip().partition('=')
+            if name == 'JSESSIONID' and value in self.server.sessions:
+                return value
+        return ''
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path.endswith(('.gif', '.png')):
+            self._count('images')
+            return self._send(PIXEL_GIF, 'image/gif')
+        if url.path.endswith('.css'):
+            return self._send('li { list-style: none; } .dealbox { width: 200px; }', 'text/css')
+        if url.path != SERVLET_PATH:
+            return self._send('Not found', status=404)
+
+        page = params.get('page', '')
+        if not page:
+            # Already signed on (cookie carried over) -> straight to the frameset
+            return self._send(render_frameset() if self._session() else render_signon())
+        if not self._session():
+            return self._send(render_signon('Session expired'))
+
+        config = self.server.config
+        if page == 'banner':
+            return self._send('<html><body><img src="../plaf/images/logo.gif" alt="T24" /> Model Bank</body></html>')
+        if page == 'blank':
+            return self._send('<html><body></body></html>')
+        if page == 'menu':
+            self._count('menu_loads')
+            return self._send(self.server.menu_html)
+
+        spec = page_spec(params.get('cmd', ''), config)
+        if page == 'popup':
+            self._count('popups')
+            with self.server.stats_lock:
+                self.server.popup_log.append((time.perf_counter(), spec['command_id']))
+            top, is_form = render_popup(spec)
+            if not is_form:
+                return self._send(top)
+        elif page == 'part' and params.get('part') == 'toolbar':
+            return self._send(render_toolbar())
+        elif page == 'part' and params.get('part') == 'wrapper':
+            return self._send(render_wrapper(spec))
+        elif page != 'part':
+            return self._send('Unknown page', status=404)
+
+        # Form document: apply the page latency here
+        if spec['latency_ms']:
+            time.sleep(spec['latency_ms'] / 1000.0)
+        self._count('forms')
+        return self._send(render_form(spec, config['late_fields_ms']))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != SERVLET_PATH:
+            return self._send('Not found', status=404)
+
+        length = int(self.headers.get('Content-Length', '0'))
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        username = form.get('signOnName', '')
+        password = form.get('password', '')
+        config = self.server.config
+
+        valid = bool(username and password)
+        if config['username'] is not None:
+            valid = valid and username == config['username']
+        if config['password'] is not None:
+            valid = valid and password == config['password']
+        if not valid:
+            return self._send(render_signon('Invalid user name or password'))
+
+        session_id = uuid.uuid4().hex
+        with self.server.stats_lock:
+            self.server.sessions.add(session_id)
+        self._count('logins')
+        return self._send(render_frameset(), headers={'Set-Cookie': f'JSESSIONID={session_id}; Path=/BrowserWeb'})
+
+
+def create_mock_server(config: Dict = None, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Build (but do not start) the server. config overrides DEFAULT_MOCK_CONFIG."""
+    config = {**DEFAULT_MOCK_CONFIG, **(config or {})}
+    server = ThreadingHTTPServer((host, config['port']), MockT24Handler)
+    server.daemon_threads = True
+    server.config = config
+    server.menu_html = render_menu(load_hierarchy(config['hierarchy_file']))
+    server.sessions = set()
+    server.stats = {}
+    server.popup_log = []  # (perf_counter, command_id) per popup request - page boundaries for benchmarks
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def mock_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{SERVLET_PATH}"
+
+
+def start_mock_server(config: Dict = None) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the mock in a background thread. Returns (server, servlet_url); stop with server.shutdown()."""
+    server = create_mock_server(config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, mock_url(server)
+
+
+def main():
+    server = create_mock_server()
+    url = mock_url(server)
+    config = server.config
+    print("="*70)
+    print("MOCK T24 BROWSERSERVLET")
+    print("="*70)
+    print(f"🌐 {url}")
+    print(f"   Hierarchy: {config['hierarchy_file']}")
+    print(f"   Latency: {config['latency_ms']}ms ±{config['jitter_ms']}ms, fields {config['fields_min']}-{config['fields_max']}, "
+          f"empty ratio {config['empty_ratio']}, late fields {config['late_fields_ms']}ms")
+    print(f"   Layouts: {', '.join(config['layouts'])}")
+    print(f"\n   Point the crawlers at it:  APP_URL={url}  T24_URL={url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🔚 Stopping mock server")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
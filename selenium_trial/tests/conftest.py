@@ -0,0 +1,7 @@
+"""Put the shared helpers (selenium_trial/) and the crawl modules (archive_trials/) on the path."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'archive_trials'))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,105 @@
+"""Atomic writes keep the live file whole and one backup generation; loaders fall back to it."""
+import json
+import os
+
+import pytest
+from openpyxl import Workbook
+
+import atomic_io
+from atomic_io import (atomic_write_json, atomic_write_text, backup_path, load_json_validated,
+                       load_workbook_with_fallback, save_workbook_atomic, TEMP_SUFFIX)
+
+
+def read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_backup_path_keeps_the_extension():
+    assert backup_path('uiMap.xlsx') == 'uiMap.bak.xlsx'
+    assert backup_path(os.path.join('out', 'crawler_checkpoint.json')) == os.path.join('out', 'crawler_checkpoint.bak.json')
+    assert backup_path('journal') == 'journal.bak'
+
+
+def test_write_replaces_file_and_keeps_previous_generation(tmp_path):
+    path = str(tmp_path / 'state.json')
+    atomic_write_text(path, 'one')
+    assert read(path) == 'one'
+    assert not os.path.exists(backup_path(path))
+
+    atomic_write_text(path, 'two')
+    atomic_write_text(path, 'three')
+    assert read(path) == 'three'
+    assert read(backup_path(path)) == 'two'  # one rolling generation, not linked to the new file
+    assert not os.path.exists(path + TEMP_SUFFIX)
+
+
+def test_write_without_backup(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    atomic_write_json(path, {'a': 1}, keep_backup=False)
+    atomic_write_json(path, {'a': 2}, keep_backup=False)
+    assert json.loads(read(path)) == {'a': 2}
+    assert not os.path.exists(backup_path(path))
+
+
+def test_failed_replace_leaves_live_file_intact(tmp_path, monkeypatch):
+    path = str(tmp_path / 'state.json')
+    atomic_write_json(path, {'pages': 10})
+
+    def crash(src, dst):
+        raise OSError('killed before the rename')
+    monkeypatch.setattr(atomic_io.os, 'replace', crash)
+    with pytest.raises(OSError):
+        atomic_write_json(path, {'pages': 11})
+    assert json.loads(read(path)) == {'pages': 10}
+
+
+def test_failed_serialization_leaves_live_file_intact(tmp_path):
+    path = str(tmp_path / 'state.json')
+    atomic_write_json(path, {'pages': 10})
+    with pytest.raises(TypeError):
+        atomic_write_json(path, {'pages': object()})
+    assert json.loads(read(path)) == {'pages': 10}
+
+
+def test_load_json_validated_falls_back_to_backup(tmp_path, capsys):
+    path = str(tmp_path / 'state.json')
+    atomic_write_json(path, {'pages': 10})
+    atomic_write_json(path, {'pages': 11})
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"pages": 1')  # truncated
+
+    assert load_json_validated(path) == {'pages': 10}
+    assert 'Recovered from backup' in capsys.readouterr().out
+
+
+def test_load_json_validated_rejects_invalid_data(tmp_path):
+    path = str(tmp_path / 'state.json')
+    atomic_write_json(path, {'pages': 10})
+    atomic_write_json(path, ['not', 'a', 'dict'])
+    is_dict = lambda data: isinstance(data, dict)
+    assert load_json_validated(path, is_dict) == {'pages': 10}
+
+    atomic_write_json(path, ['still', 'not'])  # backup is now the bad list too
+    assert load_json_validated(path, is_dict) is None
+
+
+def test_load_json_validated_missing_files(tmp_path):
+    assert load_json_validated(str(tmp_path / 'missing.json')) is None
+
+
+def test_workbook_round_trip_and_fallback(tmp_path):
+    path = str(tmp_path / 'uiMap.xlsx')
+    for value in ('first', 'second'):
+        wb = Workbook()
+        wb.active.append(['pageName', value])
+        save_workbook_atomic(wb, path)
+    assert load_workbook_with_fallback(path).active['B1'].value == 'second'
+
+    with open(path, 'wb') as f:
+        f.write(b'PK\x03\x04 truncated zip')
+    assert load_workbook_with_fallback(path).active['B1'].value == 'first'
+
+    os.remove(backup_path(path))
+    with pytest.raises(Exception):
+        load_workbook_with_fallback(path)
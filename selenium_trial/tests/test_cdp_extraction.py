@@ -0,0 +1,180 @@
+"""DocumentSnapshot reads fields from a DOMSnapshot.captureSnapshot result like the bulk script."""
+import pytest
+
+from cdp_extraction import DocumentSnapshot, _matches, extract_fields_cdp, iter_snapshot_documents, parse_selector
+
+
+def el(tag, attrs=None, *children, **extra):
+    return {'type': 1, 'name': tag.upper(), 'attrs': attrs or {}, 'children': list(children), **extra}
+
+
+def text(value):
+    return {'type': 3, 'name': '#text', 'value': value, 'children': []}
+
+
+class SnapshotBuilder:
+    """Builds the captureSnapshot shape (shared string table, flat node arrays) from nested dicts."""
+
+    def __init__(self):
+        self.strings = []
+        self.documents = []
+
+    def s(self, value):
+        if value not in self.strings:
+            self.strings.append(value)
+        return self.strings.index(value)
+
+    def document(self, root):
+        """Add a document (#document > root); returns its index. Call for frames before their parent."""
+        nodes = {key: [] for key in ('parentIndex', 'nodeType', 'nodeName', 'nodeValue', 'attributes')}
+        rare = {'inputValue': ([], []), 'textValue': ([], []), 'optionSelected': ([], []), 'contentDocumentIndex': ([], [])}
+        layout = {'nodeIndex': [], 'styles': []}
+
+        def add(node, parent):
+            index = len(nodes['parentIndex'])
+            nodes['parentIndex'].append(parent)
+            nodes['nodeType'].append(node['type'])
+            nodes['nodeName'].append(self.s(node['name']))
+            nodes['nodeValue'].append(self.s(node.get('value', '')) if node['type'] == 3 else -1)
+            nodes['attributes'].append([self.s(p) for k, v in node.get('attrs', {}).items() for p in (k, v)])
+            for key, target in (('input_value', 'inputValue'), ('text_value', 'textValue')):
+                if key in node:
+                    rare[target][0].append(index)
+                    rare[target][1].append(self.s(node[key]))
+            if node.get('selected'):
+                rare['optionSelected'][0].append(index)
+            if 'content_document' in node:
+                rare['contentDocumentIndex'][0].append(index)
+                rare['contentDocumentIndex'][1].append(node['content_document'])
+            if node['type'] in (1, 3) and not node.get('hidden_box'):
+                layout['nodeIndex'].append(index)
+                layout['styles'].append([self.s(node.get('visibility', 'visible')), self.s(node.get('opacity', '1'))])
+            for child in node['children']:
+                add(child, index)
+
+        add({'type': 9, 'name': '#document', 'children': [root]}, -1)
+        nodes['inputValue'] = {'index': rare['inputValue'][0], 'value': rare['inputValue'][1]}
+        nodes['textValue'] = {'index': rare['textValue'][0], 'value': rare['textValue'][1]}
+        nodes['optionSelected'] = {'index': rare['optionSelected'][0]}
+        nodes['contentDocumentIndex'] = {'index': rare['contentDocumentIndex'][0], 'value': rare['contentDocumentIndex'][1]}
+        self.documents.append({'nodes': nodes, 'layout': layout})
+        return len(self.documents) - 1
+
+    def snapshot(self):
+        return {'documents': self.documents, 'strings': self.strings}
+
+
+FORM = el('html', {}, el('body', {},
+    el('div', {},
+        el('input', {'id': 'fieldName:CUSTOMER', 'name': 'fieldName:CUSTOMER', 'class': 'dealbox', 'type': 'TEXT'},
+           input_value='1001'),
+        el('input', {'type': 'tel-ish', 'name': 'phone', 'value': 'attr value'}),
+        el('input', {'type': 'checkbox', 'name': 'flag'}),
+        el('input', {'name': 'hidden-by-style'}, visibility='hidden'),
+        el('input', {'name': 'transparent'}, opacity='0'),
+        el('input', {'name': 'no-box'}, hidden_box=True),
+    ),
+    el('div', {},
+        el('select', {'name': 'ccy'},
+           el('option', {'value': 'EUR'}, text('Euro')),
+           el('optgroup', {}, el('option', {}, text('  US   Dollar '), selected=True))),
+        el('select', {'name': 'empty-choice'}, el('option', {'value': 'A'}, text('A')), el('option', {}, text('B'))),
+        el('textarea', {'name': 'notes'}, text(' default '), text_value='typed'),
+    ),
+))
+
+
+def form_doc():
+    builder = SnapshotBuilder()
+    builder.document(FORM)
+    snapshot = builder.snapshot()
+    return DocumentSnapshot(snapshot['documents'][0], snapshot['strings'])
+
+
+def fields_by_name(doc):
+    return {doc.field(i)['name'] or doc.field(i)['id']: doc.field(i)
+            for i in doc.elements() if doc.tag(i) in ('input', 'select', 'textarea')}
+
+
+def test_input_fields_follow_dom_properties():
+    fields = fields_by_name(form_doc())
+    customer = fields['fieldName:CUSTOMER']
+    assert customer == {
+        'tagName': 'input', 'id': 'fieldName:CUSTOMER', 'name': 'fieldName:CUSTOMER', 'className': 'dealbox',
+        'type': 'text', 'placeholder': '', 'value': '1001', 'text': '', 'visible': True,
+        'fullXpath': '//*[@id="fieldName:CUSTOMER"]',
+    }
+    assert fields['phone']['type'] == 'text'          # unknown type reads back as text
+    assert fields['phone']['value'] == 'attr value'   # no live value -> value attribute
+    assert fields['flag']['value'] == 'on'            # checkbox default
+    assert fields['hidden-by-style']['type'] == 'text'
+
+
+def test_visibility_from_layout_and_styles():
+    fields = fields_by_name(form_doc())
+    assert fields['phone']['visible']
+    assert not fields['hidden-by-style']['visible']
+    assert not fields['transparent']['visible']
+    assert not fields['no-box']['visible']
+
+
+def test_full_xpath_counts_same_tag_siblings():
+    fields = fields_by_name(form_doc())
+    assert fields['phone']['fullXpath'] == '/html/body/div[1]/input[2]'
+    assert fields['no-box']['fullXpath'] == '/html/body/div[1]/input[6]'
+    assert fields['notes']['fullXpath'] == '/html/body/div[2]/textarea[1]'
+
+
+def test_select_and_textarea_values():
+    fields = fields_by_name(form_doc())
+    assert fields['ccy']['type'] == 'select-one'
+    assert fields['ccy']['value'] == 'US Dollar'     # selected option without value attr -> normalized text
+    assert fields['ccy']['text'] == 'Euro\nUS   Dollar'
+    assert fields['empty-choice']['value'] == 'A'    # nothing selected -> first option
+    assert fields['notes']['value'] == 'typed'
+    assert fields['notes']['text'] == 'default'
+
+
+def test_selector_rules():
+    rules = parse_selector('input[type="text"], input:not([type]), SELECT')
+    assert _matches(rules, 'input', {'type': 'TEXT'})
+    assert _matches(rules, 'input', {})
+    assert not _matches(rules, 'input', {'type': 'button'})
+    assert _matches(rules, 'select', {'name': 'x'})
+    assert not _matches(rules, 'textarea', {})
+    with pytest.raises(ValueError):
+        parse_selector('div > input')
+
+
+def frames_snapshot():
+    builder = SnapshotBuilder()
+    inner = builder.document(el('html', {}, el('body', {}, el('input', {'id': 'inner'}))))
+    middle = builder.document(el('html', {}, el('body', {},
+        el('iframe', {}, content_document=inner), el('input', {'id': 'middle'}))))
+    empty = builder.document(el('html', {}, el('body', {})))
+    builder.document(el('html', {}, el('frameset', {},
+        el('frame', {}, content_document=empty), el('frame', {}, content_document=middle))))
+    return builder.snapshot()
+
+
+def test_frame_documents_get_frame_walker_paths():
+    paths = [path for path, _ in iter_snapshot_documents(frames_snapshot())]
+    assert paths == ['main', 'frame_0', 'frame_1', 'frame_1/iframe_0']
+    assert [path for path, _ in iter_snapshot_documents(frames_snapshot(), max_depth=1)] == ['main', 'frame_0', 'frame_1']
+
+
+class SnapshotDriver:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def execute_cdp_cmd(self, cmd, params):
+        assert cmd == 'DOMSnapshot.captureSnapshot'
+        return self.snapshot
+
+
+def test_extract_fields_cdp_per_frame():
+    driver = SnapshotDriver(frames_snapshot())
+    results = extract_fields_cdp(driver, 'input:not([type])')
+    assert [(path, [f['id'] for f in fields]) for path, fields in results] == [
+        ('main', []), ('frame_0', []), ('frame_1', ['middle']), ('frame_1/iframe_0', ['inner'])]
+    assert extract_fields_cdp(driver, 'input', frames=False) == [('main', [])]
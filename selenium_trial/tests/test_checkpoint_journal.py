@@ -0,0 +1,154 @@
+"""Replay, compaction and backup fallback of the append-only checkpoint journal."""
+import json
+import os
+
+import pytest
+
+from atomic_io import backup_path
+from checkpoint_journal import CheckpointJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'crawler_checkpoint.json')
+
+
+def page(i):
+    return {'item': f'Page {i}', 'index': i + 1}
+
+
+def test_missing_journal_loads_empty(path):
+    assert CheckpointJournal(path).load() == ({}, [])
+
+
+def test_append_then_load_replays_records(path):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.append_many([page(1), page(2)])
+    journal.close()
+
+    reloaded = CheckpointJournal(path)
+    assert reloaded.load() == ({}, [page(0), page(1), page(2)])
+    assert reloaded.pending_records == 3
+
+
+def test_truncated_last_line_is_ignored_and_next_append_starts_a_new_line(path):
+    journal = CheckpointJournal(path)
+    journal.append_many([page(0), page(1)])
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "append", "data": {"item": "Pa')  # killed mid-write
+
+    journal = CheckpointJournal(path)
+    assert journal.load() == ({}, [page(0), page(1)])
+    journal.append(page(2))
+    journal.close()
+    assert CheckpointJournal(path).load() == ({}, [page(0), page(1), page(2)])
+
+
+@pytest.mark.parametrize('indent', [None, 2])  # crawler.py wrote one line, extract_menu_hierarchy.py indented
+def test_legacy_whole_document_checkpoint_loads_as_snapshot(path, indent):
+    legacy = {'processed_items': ['Page 0', 'Page 1'], 'last_index': 2, 'timestamp': '2024-01-01 10:00:00'}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(legacy, f, indent=indent)
+
+    journal = CheckpointJournal(path)
+    assert journal.load() == (legacy, [])
+    journal.append(page(2))
+    journal.close()
+
+    assert CheckpointJournal(path).load() == (legacy, [page(2)])
+    with open(backup_path(path), encoding='utf-8') as f:
+        assert json.load(f) == legacy  # the old document is kept as the backup
+
+
+def test_compact_then_load(path):
+    journal = CheckpointJournal(path)
+    journal.append_many([page(i) for i in range(5)])
+    state = {'processed_items': [f'Page {i}' for i in range(5)], 'last_index': 5}
+    journal.compact(state)
+    journal.append(page(5))
+    journal.close()
+
+    with open(path, encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 2
+    reloaded = CheckpointJournal(path)
+    assert reloaded.load() == (state, [page(5)])
+    assert (reloaded.snapshot_records, reloaded.pending_records) == (5, 1)
+
+
+def test_compact_keeps_previous_journal_as_backup(path):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.compact({'last_index': 1})
+    journal.close()
+    assert CheckpointJournal._replay(backup_path(path)) == ({}, [page(0)], 0, False)
+
+
+def test_corrupt_journal_falls_back_to_backup(path, capsys):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.compact({'last_index': 1})
+    journal.close()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\x00\x00 not json \x00\n')
+
+    assert CheckpointJournal(path).load() == ({}, [page(0)])
+    assert 'Recovered checkpoint from backup' in capsys.readouterr().out
+
+
+def test_records_after_backup_recovery_extend_the_backup(path):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.compact({'last_index': 1})
+    journal.close()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('garbage\n')
+
+    journal = CheckpointJournal(path)
+    assert journal.load() == ({}, [page(0)])
+    journal.append(page(1))
+    journal.close()
+    assert CheckpointJournal(path).load() == ({}, [page(0), page(1)])
+
+
+def test_single_line_legacy_checkpoint_with_records_is_not_compacted(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'last_index': 2}) + '\n' + json.dumps({'op': 'append', 'data': page(2)}) + '\n')
+    assert CheckpointJournal(path).load() == ({'last_index': 2}, [page(2)])
+    assert CheckpointJournal(path).load() == ({'last_index': 2}, [page(2)])
+
+
+def test_deleted_journal_does_not_restore_backup(path):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.compact({'last_index': 1})
+    journal.close()
+    os.remove(path)
+
+    assert os.path.exists(backup_path(path))
+    assert CheckpointJournal(path).load() == ({}, [])
+
+
+def test_needs_compaction_interval_grows_with_snapshot(path):
+    journal = CheckpointJournal(path, compact_every=10)
+    compactions = 0
+    for i in range(1000):
+        journal.append(page(i))
+        if journal.needs_compaction():
+            journal.compact({'last_index': i + 1})
+            compactions += 1
+    journal.close()
+
+    # The interval doubles with the snapshot (10, 10, 20, 40, ...) - log(n) compactions, not n / 10
+    assert compactions == 7
+    assert journal.snapshot_records + journal.pending_records == 1000
+    assert CheckpointJournal(path).load()[0] == {'last_index': 640}
+
+
+def test_clear_removes_journal_and_backup(path):
+    journal = CheckpointJournal(path)
+    journal.append(page(0))
+    journal.compact({'last_index': 1})
+    journal.clear()
+    assert not os.path.exists(path) and not os.path.exists(backup_path(path))
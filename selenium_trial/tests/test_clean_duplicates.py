@@ -0,0 +1,111 @@
+"""clean_duplicates keeps the first row per key and reports what it dropped."""
+import sys
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import clean_duplicates
+from clean_duplicates import dedup_rows, dedupe_workbook, key_function
+from ui_map_store import HEADER_ALIASES
+
+HEADERS = ['pageName', 'elementName', 'relativeXpath', 'elementId', 'elementNameAttr', 'className', 'tagName', 'inputType']
+ROWS = [
+    ('Customer', 'txt_A', "//input[@id='A']", 'A', '', '', 'input', 'text'),
+    ('Customer', 'txt_A', "//input[@id='A']", 'A', '', '', 'input', 'text'),       # exact duplicate
+    ('Account', 'txt_A', "//input[@id='A']", 'A', '', '', 'input', 'text'),        # same xpath, other page
+    ('Account', 'ddl_A', "//input[@id='A']", 'A', '', '', 'select', 'select-one'),  # same page+xpath, other element
+    (None, None, None, None, None, None, None, None),                                # blank row
+    ('Account', 'btn', '', '', '', '', 'button', ''),                                # no xpath
+    ('Account', 'btn', None, '', '', '', 'button', ''),
+]
+
+
+def run(key, rows=ROWS, headers=HEADERS):
+    fields = [HEADER_ALIASES.get(h.lower()) for h in headers]
+    report = {'page_column': fields.index('page')}
+    kept = list(dedup_rows(rows, key_function(headers, key), fields.index('relativeXpath'), report))
+    return kept, report
+
+
+@pytest.mark.parametrize('key, dropped_rows', [
+    ('xpath', [1, 2, 3]),
+    ('page_xpath', [1, 3]),
+    ('row', [1]),
+])
+def test_first_row_per_key_is_kept(key, dropped_rows):
+    kept, report = run(key)
+    assert kept == [row for i, row in enumerate(ROWS) if i not in dropped_rows]
+    assert report['rows_dropped'] == len(dropped_rows)
+    assert report['rows_kept'] == len(ROWS) - len(dropped_rows)
+
+
+def test_rows_without_xpath_and_blank_rows_are_kept_and_counted():
+    kept, report = run('row')
+    assert ROWS[4] in kept and ROWS[5] in kept and ROWS[6] in kept
+    assert report['rows_without_xpath'] == 3
+    assert report['rows_kept'] + report['rows_dropped'] == len(ROWS)
+
+
+def test_report_lists_dropped_rows_per_page_with_kept_row():
+    _, report = run('xpath')
+    assert report['dropped_per_page'] == {'Account': 2, 'Customer': 1}
+    assert report['dropped_examples'][0] == {'row': 3, 'kept_row': 2, 'page': 'Customer', 'xpath': "//input[@id='A']"}
+    assert report['unique_keys'] == 1
+
+
+def test_columns_are_found_by_header_in_any_order():
+    headers = ['XPath', 'Page', 'Tag']
+    rows = [('//a', 'P1', 'input'), ('//a', 'P2', 'input'), ('//a', 'P1', 'select')]
+    kept, _ = run('page_xpath', rows, headers)
+    assert kept == rows[:2]
+    kept, _ = run('row', rows, headers)  # missing key columns count as ''
+    assert kept == rows
+
+
+def test_key_function_rejects_unknown_key_and_missing_xpath_column():
+    with pytest.raises(ValueError, match='Unknown DEDUP_KEY'):
+        key_function(HEADERS, 'nope')
+    with pytest.raises(ValueError, match='No XPath column'):
+        key_function(['pageName', 'elementName'], 'xpath')
+
+
+def test_dedupe_workbook_streams_into_a_new_file(tmp_path):
+    src, out = str(tmp_path / 'uiMap.xlsx'), str(tmp_path / 'uiMap_cleaned.xlsx')
+    wb = Workbook()
+    wb.active.title = 'T24ModelBank'
+    wb.active.append(HEADERS)
+    for row in ROWS:
+        wb.active.append(row)
+    wb.save(src)
+
+    report, headers = dedupe_workbook(src, out, 'page_xpath')
+    assert headers == HEADERS
+    ws = load_workbook(out).active
+    assert ws.title == 'T24ModelBank'
+    values = list(ws.iter_rows(values_only=True))
+    assert values[0] == tuple(HEADERS)
+    blank_to_none = lambda row: tuple(None if v == '' else v for v in row)  # Excel stores '' as an empty cell
+    assert values[1:] == [blank_to_none(r) for i, r in enumerate(ROWS) if i not in (1, 3)]
+    assert report['rows_dropped'] == 2
+
+
+def test_main_rejects_unknown_dedup_key(tmp_path, monkeypatch, capsys):
+    src = str(tmp_path / 'uiMap.xlsx')
+    Workbook().save(src)
+    monkeypatch.setattr(clean_duplicates, 'DEDUP_KEY', 'nope')
+    monkeypatch.setattr(sys, 'argv', ['clean_duplicates.py', src])
+    with pytest.raises(SystemExit) as exit_info:
+        clean_duplicates.main()
+    assert exit_info.value.code == 1
+    assert "❌ Unknown DEDUP_KEY 'nope'" in capsys.readouterr().out
+
+
+def test_main_reports_a_workbook_without_xpath_column(tmp_path, monkeypatch, capsys):
+    src = str(tmp_path / 'uiMap.xlsx')
+    wb = Workbook()
+    wb.active.append(['pageName', 'elementName'])
+    wb.save(src)
+    monkeypatch.setattr(sys, 'argv', ['clean_duplicates.py', src])
+    with pytest.raises(SystemExit):
+        clean_duplicates.main()
+    assert '❌ No XPath column' in capsys.readouterr().out
@@ -0,0 +1,97 @@
+"""Frame path cache: remembered frames are tried first, a full walk runs when they give fewer fields."""
+import json
+
+import frame_walker
+from frame_walker import extract_across_frames, load_frame_cache, save_frame_cache
+
+
+class Frame:
+    def __init__(self, fields=0, children=()):
+        self.fields = fields
+        self.children = list(children)
+
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def default_content(self):
+        self.driver.stack = [self.driver.top]
+
+    def frame(self, frame):
+        self.driver.stack.append(frame)
+
+    def parent_frame(self):
+        self.driver.stack.pop()
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for walk_frame_tree/switch_to_frame_path."""
+
+    def __init__(self, top):
+        self.top = top
+        self.stack = [top]
+        self.switch_to = FakeSwitch(self)
+
+    @property
+    def current(self):
+        return self.stack[-1]
+
+    def execute_script(self, script):
+        return [[child, 'iframe'] for child in self.current.children]
+
+    def find_elements(self, by, selector):
+        return list(self.current.children)
+
+
+def extractor(driver, calls):
+    def extract(path_name):
+        calls.append(path_name)
+        return [f"{path_name}:{i}" for i in range(driver.current.fields)]
+    return extract
+
+
+def test_full_walk_fills_cache_with_counts():
+    driver = FakeDriver(Frame(0, [Frame(3), Frame(0, [Frame(2)])]))
+    cache, calls = {}, []
+    results = extract_across_frames(driver, extractor(driver, calls), cache, 'PAGE')
+
+    assert [name for name, _ in results] == ['main', 'iframe_0', 'iframe_1', 'iframe_1/iframe_0']
+    assert cache == {'PAGE': {'iframe_0': 3, 'iframe_1/iframe_0': 2}}
+
+
+def test_cache_hit_visits_only_remembered_frames():
+    driver = FakeDriver(Frame(0, [Frame(3), Frame(0, [Frame(2)])]))
+    cache = {'PAGE': {'iframe_0': 3, 'iframe_1/iframe_0': 2}}
+    calls = []
+    results = extract_across_frames(driver, extractor(driver, calls), cache, 'PAGE')
+
+    assert calls == ['iframe_0', 'iframe_1/iframe_0']
+    assert sum(len(rows) for _, rows in results) == 5
+
+
+def test_fewer_fields_than_cached_falls_back_to_full_walk():
+    # Part of the form moved into a newly added frame
+    driver = FakeDriver(Frame(0, [Frame(3), Frame(0, [Frame(0)]), Frame(2)]))
+    cache = {'PAGE': {'iframe_0': 3, 'iframe_1/iframe_0': 2}}
+    calls = []
+    results = extract_across_frames(driver, extractor(driver, calls), cache, 'PAGE')
+
+    rows = [row for _, rows in results for row in rows]
+    assert sorted(rows) == ['iframe_0:0', 'iframe_0:1', 'iframe_0:2', 'iframe_2:0', 'iframe_2:1']
+    # Remembered frames are not extracted twice (the crawler's extract_fn dedupes)
+    assert calls.count('iframe_0') == 1
+    assert cache == {'PAGE': {'iframe_0': 3, 'iframe_2': 2}}
+
+
+def test_old_list_cache_loads_and_saves_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / 'frame_path_cache.json')
+    with open(path, 'w') as f:
+        json.dump({'PAGE': ['iframe_0']}, f)
+    assert load_frame_cache(path) == {'PAGE': {'iframe_0': 0}}
+
+    written = []
+    monkeypatch.setattr(frame_walker, 'atomic_write_json',
+                        lambda *args, **kwargs: written.append(kwargs.get('keep_backup')))
+    save_frame_cache({'PAGE': {'iframe_0': 4}}, path)
+    assert written == [False]
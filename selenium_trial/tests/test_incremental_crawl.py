@@ -0,0 +1,90 @@
+"""diff_hierarchies / split_previous_rows decide what an incremental crawl re-extracts."""
+import json
+
+import pytest
+
+from incremental_crawl import diff_hierarchies, split_previous_rows
+
+
+def leaf(text, unique_id, path=None):
+    return {'type': 'leaf', 'text': text, 'unique_id': unique_id, 'full_path': path or f"Main Menu 1 > Customer > {text}"}
+
+
+def write_tree(path, leaves):
+    tree = [{'section': 'Main Menu 1', 'children': [
+        {'type': 'parent', 'text': 'Customer', 'unique_id': 'PARENT:Customer', 'children': leaves}
+    ]}]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(tree, f)
+    return str(path)
+
+
+@pytest.fixture
+def diff(tmp_path):
+    previous = write_tree(tmp_path / 'previous.json', [
+        leaf('Input Customer', 'CUS.INPUT'),
+        leaf('Amend Customer', 'CUS.AMEND'),
+        leaf('Close Account', 'ACC.CLOSE'),
+        leaf('Old Report', 'REP.OLD'),
+        leaf('Shared Name', 'SHARED.A'),
+        leaf('Enquiry', 'ENQ.1'),
+    ])
+    current = write_tree(tmp_path / 'current.json', [
+        leaf('Input Customer', 'CUS.INPUT'),                                 # unchanged
+        leaf('Amend Customer Details', 'CUS.AMEND'),                         # renamed
+        leaf('Close Account', 'ACC.CLOSE', 'Main Menu 1 > Accounts > Close Account'),  # moved
+        leaf('New Page', 'NEW.1'),                                           # added
+        leaf('Shared Name', 'SHARED.B'),                                     # new id, old page name
+        leaf('Enquiry', 'ENQ.1'),                                            # unchanged
+    ])
+    return diff_hierarchies(previous, current)
+
+
+def texts(leaves):
+    return sorted(l['text'] for l in leaves)
+
+
+def test_leaves_are_classified_by_unique_id(diff):
+    assert texts(diff['added']) == ['New Page', 'Shared Name']
+    assert texts(diff['changed']) == ['Amend Customer Details', 'Close Account']
+    assert texts(diff['unchanged']) == ['Enquiry', 'Input Customer']
+    assert texts(diff['removed']) == ['Old Report', 'Shared Name']
+
+
+def test_page_sets(diff):
+    assert diff['crawl_pages'] == {'New Page', 'Shared Name', 'Amend Customer Details', 'Close Account'}
+    assert diff['carry_pages'] == {'Enquiry', 'Input Customer'}
+    # 'Shared Name' is removed under its old id but still a current page - not pruned
+    assert diff['prune_pages'] == {'Old Report', 'Amend Customer'}
+
+
+def test_page_shared_by_unchanged_and_changed_leaf_is_recrawled(tmp_path):
+    previous = write_tree(tmp_path / 'previous.json', [leaf('Enquiry', 'ENQ.1'), leaf('Enquiry', 'ENQ.2', 'Main Menu 1 > X > Enquiry')])
+    current = write_tree(tmp_path / 'current.json', [leaf('Enquiry', 'ENQ.1'), leaf('Enquiry', 'ENQ.2', 'Main Menu 1 > Y > Enquiry')])
+    diff = diff_hierarchies(previous, current)
+    assert diff['crawl_pages'] == {'Enquiry'}
+    assert diff['carry_pages'] == set()
+
+
+def test_same_id_in_several_menus_compares_all_of_them(tmp_path):
+    twice = [leaf('Enquiry', 'ENQ.1'), leaf('Enquiry', 'ENQ.1', 'Main Menu 2 > Enquiry')]
+    previous = write_tree(tmp_path / 'previous.json', twice)
+    assert texts(diff_hierarchies(previous, write_tree(tmp_path / 'same.json', list(reversed(twice))))['unchanged']) == ['Enquiry', 'Enquiry']
+    assert texts(diff_hierarchies(previous, write_tree(tmp_path / 'one.json', twice[:1]))['changed']) == ['Enquiry']
+
+
+def test_leaves_without_unique_id_match_by_path(tmp_path):
+    previous = write_tree(tmp_path / 'previous.json', [leaf('Report', None)])
+    diff = diff_hierarchies(previous, write_tree(tmp_path / 'current.json', [leaf('Report', None)]))
+    assert texts(diff['unchanged']) == ['Report'] and not diff['added'] and not diff['removed']
+
+
+def test_split_previous_rows(diff):
+    rows = [{'page': 'Input Customer', 'relativeXpath': '//a'},
+            {'page': 'Input Customer', 'relativeXpath': '//b'},
+            {'page': 'Amend Customer', 'relativeXpath': '//c'},
+            {'page': 'Old Report', 'relativeXpath': '//d'},
+            {'page': 'Close Account', 'relativeXpath': '//e'}]
+    carried, pruned = split_previous_rows(rows, diff)
+    assert carried == rows[:2]
+    assert pruned == {'Amend Customer': 1, 'Old Report': 1}  # 'Close Account' is re-crawled, not pruned
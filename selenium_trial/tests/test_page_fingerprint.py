@@ -0,0 +1,42 @@
+"""Fingerprint cache keeps only fingerprints + line offsets in memory and reads rows back on a hit."""
+import json
+
+from page_fingerprint import FingerprintCache
+
+ROWS = [{'id': 'a', 'tagName': 'input', 'relativeXpath': "//input[@id='a']", 'page': 'OLD'}]
+
+
+def test_hit_reads_rows_from_disk_and_relabels_page(tmp_path):
+    path = str(tmp_path / 'cache.jsonl')
+    cache = FingerprintCache(path, enabled=True)
+    cache.store('CMD1', 'fp1', 'OLD', ROWS)
+    cache.store('CMD2', 'fp2', 'Other', [])
+
+    assert all(isinstance(value, tuple) for value in cache.entries.values())  # no rows held
+    assert cache.lookup('CMD1', 'fp1', 'NEW') == [{**ROWS[0], 'page': 'NEW'}]
+    assert cache.lookup('CMD2', 'fp2', 'Other') == []
+    assert cache.lookup('CMD1', 'changed', 'NEW') is None
+    assert cache.lookup('MISSING', 'fp1', 'NEW') is None
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.close()
+
+
+def test_reload_and_compaction_keep_the_latest_entry(tmp_path):
+    path = str(tmp_path / 'cache.jsonl')
+    cache = FingerprintCache(path, enabled=True)
+    for generation in range(120):
+        cache.store('CMD1', f'fp{generation}', 'Page', [{**ROWS[0], 'generation': generation}])
+    cache.close()
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"command_id": "CMD2", "fingerp')  # torn last line
+
+    reloaded = FingerprintCache(path, enabled=True)  # 120 lines for 1 id -> compacted
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert [line['fingerprint'] for line in lines] == ['fp119']
+    assert reloaded.lookup('CMD1', 'fp119', 'Page')[0]['generation'] == 119
+
+    reloaded.store('CMD2', 'fp', 'Second', ROWS)
+    assert reloaded.lookup('CMD2', 'fp', 'Second') == [{**ROWS[0], 'page': 'Second'}] and reloaded.lookup('CMD1', 'fp119', 'Page')
+    reloaded.close()
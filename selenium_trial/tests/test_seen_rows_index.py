@@ -0,0 +1,169 @@
+"""SeenRowIndex must behave exactly like the set of key tuples it replaces."""
+import json
+import os
+import random
+
+import pytest
+
+from crawler import extract_xpaths_from_page, row_dedup_key
+from seen_rows_index import SeenRowIndex, intern_row, open_for_journal, save_for_journal
+from streaming_output import iter_jsonl
+
+
+class FieldsDriver:
+    """Stands in for a WebDriver: the bulk-extraction script returns the given field attributes."""
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def execute_script(self, script, *args):
+        return [dict(field) for field in self.fields]
+
+
+def random_fields(rng, n):
+    """Field attributes with repeats, blanks and attributes that are missing altogether."""
+    values = ['', None, 'a', 'b', 'ab', 'a b', 'ä', 'x' * 50]
+    fields = []
+    for _ in range(n):
+        field = {'tagName': rng.choice(['input', 'select', 'textarea'])}
+        for attr in ('id', 'name', 'className', 'type'):
+            if rng.random() < 0.8:
+                field[attr] = rng.choice(values)
+        fields.append(field)
+    return fields
+
+
+def assert_same_ops(keys):
+    """Feed keys to a set and to a SeenRowIndex; every contains/add answer must match."""
+    expected, index = set(), SeenRowIndex()
+    for key in keys:
+        assert (key in index) == (key in expected), key
+        index.add(key)
+        expected.add(key)
+        assert key in index
+    assert len(index) == len(expected)
+    return expected, index
+
+
+def test_extract_xpaths_from_page_same_rows_with_set_and_index():
+    rng = random.Random(7)
+    seen_set, seen_index = set(), SeenRowIndex()
+    kept = 0
+    for page in range(40):
+        driver = FieldsDriver(random_fields(rng, 30))
+        page_name = f"Page {page % 10}"  # pages repeat, as on a resumed crawl
+        from_set = extract_xpaths_from_page(driver, page_name, seen_set)
+        from_index = extract_xpaths_from_page(driver, page_name, seen_index)
+        assert from_index == from_set
+        kept += len(from_set)
+    assert 0 < kept < 40 * 30  # some rows kept, some deduplicated
+    assert len(seen_index) == len(seen_set)
+
+
+def test_blank_none_and_ambiguous_keys_stay_distinct():
+    keys = [
+        ('p', '//x', '', '', '', '', 'input', ''),
+        ('p', '//x', '', None, '', '', 'input', ''),
+        ('p', '//x', None, '', '', '', 'input', ''),
+        ('p', '//x', '', '', '', '', 'input'),          # shorter tuple
+        ('ab', 'c'), ('a', 'bc'), ('a', "b', 'c"),      # would collide if parts were concatenated
+        ('None',), (None,), ('',), (),
+    ]
+    expected, _ = assert_same_ops(keys + keys)
+    assert len(expected) == len(keys)
+
+
+def test_numbers_compare_like_the_tuple_set():
+    # 1 == 1.0 == True in a tuple set, '1' is not
+    expected, index = assert_same_ops([(1,), (1.0,), (True,), ('1',), (0,), (False,), (2.5,), (None, 1)])
+    assert len(index) == len(expected) == 5
+
+
+def test_interned_rows_give_the_same_keys():
+    rng = random.Random(3)
+    rows = [{'page': f"Page {rng.randrange(5)}", 'relativeXpath': f"//input[@id='f{rng.randrange(50)}']",
+             'elementName': 'txt', 'id': '', 'className': rng.choice(['', 'dealbox', None]),
+             'tagName': 'input', 'type': rng.choice(['text', ''])} for _ in range(500)]
+    copies = [dict(row) for row in rows]
+    interned = [intern_row(dict(row)) for row in rows]
+    _, index = assert_same_ops([row_dedup_key(row) for row in interned])
+    assert all(row_dedup_key(row) in index for row in copies)
+    assert interned[0]['page'] is interned[0]['page'] and interned == copies
+
+
+def test_mapped_index_answers_like_the_set(tmp_path):
+    keys = [('p', f'//x{i}', '', None if i % 3 else '') for i in range(300)]
+    expected, index = assert_same_ops(keys[:200])
+    index.save(str(tmp_path / 'seen.idx'))
+
+    mapped, _ = SeenRowIndex.load(str(tmp_path / 'seen.idx'))
+    try:
+        for key in keys:
+            assert (key in mapped) == (key in expected)
+        for key in keys[150:]:
+            mapped.add(key)
+            expected.add(key)
+        assert len(mapped) == len(expected)
+        assert all(key in mapped for key in expected)
+    finally:
+        mapped.close()
+
+
+def write_journal(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row) + '\n')
+
+
+def journal_index(tmp_path):
+    journal, index_file = str(tmp_path / 'rows.jsonl'), str(tmp_path / 'rows.seen.idx')
+    return journal, index_file, lambda: open_for_journal(index_file, journal, lambda: iter_jsonl(journal), row_dedup_key)
+
+
+def test_open_for_journal_maps_the_index_of_an_unchanged_journal(tmp_path):
+    journal, index_file, open_index = journal_index(tmp_path)
+    write_journal(journal, [{'page': 'A', 'relativeXpath': '//a'}, {'page': 'B', 'relativeXpath': '//b'}])
+    save_for_journal(open_index(), index_file, journal)
+
+    index = open_index()
+    try:
+        assert index._mmap is not None
+        assert row_dedup_key({'page': 'A', 'relativeXpath': '//a'}) in index
+    finally:
+        index.close()
+
+
+def test_open_for_journal_rebuilds_when_journal_rewritten_to_same_size(tmp_path):
+    journal, index_file, open_index = journal_index(tmp_path)
+    write_journal(journal, [{'page': 'A', 'relativeXpath': '//a'}])
+    save_for_journal(open_index(), index_file, journal)
+    size = os.path.getsize(journal)
+
+    write_journal(journal, [{'page': 'B', 'relativeXpath': '//b'}])
+    assert os.path.getsize(journal) == size
+    index = open_index()
+    try:
+        assert index._mmap is None
+        assert row_dedup_key({'page': 'B', 'relativeXpath': '//b'}) in index
+        assert row_dedup_key({'page': 'A', 'relativeXpath': '//a'}) not in index
+    finally:
+        index.close()
+
+
+def test_open_for_journal_ignores_a_damaged_index(tmp_path):
+    journal, index_file, open_index = journal_index(tmp_path)
+    write_journal(journal, [{'page': 'A', 'relativeXpath': '//a'}])
+    with open(index_file, 'wb') as f:
+        f.write(b'SEENIDX')
+    assert row_dedup_key({'page': 'A', 'relativeXpath': '//a'}) in open_index()
+
+
+@pytest.mark.parametrize('missing_journal', [True, False])
+def test_save_for_journal_removes_index_of_a_missing_journal(tmp_path, missing_journal):
+    journal, index_file, open_index = journal_index(tmp_path)
+    write_journal(journal, [{'page': 'A', 'relativeXpath': '//a'}])
+    save_for_journal(open_index(), index_file, journal)
+    if missing_journal:
+        os.remove(journal)
+    save_for_journal(SeenRowIndex(), index_file, journal)
+    assert os.path.exists(index_file) != missing_journal
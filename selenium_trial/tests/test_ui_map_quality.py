@@ -0,0 +1,47 @@
+"""The thin section views only print; main() is the one that writes the report and CSVs."""
+import os
+
+import pytest
+from openpyxl import Workbook
+
+import ui_map_quality
+from ui_map_quality import QUALITY_REPORT_FILE, run
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['page', 'elementName', 'relativeXpath'])
+    ws.append(['Customer', 'txt_NAME', "//input[@id='NAME']"])
+    ws.append(['Customer', 'txt_NAME', "//input[@id='NAME']"])
+    ws.append(['Account', 'txt_ID', 'input[@id]'])
+    wb.save('ui_map.xlsx')
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['PageName', 'ElementCount'])
+    ws.append(['Customer', 2])
+    ws.append(['Teller', 0])
+    wb.save('stats.xlsx')
+    return tmp_path
+
+
+def test_section_view_writes_nothing(workbooks, capsys):
+    report = run('ui_map.xlsx', 'stats.xlsx', sections=['duplicates', 'verdict'])
+
+    assert report['ui_map']['total_rows'] == 3
+    assert report['report_file'] is None and report['csv_files'] == []
+    # (.workbook_cache is workbook_table's read cache, not a report artifact)
+    assert sorted(set(os.listdir(workbooks)) - {'.workbook_cache'}) == ['stats.xlsx', 'ui_map.xlsx']
+    assert 'Report:' not in capsys.readouterr().out
+
+
+def test_main_writes_report_and_csvs(workbooks, monkeypatch):
+    monkeypatch.setattr('sys.argv', ['ui_map_quality.py', 'ui_map.xlsx', 'stats.xlsx'])
+    with pytest.raises(SystemExit):
+        ui_map_quality.main()
+
+    assert os.path.exists(QUALITY_REPORT_FILE)
+    assert os.path.exists('zero_elements_ALL.csv')